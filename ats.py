@@ -0,0 +1,404 @@
+"""
+Keyword-density ATS scoring of resumes against job descriptions.
+
+Each resume is tokenized once into a term-frequency dict (unigrams and
+bigrams of non-stopword tokens) that is stored on the student row. A job
+description is compiled into a weighted keyword vector: its terms weighted
+by frequency in the description and inverse document frequency over the
+resumes, with the session's required skills boosted, normalized to sum 1.
+
+TermIndex keeps the resumes as a sparse term-count matrix in compressed
+column form (so a term's column is also its postings list). New or
+re-uploaded resumes go into a small delta that is read directly and merged
+into the matrix once it grows; document frequencies are recomputed at that
+merge. keyword_index.py runs boolean keyword search over the same index.
+
+AtsIndex scores each (resume, term) pair by its saturated density
+tf / (tf + k1 * length_norm): the first mention gets most of the credit and
+repetition has diminishing returns, and long resumes are not rewarded for
+length alone. A session's ATS score for every student is then one sparse
+matrix-vector product, computed by gathering only the keyword columns into
+a single bincount, and scaled to 0-100.
+"""
+import math
+import re
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+_SINGLE_CHAR_TERMS = {"c", "r"}
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc few for from further had has have
+having he her here hers him his how i if in into is it its itself just may me might more most must my no nor not
+now of off on once only or other our ours out over own per same she should so some such than that the their them
+then there these they this those through to too under until up upon us very via was we were what when where which
+while who whom why will with within would you your yours
+ability able candidate candidates good great including join looking new plus preferred required requirements
+responsibilities responsible role strong team using work working year years
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercased word tokens, keeping skill spellings like c++, c# and node.js.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if len(token) == 1 and token not in _SINGLE_CHAR_TERMS:
+            continue
+        if token.replace(".", "").isdigit():
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def term_frequencies(text: str) -> dict[str, int]:
+    """
+    Counts of non-stopword unigrams and of bigrams of adjacent non-stopword tokens.
+    """
+    counts: dict[str, int] = {}
+    previous = None
+    for token in tokenize(text):
+        if token in STOPWORDS:
+            previous = None
+            continue
+        counts[token] = counts.get(token, 0) + 1
+        if previous is not None:
+            bigram = f"{previous} {token}"
+            counts[bigram] = counts.get(bigram, 0) + 1
+        previous = token
+    return counts
+
+
+def document_length(frequencies: dict[str, int]) -> int:
+    # Unigram counts only; bigrams would count every adjacent pair twice
+    return sum(count for term, count in frequencies.items() if " " not in term)
+
+
+def skill_terms(skill: str) -> list[str]:
+    """
+    Index terms for a skill name: the skill itself for one or two tokens, its bigrams for longer names.
+    """
+    tokens = [token for token in tokenize(skill) if token not in STOPWORDS]
+    if len(tokens) <= 2:
+        return [" ".join(tokens)] if tokens else []
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TermIndex:
+    """
+    Term-count matrix over student resumes; see the module docstring.
+    Only numeric arrays and the vocabulary are kept, not the per-resume dicts.
+    Thread-safe: upserts and reads may run concurrently.
+    """
+
+    def __init__(self, b: float = 0.75, delta_limit: int = 256):
+        self.b = b
+        self.delta_limit = delta_limit
+        self.built_at = time.time()
+        self._lock = threading.RLock()
+        self._terms: list[str] = []
+        self._column_of: dict[str, int] = {}
+        self._delta: dict[str, tuple[dict[str, int], int]] = {}
+        empty = np.empty(0, dtype=np.int64)
+        self._build([], empty, empty, np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], **options) -> "TermIndex":
+        """
+        Builds an index from student rows with id and term_frequencies; rows without frequencies are skipped.
+        """
+        index = cls(**options)
+        student_ids: list[str] = []
+        columns: list[int] = []
+        counts: list[int] = []
+        sizes: list[int] = []
+        lengths: list[int] = []
+        for row in rows:
+            frequencies = row.get("term_frequencies")
+            if not frequencies:
+                continue
+            student_ids.append(row["id"])
+            columns.extend(index._column(term) for term in frequencies)
+            counts.extend(frequencies.values())
+            sizes.append(len(frequencies))
+            lengths.append(document_length(frequencies))
+        index._build(
+            student_ids,
+            np.repeat(np.arange(len(student_ids), dtype=np.int64), sizes),
+            np.asarray(columns, dtype=np.int64),
+            np.asarray(counts, dtype=np.float32),
+            np.asarray(lengths, dtype=np.float32),
+        )
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            # A delta entry's old matrix row, if any, is already marked dead
+            return int(self._alive.sum()) + len(self._delta)
+
+    @property
+    def nbytes(self) -> int:
+        return self._indptr.nbytes + self._rows.nbytes + self._counts.nbytes + self._lengths.nbytes + self._norms.nbytes
+
+    # Building
+    def _column(self, term: str) -> int:
+        column = self._column_of.get(term)
+        if column is None:
+            column = self._column_of[term] = len(self._terms)
+            self._terms.append(term)
+        return column
+
+    def _build(self, student_ids: list[str], rows: np.ndarray, columns: np.ndarray,
+               counts: np.ndarray, lengths: np.ndarray) -> None:
+        """
+        Lays out (row, column, count) triplets column-major, precomputes the
+        length norms and document frequencies, and clears the delta.
+        """
+        self.student_ids = student_ids
+        self._row_of = {student_id: i for i, student_id in enumerate(student_ids)}
+        self._lengths = lengths
+        self.average_length = float(lengths.mean()) if lengths.size and lengths.mean() > 0 else 1.0
+        self._norms = (1 - self.b + self.b * lengths / self.average_length).astype(np.float32)
+        order = np.argsort(columns, kind="stable")
+        self._rows = rows[order].astype(np.int32)
+        self._counts = counts[order]
+        self._document_frequency = np.bincount(columns, minlength=len(self._terms))
+        self._indptr = np.concatenate([[0], np.cumsum(self._document_frequency)]).astype(np.int64)
+        self._alive = np.ones(len(student_ids), dtype=bool)
+        self._delta = {}
+        self._built()
+
+    def _built(self) -> None:
+        """
+        Hook for subclasses to drop state derived from the previous matrix.
+        """
+
+    def _merge(self) -> None:
+        """
+        Folds the delta into the matrix, dropping superseded and removed rows.
+        """
+        entry_columns = np.repeat(np.arange(len(self._indptr) - 1, dtype=np.int64), np.diff(self._indptr))
+        keep = self._alive[self._rows]
+        new_row = np.cumsum(self._alive) - 1
+        student_ids = [student_id for student_id, alive in zip(self.student_ids, self._alive.tolist()) if alive]
+        rows = [new_row[self._rows[keep]].astype(np.int64)]
+        columns = [entry_columns[keep]]
+        counts = [self._counts[keep]]
+        lengths = [self._lengths[self._alive]]
+        for student_id, (frequencies, length) in self._delta.items():
+            rows.append(np.full(len(frequencies), len(student_ids), dtype=np.int64))
+            columns.append(np.fromiter((self._column(term) for term in frequencies), dtype=np.int64, count=len(frequencies)))
+            counts.append(np.fromiter(frequencies.values(), dtype=np.float32, count=len(frequencies)))
+            lengths.append(np.array([length], dtype=np.float32))
+            student_ids.append(student_id)
+        self._build(student_ids, np.concatenate(rows), np.concatenate(columns), np.concatenate(counts), np.concatenate(lengths))
+
+    def upsert(self, student_id: str, frequencies: dict[str, int]) -> None:
+        """
+        Adds or replaces one resume without rebuilding the matrix; merges the delta once it passes delta_limit.
+        """
+        with self._lock:
+            row = self._row_of.get(student_id)
+            if row is not None:
+                self._alive[row] = False
+            self._delta[student_id] = (dict(frequencies), document_length(frequencies))
+            if len(self._delta) > self.delta_limit:
+                self._merge()
+
+    def remove(self, student_id: str) -> None:
+        with self._lock:
+            row = self._row_of.get(student_id)
+            if row is not None:
+                self._alive[row] = False
+            self._delta.pop(student_id, None)
+
+    def _norm(self, length: float) -> float:
+        return 1 - self.b + self.b * length / self.average_length
+
+    def document_frequency(self, term: str) -> int:
+        column = self._column_of.get(term)
+        if column is None or column >= len(self._document_frequency):
+            return 0
+        return int(self._document_frequency[column])
+
+    def idf(self, term: str) -> float:
+        frequency = self.document_frequency(term)
+        return math.log(1 + (max(1, len(self)) - frequency + 0.5) / (frequency + 0.5))
+
+    def snapshot(self) -> "TermSnapshot":
+        with self._lock:
+            return TermSnapshot(self)
+
+    def _student_terms(self, student_id: str) -> set[str]:
+        with self._lock:
+            if student_id in self._delta:
+                return set(self._delta[student_id][0])
+            row = self._row_of.get(student_id)
+            if row is None or not self._alive[row]:
+                return set()
+            entries = np.flatnonzero(self._rows == row)
+            columns = np.searchsorted(self._indptr, entries, side="right") - 1
+            return {self._terms[column] for column in columns.tolist()}
+
+
+class TermSnapshot:
+    """
+    Point-in-time postings view of a TermIndex, read without holding its lock.
+    Documents are numbered matrix rows first, then delta entries.
+    """
+
+    def __init__(self, index: TermIndex):
+        # _build replaces the arrays rather than mutating them; only the alive mask changes in place
+        self._column_of = index._column_of
+        self._indptr = index._indptr
+        self._rows = index._rows
+        self._counts = index._counts
+        self._norms = index._norms
+        self._alive = index._alive.copy()
+        self._matrix_size = len(index.student_ids)
+        self._delta = [
+            (frequencies, index._norm(length)) for frequencies, length in index._delta.values()
+        ]
+        self.student_ids = index.student_ids + list(index._delta)
+
+    def __len__(self) -> int:
+        return int(self._alive.sum()) + len(self._delta)
+
+    def documents(self) -> np.ndarray:
+        """
+        Every live document, ascending.
+        """
+        delta = np.arange(self._matrix_size, len(self.student_ids), dtype=np.int64)
+        return np.concatenate([np.flatnonzero(self._alive), delta])
+
+    def postings(self, term: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (documents ascending, term counts, length norms) of the live documents containing term.
+        """
+        documents, counts, norms = [], [], []
+        column = self._column_of.get(term)
+        if column is not None and column < len(self._indptr) - 1:
+            entries = slice(self._indptr[column], self._indptr[column + 1])
+            rows = self._rows[entries]
+            live = self._alive[rows]
+            rows = rows[live]
+            documents.append(rows.astype(np.int64))
+            counts.append(self._counts[entries][live])
+            norms.append(self._norms[rows])
+        for offset, (frequencies, norm) in enumerate(self._delta):
+            if term in frequencies:
+                documents.append(np.array([self._matrix_size + offset], dtype=np.int64))
+                counts.append(np.array([frequencies[term]], dtype=np.float32))
+                norms.append(np.array([norm], dtype=np.float32))
+        if not documents:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+        return np.concatenate(documents), np.concatenate(counts), np.concatenate(norms)
+
+
+class AtsIndex(TermIndex):
+    """
+    TermIndex with session keyword compilation and ATS scoring.
+    """
+
+    def __init__(
+        self,
+        k1: float = 0.5,
+        b: float = 0.75,
+        delta_limit: int = 256,
+        max_keywords: int = 40,
+        required_skill_boost: float = 3.0,
+    ):
+        self.k1 = k1
+        self.max_keywords = max_keywords
+        self.required_skill_boost = required_skill_boost
+        super().__init__(b=b, delta_limit=delta_limit)
+
+    def _built(self) -> None:
+        self._keywords_cache: dict = {}
+
+    # Session keywords
+    def compile_keywords(self, description: str, required_skills: Optional[list[str]] = None) -> dict[str, float]:
+        """
+        Weighted keyword vector for a job description: (1 + log tf) * idf for its
+        terms that occur in some resume (job-ad wording nobody uses would only
+        lower every score), the top max_keywords kept, required skills boosted,
+        weights summing to 1. Memoized until the next merge.
+        """
+        key = (description, tuple(required_skills or ()))
+        with self._lock:
+            cached = self._keywords_cache.get(key)
+            if cached is not None:
+                return cached
+
+            weights = {
+                term: (1 + math.log(count)) * self.idf(term)
+                for term, count in term_frequencies(description).items()
+                if self.document_frequency(term) > 0
+            }
+            weights = dict(sorted(weights.items(), key=lambda item: item[1], reverse=True)[:self.max_keywords])
+            top_weight = max(weights.values(), default=1.0)
+            for skill in required_skills or []:
+                terms = skill_terms(skill)
+                for term in terms:
+                    boosted = top_weight * self.required_skill_boost / len(terms)
+                    weights[term] = max(weights.get(term, 0.0), boosted)
+
+            total = sum(weights.values())
+            keywords = {term: weight / total for term, weight in weights.items()} if total > 0 else {}
+            if len(self._keywords_cache) >= 256:
+                self._keywords_cache.clear()
+            self._keywords_cache[key] = keywords
+            return keywords
+
+    # Scoring
+    def _saturate(self, count: int, length: float) -> float:
+        return count / (count + self.k1 * self._norm(length))
+
+    def scores(self, keywords: dict[str, float]) -> dict[str, float]:
+        """
+        ATS score (0-100) of every indexed student for a compiled keyword vector.
+        """
+        with self._lock:
+            columns = [
+                (column, weight) for column, weight in
+                ((self._column_of.get(term), weight) for term, weight in keywords.items())
+                if column is not None and column < len(self._document_frequency)
+            ]
+            totals = np.zeros(len(self.student_ids), dtype=np.float64)
+            if columns:
+                slices = [slice(self._indptr[column], self._indptr[column + 1]) for column, _ in columns]
+                rows = np.concatenate([self._rows[s] for s in slices])
+                counts = np.concatenate([self._counts[s] for s in slices])
+                weights = np.concatenate([np.full(s.stop - s.start, weight, dtype=np.float32) for s, (_, weight) in zip(slices, columns)])
+                weighted = weights * counts / (counts + self.k1 * self._norms[rows])
+                totals = np.bincount(rows, weights=weighted, minlength=len(self.student_ids))
+
+            results = {
+                student_id: round(score * 100, 2)
+                for student_id, score, alive in zip(self.student_ids, totals.tolist(), self._alive.tolist())
+                if alive
+            }
+            for student_id, (frequencies, length) in self._delta.items():
+                score = sum(
+                    weight * self._saturate(frequencies[term], length)
+                    for term, weight in keywords.items() if term in frequencies
+                )
+                results[student_id] = round(score * 100, 2)
+        return results
+
+    def explain(self, student_id: str, keywords: dict[str, float]) -> dict:
+        """
+        Matched and missing keywords for one student, heaviest first.
+        """
+        terms = self._student_terms(student_id)
+        ranked = sorted(keywords.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "matched_keywords": [term for term, _ in ranked if term in terms],
+            "missing_keywords": [term for term, _ in ranked if term not in terms],
+        }
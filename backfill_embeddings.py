@@ -0,0 +1,409 @@
+"""
+Re-embeds students whose vectors are missing, all-zero placeholders or from
+another embedding model.
+
+Scans `students` in id order a page at a time. For each row that needs work
+the resume text comes from, in order: the local text cache, a queued or
+failed item in the embedding retry queue, or the stored resume PDF
+(downloaded and parsed again, then cached). The summary embedding uses the
+stored summary. At most --concurrency rows are processed at once and
+embeddings are requested at no more than --rate per second, so live uploads
+and searches keep most of the embedding capacity. Vectors are written with
+`embedding_model` set to the current model; the API picks the change up
+through LISTEN/NOTIFY or once its row caches expire.
+
+Progress (the id cursor and counters) is checkpointed to a local SQLite file
+after every page, per embedding model, so an interrupted run continues where
+it stopped when the same command is run again. A run that reaches the end
+marks its checkpoint complete and the next run scans from the start.
+
+    python backfill_embeddings.py --dry-run
+    python backfill_embeddings.py --rate 5 --concurrency 4
+    OLLAMA_MODEL=nomic-embed-text python backfill_embeddings.py --restart
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+from embedders import EmbeddingPool, EmbeddingUnavailable
+from summary_client import TokenBucket
+from vector_index import parse_vector
+
+BACKFILL_STATE_DB = os.environ.get("EMBEDDING_BACKFILL_DB", "embedding_backfill.sqlite3")
+STUDENT_COLUMNS = "id, resume_url, summary, resume_embeddings, summary_embedding, embedding_model"
+MAX_RECORDED_FAILURES = 100
+UNAVAILABLE_RETRIES = 3
+UNAVAILABLE_BACKOFF_SECONDS = 10.0
+
+
+def vector_problem(value, dim: int) -> Optional[str]:
+    """
+    Returns why a stored vector is unusable ("missing", "invalid", "zero"), or None if it is fine.
+    """
+    try:
+        vector = parse_vector(value)
+    except (ValueError, TypeError):
+        return "invalid"
+    if vector is None:
+        return "missing"
+    if vector.size != dim:
+        return "invalid"
+    if not np.any(vector):
+        return "zero"
+    return None
+
+
+def columns_to_refresh(row: dict, model_tag: str, dim: int) -> Dict[str, str]:
+    """
+    Vector columns of a student row that need embedding, mapped to the reason.
+    A row tagged with another model needs both; a summary_embedding is only
+    expected when the row has a summary.
+    """
+    old_model = row.get("embedding_model") != model_tag
+    columns = {}
+    problem = vector_problem(row.get("resume_embeddings"), dim)
+    if problem or old_model:
+        columns["resume_embeddings"] = problem or "old_model"
+    if (row.get("summary") or "").strip():
+        problem = vector_problem(row.get("summary_embedding"), dim)
+        if problem or old_model:
+            columns["summary_embedding"] = problem or "old_model"
+    return columns
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class BackfillState:
+    """
+    Checkpoints (one per embedding model) and extracted resume texts, in a local SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                model TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS resume_texts (
+                student_id TEXT PRIMARY KEY,
+                resume_url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def load_checkpoint(self, model: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM checkpoints WHERE model = ?", (model,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def save_checkpoint(self, model: str, data: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO checkpoints (model, data, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT (model) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at""",
+                (model, json.dumps(data), time.time()),
+            )
+
+    def cached_text(self, student_id: str, resume_url: str) -> Optional[str]:
+        # A new upload under a different URL makes the cached text stale
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM resume_texts WHERE student_id = ? AND resume_url = ?", (student_id, resume_url)
+            ).fetchone()
+        return row["text"] if row else None
+
+    def cache_text(self, student_id: str, resume_url: str, text: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO resume_texts (student_id, resume_url, text, updated_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (student_id) DO UPDATE SET
+                   resume_url = excluded.resume_url, text = excluded.text, updated_at = excluded.updated_at""",
+                (student_id, resume_url, text, time.time()),
+            )
+
+
+class EmbeddingBackfill:
+    def __init__(
+        self,
+        client,
+        embed: Callable[[str, str, str], Awaitable[list]],
+        extract_text: Callable[[bytes], str],
+        resume_path: Callable[[str], Optional[str]],
+        state: BackfillState,
+        model_tag: str,
+        dim: int,
+        retry_queue=None,
+        page_size: int = 100,
+        concurrency: int = 4,
+        rate: float = 5.0,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+    ):
+        self.client = client
+        self.embed = embed
+        self.extract_text = extract_text
+        self.resume_path = resume_path
+        self.state = state
+        self.model_tag = model_tag
+        self.dim = dim
+        self.retry_queue = retry_queue
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.limit = limit
+        self.dry_run = dry_run
+        self._bucket = TokenBucket(max(1.0, rate), rate) if rate > 0 else None
+        self.progress: dict = {}
+
+    # Supabase access (blocking; called in worker threads)
+    def _count_after(self, cursor: str) -> Optional[int]:
+        try:
+            query = self.client.table("students").select("id", count="exact")
+            if cursor:
+                query = query.gt("id", cursor)
+            return query.limit(1).execute().count
+        except Exception as e:
+            print(f"Could not count students, no ETA: {e}")
+            return None
+
+    def _fetch_page(self, cursor: str) -> list[dict]:
+        query = self.client.table("students").select(STUDENT_COLUMNS)
+        if cursor:
+            query = query.gt("id", cursor)
+        return query.order("id").limit(self.page_size).execute().data or []
+
+    def _download(self, path: str) -> bytes:
+        return self.client.storage.from_("resumes").download(path)
+
+    def _write(self, student_id: str, payload: dict) -> None:
+        self.client.table("students").update(payload).eq("id", student_id).execute()
+
+    # Row processing
+    async def _resume_text(self, row: dict) -> Optional[str]:
+        """
+        Text for the resume embedding: cached text, the retry queue's text, or the stored PDF.
+        """
+        student_id, resume_url = row["id"], row.get("resume_url")
+        if resume_url:
+            text = await asyncio.to_thread(self.state.cached_text, student_id, resume_url)
+            if text:
+                return text
+        if self.retry_queue is not None:
+            text = await asyncio.to_thread(self.retry_queue.queued_text, student_id, "resume_embeddings")
+            if text:
+                return text
+        path = self.resume_path(resume_url) if resume_url else None
+        if not path:
+            return None
+        file_bytes = await asyncio.to_thread(self._download, path)
+        text = await asyncio.to_thread(self.extract_text, file_bytes)
+        if not text.strip():
+            return None
+        await asyncio.to_thread(self.state.cache_text, student_id, resume_url, text)
+        return text
+
+    async def _embed(self, student_id: str, column: str, text: str) -> list:
+        for attempt in range(UNAVAILABLE_RETRIES + 1):
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                vector = await self.embed(student_id, column, text)
+                break
+            except EmbeddingUnavailable:
+                if attempt == UNAVAILABLE_RETRIES:
+                    raise
+                await asyncio.sleep(UNAVAILABLE_BACKOFF_SECONDS * (2 ** attempt))
+        if vector_problem(vector, self.dim):
+            raise ValueError(f"embedding backend returned an unusable vector ({len(vector or [])} dimensions)")
+        return vector
+
+    async def _process_row(self, row: dict, columns: Dict[str, str]) -> None:
+        progress = self.progress
+        payload = {}
+        try:
+            for column in columns:
+                text = await self._resume_text(row) if column == "resume_embeddings" else row["summary"]
+                if not text:
+                    progress["skipped_no_text"] += 1
+                    continue
+                payload[column] = await self._embed(row["id"], column, text)
+                progress["vectors_embedded"] += 1
+        except EmbeddingUnavailable:
+            raise
+        except Exception as e:
+            print(f"Backfill failed for student {row['id']}: {e}")
+            progress["failed"] += 1
+            if len(progress["failed_ids"]) < MAX_RECORDED_FAILURES:
+                progress["failed_ids"].append(row["id"])
+        if not payload:
+            return
+        # Only tag the row with the current model once every stale column was re-embedded
+        if len(payload) == len(columns):
+            payload["embedding_model"] = self.model_tag
+        await asyncio.to_thread(self._write, row["id"], payload)
+        progress["rows_updated"] += 1
+        if self.retry_queue is not None:
+            for column in payload:
+                if column != "embedding_model":
+                    await asyncio.to_thread(self.retry_queue.discard, row["id"], column)
+
+    async def _process_page(self, rows: list[dict]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(row, columns):
+            async with semaphore:
+                await self._process_row(row, columns)
+
+        tasks = []
+        found = {}
+        for row in rows:
+            columns = columns_to_refresh(row, self.model_tag, self.dim)
+            for column, reason in columns.items():
+                found[f"{column}.{reason}"] = found.get(f"{column}.{reason}", 0) + 1
+            if columns and not self.dry_run:
+                tasks.append(run(row, columns))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        # Counted once the page is done, so a page that is retried after an interruption is not counted twice
+        for key, count in found.items():
+            self.progress["found"][key] = self.progress["found"].get(key, 0) + count
+
+    # Driver
+    def _new_progress(self) -> dict:
+        return {
+            "cursor": "", "completed": False, "started_at": time.time(), "scanned": 0, "rows_updated": 0,
+            "vectors_embedded": 0, "skipped_no_text": 0, "failed": 0, "failed_ids": [], "found": {},
+        }
+
+    def _report(self, scanned_this_run: int, embedded_this_run: int, elapsed: float, remaining: Optional[int]) -> None:
+        progress = self.progress
+        rows_per_second = scanned_this_run / elapsed if elapsed > 0 else 0.0
+        line = (f"Backfill: scanned {progress['scanned']} rows, updated {progress['rows_updated']}, "
+                f"embedded {progress['vectors_embedded']} vectors, failed {progress['failed']}, "
+                f"no text {progress['skipped_no_text']} | {rows_per_second:.1f} rows/s, "
+                f"{embedded_this_run / elapsed if elapsed > 0 else 0.0:.1f} embeddings/s")
+        if remaining is not None:
+            left = max(0, remaining - scanned_this_run)
+            eta = format_duration(left / rows_per_second) if rows_per_second > 0 else "unknown"
+            line += f" | {left} rows left, ETA {eta}"
+        print(line)
+
+    async def run(self, restart: bool = False) -> dict:
+        """
+        Scans from the checkpoint (or the start) to the end of the table, or
+        until --limit rows. Returns the progress dict; "interrupted" is set
+        when the embedding backend stayed unavailable.
+        """
+        checkpoint = None if restart or self.dry_run else await asyncio.to_thread(self.state.load_checkpoint, self.model_tag)
+        if checkpoint and not checkpoint.get("completed"):
+            self.progress = checkpoint
+            print(f"Resuming backfill for {self.model_tag} after student {checkpoint['cursor']} "
+                  f"({checkpoint['scanned']} rows already scanned)")
+        else:
+            self.progress = self._new_progress()
+        progress = self.progress
+
+        remaining = await asyncio.to_thread(self._count_after, progress["cursor"])
+        started = time.perf_counter()
+        scanned_this_run = 0
+        embedded_before = progress["vectors_embedded"]
+        while self.limit is None or scanned_this_run < self.limit:
+            rows = await asyncio.to_thread(self._fetch_page, progress["cursor"])
+            if self.limit is not None:
+                rows = rows[:self.limit - scanned_this_run]
+            if not rows:
+                progress["completed"] = True
+                break
+            try:
+                await self._process_page(rows)
+            except EmbeddingUnavailable as e:
+                # Keep the cursor before this page; rows already written are skipped next time
+                print(f"Embedding backend unavailable, stopping: {e}")
+                progress["interrupted"] = True
+                break
+            progress["cursor"] = rows[-1]["id"]
+            progress["scanned"] += len(rows)
+            scanned_this_run += len(rows)
+            if not self.dry_run:
+                await asyncio.to_thread(self.state.save_checkpoint, self.model_tag, progress)
+            self._report(scanned_this_run, progress["vectors_embedded"] - embedded_before,
+                         time.perf_counter() - started, remaining)
+
+        if not self.dry_run:
+            interrupted = progress.pop("interrupted", False)
+            await asyncio.to_thread(self.state.save_checkpoint, self.model_tag, progress)
+            progress["interrupted"] = interrupted
+        found = ", ".join(f"{key}: {count}" for key, count in sorted(progress["found"].items())) or "none"
+        print(f"Backfill {'complete' if progress['completed'] else 'stopped'} after "
+              f"{format_duration(time.perf_counter() - started)}; stale vectors found: {found}")
+        if progress["failed_ids"]:
+            print(f"Failed students: {', '.join(progress['failed_ids'])}")
+        return progress
+
+
+async def run_backfill(args, app) -> dict:
+    backfill = EmbeddingBackfill(
+        app.supabase,
+        app.embed_column_text,
+        app.extract_text_from_pdf,
+        app.get_file_path_from_supabase_url,
+        BackfillState(args.state),
+        app.EMBEDDING_MODEL_TAG,
+        app.EMBEDDING_DIM,
+        retry_queue=app.embedding_retry_queue,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        limit=args.limit,
+        dry_run=args.dry_run,
+    )
+    try:
+        return await backfill.run(restart=args.restart)
+    finally:
+        if isinstance(app.embedder, EmbeddingPool):
+            await app.embedder.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100, help="students fetched per page (and per checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=4, help="rows processed at once")
+    parser.add_argument("--rate", type=float, default=5.0, help="max embedding requests per second, 0 for no limit")
+    parser.add_argument("--limit", type=int, help="stop after scanning this many rows")
+    parser.add_argument("--state", default=BACKFILL_STATE_DB, help="SQLite file for checkpoints and cached resume text")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and scan from the start")
+    parser.add_argument("--dry-run", action="store_true", help="only count stale vectors")
+    args = parser.parse_args()
+
+    import embed_resume
+    embed_resume.ensure_data_client()
+    progress = asyncio.run(run_backfill(args, embed_resume))
+    sys.exit(1 if progress.get("interrupted") else 0)
+
+
+if __name__ == "__main__":
+    main()
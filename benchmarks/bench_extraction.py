@@ -0,0 +1,171 @@
+"""
+Microbenchmarks for the resume/job extraction and match scoring hot paths.
+
+Generates a corpus of synthetic resumes and job descriptions
+(synthetic_text.py), derives student rows and session criteria from them
+the way uploads and session processing do, and times each function per
+call over the corpus: median, p95 and mean in microseconds, best of
+--repeat passes.
+
+Results can be saved and compared. Every function also records a digest of
+its outputs on the corpus, so a comparison shows both slowdowns (median
+more than --tolerance above the baseline) and behaviour changes (different
+outputs on the same corpus). Either makes the exit code 1; an intended
+behaviour change needs a fresh baseline.
+
+    python benchmarks/bench_extraction.py --save-baseline extraction_baseline.json
+    python benchmarks/bench_extraction.py --baseline extraction_baseline.json
+    python benchmarks/bench_extraction.py --only extract_skills_from_text,extract_academic_info
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# The app module is only imported for its pure functions; keep it offline
+os.environ.setdefault("DATA_BACKEND", "memory")
+os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+
+with open(os.devnull, "w") as _devnull, contextlib.redirect_stdout(_devnull):
+    import embed_resume  # noqa: E402
+from matching import calculate_detailed_match_analysis, calculate_student_job_match_score  # noqa: E402
+from synthetic_text import generate_job_description, generate_resume  # noqa: E402
+
+
+def build_corpus(resumes: int, jobs: int, seed: int, noise: float) -> dict:
+    rng = random.Random(seed)
+    resume_texts = [generate_resume(rng, noise) for _ in range(resumes)]
+    job_texts = [generate_job_description(rng, noise / 2) for _ in range(jobs)]
+
+    students = []
+    for i, text in enumerate(resume_texts):
+        academic = embed_resume.extract_academic_info(text)
+        students.append({
+            "id": f"student-{i}",
+            "skills": sorted(embed_resume.extract_skills_from_text(text)),
+            "experience": embed_resume.extract_experience_from_text(text),
+            "education": [{"degree": rng.choice(["B.Tech", "B.E.", "M.Tech"]), "field": "Computer Science"}],
+            "gpa": academic["cgpa"],
+            "year": rng.choice([2, 3, 4, None]),
+            "has_internship": "intern" in text.lower(),
+        })
+    sessions = []
+    for text in job_texts:
+        info = embed_resume.extract_job_info_from_description(text)
+        sessions.append((
+            {"required_skills": info["required_skills"]},
+            {**info["eligibility_criteria"], "eligible_years": info["eligible_years"]},
+        ))
+    pairs = [(students[i % len(students)], *sessions[i % len(sessions)], rng.choice([None, rng.uniform(0, 1)]))
+             for i in range(max(resumes, jobs) * 4)]
+    return {"resumes": resume_texts, "jobs": job_texts, "pairs": pairs}
+
+
+def benchmarks(corpus: dict) -> dict:
+    """
+    Function name -> (callable taking one input, list of inputs).
+    extract_skills_from_text returns skills in set order, which varies between
+    interpreter runs, so it is timed with a sort to keep its digest stable.
+    """
+    resumes, jobs, pairs = corpus["resumes"], corpus["jobs"], corpus["pairs"]
+    return {
+        "extract_skills_from_text": (lambda text: sorted(embed_resume.extract_skills_from_text(text)), resumes),
+        "extract_academic_info": (embed_resume.extract_academic_info, resumes),
+        "segment_resume_sections": (embed_resume.segment_resume_sections, resumes),
+        "extract_projects_from_text": (embed_resume.extract_projects_from_text, resumes),
+        "extract_experience_from_text": (embed_resume.extract_experience_from_text, resumes),
+        "calculate_ats_score": (embed_resume.calculate_ats_score, resumes),
+        "extract_job_info_from_description": (embed_resume.extract_job_info_from_description, jobs),
+        "calculate_student_job_match_score": (lambda pair: calculate_student_job_match_score(*pair), pairs),
+        "calculate_detailed_match_analysis": (lambda pair: calculate_detailed_match_analysis(*pair), pairs),
+    }
+
+
+def time_function(function, inputs: list, repeat: int) -> tuple[dict, str]:
+    """
+    Returns ({median_us, p95_us, mean_us}, output digest) for the fastest of `repeat` passes.
+    """
+    best = None
+    outputs = []
+    for attempt in range(repeat):
+        samples = np.empty(len(inputs))
+        for i, item in enumerate(inputs):
+            start = time.perf_counter_ns()
+            result = function(item)
+            samples[i] = time.perf_counter_ns() - start
+            if attempt == 0:
+                outputs.append(result)
+        if best is None or np.median(samples) < np.median(best):
+            best = samples
+    digest = hashlib.sha256(json.dumps(outputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    stats = {
+        "median_us": round(float(np.median(best)) / 1000, 2),
+        "p95_us": round(float(np.percentile(best, 95)) / 1000, 2),
+        "mean_us": round(float(best.mean()) / 1000, 2),
+    }
+    return stats, digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=300)
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.2, help="PDF-extraction noise level, 0 to 1")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", help="comma-separated function names")
+    parser.add_argument("--baseline", help="JSON results from an earlier --save-baseline run")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.resumes, args.jobs, args.seed, args.noise)
+    words = [len(text.split()) for text in corpus["resumes"]]
+    print(f"corpus: {len(corpus['resumes'])} resumes (median {int(np.median(words))} words), "
+          f"{len(corpus['jobs'])} job descriptions, {len(corpus['pairs'])} student/session pairs")
+
+    selected = set(args.only.split(",")) if args.only else None
+    results = {}
+    for name, (function, inputs) in benchmarks(corpus).items():
+        if selected and name not in selected:
+            continue
+        stats, digest = time_function(function, inputs, args.repeat)
+        results[name] = {**stats, "calls": len(inputs), "output_digest": digest}
+        print(f"  {name:<36} median {stats['median_us']:>9.2f} us  p95 {stats['p95_us']:>9.2f} us  "
+              f"mean {stats['mean_us']:>9.2f} us")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"corpus": vars(args), "results": results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions, changed = [], []
+        for name, stats in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            if stats["median_us"] > previous["median_us"] * (1 + args.tolerance):
+                regressions.append(f"{name}: median {stats['median_us']:.2f} us vs baseline {previous['median_us']:.2f} us")
+            if stats["output_digest"] != previous["output_digest"] or stats["calls"] != previous["calls"]:
+                changed.append(name)
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%})")
+        for line in regressions:
+            print(f"  {line}")
+        if changed:
+            print(f"Outputs changed (or a different corpus): {', '.join(changed)}")
+        sys.exit(1 if regressions or changed else 0)
+
+
+if __name__ == "__main__":
+    main()
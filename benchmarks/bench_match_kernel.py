@@ -0,0 +1,92 @@
+"""
+Benchmark for the match scoring kernel.
+
+Times the summary path (no explanations) against the detailed analysis on
+random student/session pairs, with each session compiled into a
+SessionMatcher up front as the endpoints do. That both paths agree is
+checked by tests/test_matching.py, which reuses the generators below.
+
+    python benchmarks/bench_match_kernel.py --pairs 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from matching import SessionMatcher  # noqa: E402
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "PostgreSQL", "MongoDB",
+    "Docker", "Kubernetes", "AWS", "Git", "Machine Learning", "TensorFlow", "PyTorch", "C", "C++", "Go",
+    "R", "HTML", "CSS", "Django", "Flask", "FastAPI", "Spark", "Excel", "Figma", "Linux", "REST APIs",
+]
+EDUCATION = ["B.Tech", "B.E.", "M.Tech", "MBA", "B.Sc", "Computer Science", "Information Technology", "Electronics"]
+
+
+def random_session(rng: random.Random) -> tuple[dict, dict]:
+    requirements = {'required_skills': rng.sample(SKILLS, rng.randint(0, 8))}
+    eligibility = {
+        'education': rng.sample(EDUCATION, rng.randint(0, 2)),
+        'experience_years': rng.choice([0, 0, 1, 2, 3]),
+        'cgpa_minimum': rng.choice([0, 6.5, 7.0, 7.5, 8.0]),
+        'eligible_years': rng.choice([[], [3, 4], [4], [2, 3, 4]]),
+    }
+    return requirements, eligibility
+
+
+def random_student(rng: random.Random) -> dict:
+    return {
+        'id': f"student-{rng.randrange(10**9)}",
+        'skills': rng.sample(SKILLS, rng.randint(0, 12)),
+        'education': rng.choice([
+            [], [{'degree': rng.choice(EDUCATION), 'field': rng.choice(EDUCATION)}], [rng.choice(EDUCATION)],
+        ]),
+        'experience': rng.sample(
+            ["Intern at Acme", "2 years at Initech", "Research assistant", "1 yr freelance", "Teaching assistant"],
+            rng.randint(0, 3),
+        ),
+        'gpa': rng.choice([None, "abc", round(rng.uniform(5.0, 10.0), 2), str(round(rng.uniform(5.0, 10.0), 1))]),
+        'year': rng.choice([None, 1, 2, 3, 4, "4"]),
+        'has_internship': rng.random() < 0.3,
+    }
+
+
+def time_per_call_us(method: str, pairs) -> float:
+    start = time.perf_counter()
+    for student, matcher, similarity in pairs:
+        getattr(matcher, method)(student, similarity)
+    return (time.perf_counter() - start) / len(pairs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=50_000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sessions = [random_session(rng) for _ in range(args.sessions)]
+    start = time.perf_counter()
+    matchers = [SessionMatcher(requirements, eligibility) for requirements, eligibility in sessions]
+    compile_us = (time.perf_counter() - start) / len(matchers) * 1e6
+
+    pairs = []
+    for _ in range(args.pairs):
+        similarity = rng.choice([None, rng.uniform(-0.2, 1.0)])
+        pairs.append((random_student(rng), rng.choice(matchers), similarity))
+
+    summary_us = time_per_call_us("score", pairs)
+    detailed_us = time_per_call_us("detailed_analysis", pairs)
+
+    print(f"pairs:                {args.pairs} over {args.sessions} sessions")
+    print(f"compile session:      {compile_us:.2f} us/session")
+    print(f"summary score:        {summary_us:.2f} us/pair")
+    print(f"detailed analysis:    {detailed_us:.2f} us/pair ({detailed_us / summary_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for the multi-vector student index.
+
+Builds an index of synthetic students (1024-dim resume and summary vectors,
+with a share of placeholder zero vectors like real data) and reports build
+time, memory footprint and query latency percentiles.
+
+    python benchmarks/bench_multi_vector.py --students 100000 --queries 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vector_index import MultiVectorIndex  # noqa: E402
+
+
+def make_students(n: int, dim: int, placeholder_rate: float, seed: int):
+    rng = np.random.default_rng(seed)
+    resume = rng.standard_normal((n, dim), dtype=np.float32)
+    summary = rng.standard_normal((n, dim), dtype=np.float32)
+    resume[rng.random(n) < placeholder_rate] = 0.0
+    summary[rng.random(n) < placeholder_rate * 2] = 0.0
+    ids = [f"student-{i}" for i in range(n)]
+    return ids, resume, summary
+
+
+def percentile_ms(samples: list[float], pct: float) -> float:
+    return float(np.percentile(samples, pct) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--placeholder-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ids, resume, summary = make_students(args.students, args.dim, args.placeholder_rate, args.seed)
+
+    start = time.perf_counter()
+    index = MultiVectorIndex(ids, resume, summary)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    index.search(queries[0], k=args.k)  # warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=args.k)
+        latencies.append(time.perf_counter() - start)
+
+    # Sanity check against a full sort on one query
+    scores = index.scores(queries[0])
+    expected = [ids[i] for i in np.argsort(-scores, kind="stable")[:args.k]]
+    got = [student_id for student_id, _ in index.search(queries[0], k=args.k)]
+
+    print(f"students:            {args.students}")
+    print(f"dimension:           {args.dim}")
+    print(f"index memory:        {index.nbytes / 1e6:.1f} MB")
+    print(f"build (normalize):   {build_seconds * 1000:.1f} ms")
+    print(f"query p50 / p95 / p99: {percentile_ms(latencies, 50):.2f} / "
+          f"{percentile_ms(latencies, 95):.2f} / {percentile_ms(latencies, 99):.2f} ms")
+    print(f"top-{args.k} matches full sort: {got == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark and agreement check for parallel match scoring.
+
+Compiles random students into MatchFeatures and scores random sessions
+with the per-student SessionMatcher loop, the vectorized kernel in process,
+and the process pool at each --workers count, reporting time per session
+and the speedup over one worker. A --malformed share of the students gets
+one field of the wrong type. Every mode's match count and top K are
+compared with the per-student loop; exits non-zero on any disagreement.
+
+    python benchmarks/bench_parallel_matching.py --students 1000000 --workers 1,2,4,8,16,32
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_match_kernel import random_session, random_student  # noqa: E402
+from matching import SessionMatcher  # noqa: E402
+from parallel_matching import MatchFeatures, score_population  # noqa: E402
+
+# Wrong-typed values per field, as hand-edited or legacy rows may hold them
+MALFORMED_VALUES = {
+    'skills': [[1, 2], 7, "python"],
+    'education': [[{'degree': None}], 5],
+    'experience': [5, 2.5, True, "2 years at Initech"],
+    'year': [float("inf"), "fourth"],
+    'gpa': [[8.0], "8,5"],
+}
+
+
+def corrupt_student(rng: random.Random, student: dict) -> dict:
+    field = rng.choice(sorted(MALFORMED_VALUES))
+    student[field] = rng.choice(MALFORMED_VALUES[field])
+    return student
+
+
+def serial_top(students: list[dict], matcher: SessionMatcher, min_score: float, top_k: int):
+    passing = [(student['id'], score) for student in students
+               if (score := matcher.score(student)) >= min_score]
+    passing.sort(key=lambda item: item[1], reverse=True)
+    return len(passing), passing[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes")
+    parser.add_argument("--shards-per-worker", type=int, default=1)
+    parser.add_argument("--min-score", type=float, default=60.0)
+    parser.add_argument("--top-k", type=int, default=500)
+    parser.add_argument("--malformed", type=float, default=0.01, help="share of students with a malformed field")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    students = [random_student(rng) for _ in range(args.students)]
+    for student in students:
+        if rng.random() < args.malformed:
+            corrupt_student(rng, student)
+    for i, student in enumerate(students):
+        student['id'] = f"student-{i}"  # unique, so top-K lists compare exactly
+    matchers = [SessionMatcher(*random_session(rng)) for _ in range(args.sessions)]
+
+    start = time.perf_counter()
+    features = MatchFeatures(students)
+    print(f"students:        {len(features)} ({features.nbytes / 1e6:.1f} MB mapped, "
+          f"built in {time.perf_counter() - start:.2f}s)")
+
+    start = time.perf_counter()
+    expected = [serial_top(students, matcher, args.min_score, args.top_k) for matcher in matchers]
+    serial_ms = (time.perf_counter() - start) / len(matchers) * 1000
+    print(f"per-student loop: {serial_ms:9.1f} ms/session")
+
+    disagreements = 0
+
+    def run(label: str, executor=None, shards: int = 1) -> float:
+        nonlocal disagreements
+        score_population(features, matchers[0], {}, args.min_score, args.top_k, executor, shards)  # warm-up
+        start = time.perf_counter()
+        results = [score_population(features, matcher, {}, args.min_score, args.top_k, executor, shards)
+                   for matcher in matchers]
+        elapsed_ms = (time.perf_counter() - start) / len(matchers) * 1000
+        for (count, top), (expected_count, expected_top) in zip(results, expected):
+            if count != expected_count or [student_id for student_id, _ in top] != [student_id for student_id, _ in expected_top]:
+                disagreements += 1
+        print(f"{label:<17}{elapsed_ms:9.1f} ms/session  ({serial_ms / elapsed_ms:.1f}x loop)")
+        return elapsed_ms
+
+    run("in-process:")
+    baseline = first = None
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            elapsed_ms = run(f"pool x{workers}:", pool, workers * args.shards_per_worker)
+        baseline, first = baseline or elapsed_ms, first or workers
+        print(f"{'':<17}speedup over x{first}: {baseline / elapsed_ms:.2f}")
+
+    print(f"disagreements:   {disagreements}")
+    sys.exit(1 if disagreements else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Startup-time benchmark for the API process.
+
+Starts `uvicorn embed_resume:app` in a fresh process --runs times and
+measures, from process launch:
+  - accepting: first HTTP response from GET /ready (200 or 503)
+  - ready:     first 200 from GET /ready, i.e. the warm-up has finished
+and reports the median of each with the import/startup/warm-up split the
+app reports itself. --imports prints the slowest module imports
+(python -X importtime).
+
+By default the in-memory data backend and hash embedder are used so the
+numbers do not depend on Supabase or Ollama; pass --live to start with the
+environment's real configuration.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 3 --imports 15
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(env: dict, timeout: float) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/ready"
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "embed_resume:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    accepting = ready = None
+    state = {}
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - launched < timeout:
+                try:
+                    response = client.get(url)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                now = time.perf_counter() - launched
+                accepting = accepting if accepting is not None else now
+                if response.status_code == 200:
+                    ready = now
+                    state = response.json()
+                    break
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    if ready is None:
+        raise RuntimeError(f"server was not ready within {timeout}s")
+    return {"accepting": accepting, "ready": ready, **{k: state.get(k) for k in ("import_seconds", "startup_seconds", "warmup_seconds")}}
+
+
+def slowest_imports(env: dict, count: int) -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import embed_resume"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            rows.append((int(fields[1]), fields[2].rstrip()))
+        except ValueError:
+            continue  # column header
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--imports", type=int, default=0, help="show the N slowest imports")
+    parser.add_argument("--live", action="store_true", help="use the real data and embedding backends")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.live:
+        env.update({"DATA_BACKEND": "memory", "EMBEDDING_BACKEND": "hash", "ROW_CACHE_NOTIFY_DSN": ""})
+    state_dir = tempfile.mkdtemp(prefix="talentmap-startup-")
+    env.setdefault("RESUME_JOB_DB", os.path.join(state_dir, "jobs.sqlite3"))
+    env.setdefault("EMBEDDING_RETRY_DB", os.path.join(state_dir, "embedding_retries.sqlite3"))
+
+    runs = [measure_once(env, args.timeout) for _ in range(args.runs)]
+    for key in ("accepting", "ready", "import_seconds", "startup_seconds", "warmup_seconds"):
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            print(f"{key:<16} median {statistics.median(values) * 1000:8.1f} ms   "
+                  f"min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+
+    if args.imports:
+        print("\nslowest imports (cumulative):")
+        for cumulative_us, name in slowest_imports(env, args.imports):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
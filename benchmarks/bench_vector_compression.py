@@ -0,0 +1,100 @@
+"""
+Benchmark for the compressed student index modes.
+
+Synthetic embeddings are drawn from a low-rank latent model plus noise, so
+they have the kind of structure PCA can exploit (isotropic random vectors
+would not). Each mode is compared against exact float32 search and reports
+recall@k, resident memory of the scan structures, build time and query
+latency percentiles.
+
+    python benchmarks/bench_vector_compression.py --students 100000 --components 256
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vector_index import CompressedVectorIndex, MultiVectorIndex  # noqa: E402
+
+
+def make_embeddings(n: int, dim: int, rank: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    basis = rng.standard_normal((rank, dim), dtype=np.float32)
+    # Decaying latent variances, like the spectrum of real sentence embeddings
+    latent = rng.standard_normal((n, rank), dtype=np.float32) / np.sqrt(np.arange(1, rank + 1, dtype=np.float32))
+    return latent @ basis + noise * rng.standard_normal((n, dim), dtype=np.float32)
+
+
+def percentile_ms(samples: list[float], pct: float) -> float:
+    return float(np.percentile(samples, pct) * 1000)
+
+
+def run_mode(name, index, queries, exact_top, k):
+    index.search(queries[0], k=k)  # warm-up
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, exact_top):
+        start = time.perf_counter()
+        got = index.search(query, k=k)
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected & {student_id for student_id, _ in got})
+    recall = hits / sum(len(expected) for expected in exact_top)
+    print(f"{name:<24} {index.nbytes / 1e6:>9.1f} MB  recall@{k} {recall:.3f}  "
+          f"p50/p95/p99 {percentile_ms(latencies, 50):.2f} / {percentile_ms(latencies, 95):.2f} / "
+          f"{percentile_ms(latencies, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--rank", type=int, default=128, help="latent rank of the synthetic embeddings")
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--components", type=int, default=256)
+    parser.add_argument("--rerank-factor", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Resume and summary vectors share a latent space; queries are drawn from it too
+    data = make_embeddings(2 * args.students + args.queries, args.dim, args.rank, args.noise, rng)
+    resume = data[:args.students]
+    summary = data[args.students:2 * args.students]
+    queries = data[2 * args.students:]
+    ids = [f"student-{i}" for i in range(args.students)]
+
+    exact = MultiVectorIndex(ids, resume, summary)
+    del data, resume, summary
+    exact_top = [{student_id for student_id, _ in exact.search(query, k=args.k)} for query in queries]
+
+    print(f"students: {args.students}  dimension: {args.dim}  components: {args.components}  "
+          f"rerank factor: {args.rerank_factor}")
+    run_mode("exact float32", exact, queries, exact_top, args.k)
+
+    modes = [
+        ("int8", "none", "int8"),
+        ("pca", "pca", "none"),
+        ("pca + int8", "pca", "int8"),
+        ("truncate + int8", "truncate", "int8"),
+    ]
+    for name, reduction, quantization in modes:
+        start = time.perf_counter()
+        index = CompressedVectorIndex(
+            exact,
+            reduction=reduction,
+            n_components=args.components,
+            quantization=quantization,
+            rerank_factor=args.rerank_factor,
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+        run_mode(f"{name} ({build_ms:.0f} ms)", index, queries, exact_top, args.k)
+        del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Load test for the backend endpoints on synthetic data.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the in-memory
+data backend (fake_backend.FakeSupabase) and the deterministic HashEmbedder,
+so no database, Ollama or network is needed. For each population size it
+seeds students, profiles, stored resume PDFs and a hiring session, then
+times resume upload, search (semantic, hybrid, skills-only), matching,
+detailed and batch analysis, analytics and both exports. Measuring starts
+once GET /ready reports the startup warm-up done, and each scenario gets
+one unmeasured warm-up request (cache fills) before the measured ones.
+Backend logging is silenced while requests run.
+
+Reports p50/p95/p99 per scenario. With --baseline, any scenario whose p95
+exceeds the baseline p95 by more than --tolerance is reported as a
+regression and the exit code is 1.
+
+    python benchmarks/load_test.py --sizes 1000,10000 --requests 30
+    python benchmarks/load_test.py --sizes 1000 --save-baseline load_baseline.json
+    python benchmarks/load_test.py --sizes 1000 --baseline load_baseline.json
+
+100k students need roughly 5 GB of memory (stored vector text plus the
+search index).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Must be set before the app module is imported
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["EMBEDDING_BACKEND"] = "hash"
+os.environ["GROQ_API_KEY"] = ""
+os.environ["OLLAMA_SUMMARY_MODEL"] = ""
+_state_dir = tempfile.mkdtemp(prefix="talentmap-load-")
+os.environ.setdefault("RESUME_JOB_DB", os.path.join(_state_dir, "jobs.sqlite3"))
+os.environ.setdefault("EMBEDDING_RETRY_DB", os.path.join(_state_dir, "embedding_retries.sqlite3"))
+
+import httpx  # noqa: E402
+
+import embed_resume  # noqa: E402
+from bench_match_kernel import SKILLS, EDUCATION, random_student  # noqa: E402
+from embedders import HashEmbedder  # noqa: E402
+from fake_backend import FakeSupabase  # noqa: E402
+
+DEPARTMENTS = ["Computer Science", "Information Technology", "Electronics", "Mechanical", "Civil"]
+COMPANIES = ["Acme", "Initech", "Globex", "Umbrella", "Hooli"]
+
+
+def make_pdf(lines: list[str]) -> bytes:
+    """
+    Builds a one-page PDF with the given text lines (Helvetica, no compression).
+    """
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    content = "BT /F1 10 Tf 40 760 Td 13 TL " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return pdf
+
+
+def resume_lines(rng: random.Random, name: str) -> list[str]:
+    skills = rng.sample(SKILLS, rng.randint(4, 12))
+    company = rng.choice(COMPANIES)
+    return [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +91 98765 43210",
+        "EDUCATION",
+        f"{rng.choice(EDUCATION)} in {rng.choice(DEPARTMENTS)}, 2021 - 2025",
+        f"CGPA: {rng.uniform(6.0, 9.8):.2f}",
+        f"12th: {rng.uniform(60, 98):.1f}%   10th: {rng.uniform(60, 98):.1f}%",
+        "SKILLS",
+        ", ".join(skills),
+        "EXPERIENCE",
+        f"Software Engineering Intern at {company}, May 2024 - Jul 2024",
+        f"Built REST APIs with {skills[0]} and {skills[1]} serving 10k daily users",
+        "PROJECTS",
+        f"Resume Matcher - search engine using {skills[2]} and {skills[3]}",
+        "Campus Connect - event app with realtime notifications",
+        "CERTIFICATIONS",
+        "AWS Certified Cloud Practitioner",
+    ]
+
+
+def random_unit_vectors(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def seed_backend(size: int, seed: int) -> tuple[FakeSupabase, list[str], str]:
+    """
+    Returns (client, student ids, session id) for `size` synthetic students.
+    """
+    rng = random.Random(seed)
+    vector_rng = np.random.default_rng(seed)
+    client = FakeSupabase()
+    resumes = client.storage.from_("resumes")
+    resume_base = f"{embed_resume.SUPABASE_URL}/storage/v1/object/public/resumes/"
+    pdfs = [make_pdf(resume_lines(rng, f"Sample Student {i}")) for i in range(50)]
+
+    student_ids = []
+    students = []
+    profiles = []
+    chunk = 5000
+    for start in range(0, size, chunk):
+        count = min(chunk, size - start)
+        resume_vectors = random_unit_vectors(vector_rng, count, embed_resume.EMBEDDING_DIM)
+        summary_vectors = random_unit_vectors(vector_rng, count, embed_resume.EMBEDDING_DIM)
+        for offset in range(count):
+            i = start + offset
+            student = random_student(rng)
+            student_id = f"00000000-0000-4000-8000-{i:012d}"
+            path = f"{student_id}/resume.pdf"
+            resumes.upload(path, pdfs[i % len(pdfs)])
+            student.update({
+                "id": student_id,
+                "department": rng.choice(DEPARTMENTS),
+                "resume_url": resume_base + path,
+                "ats_score": rng.randint(30, 95),
+                "summary": f"Student skilled in {', '.join(student['skills'][:3]) or 'general engineering'}.",
+                "resume_embeddings": resume_vectors[offset],
+                "summary_embedding": summary_vectors[offset],
+            })
+            students.append(student)
+            profiles.append({
+                "id": student_id,
+                "full_name": f"Student {i}",
+                "email": f"student{i}@example.com",
+                "role": "student",
+            })
+            student_ids.append(student_id)
+        client.seed("students", students)
+        client.seed("profiles", profiles)
+        students, profiles = [], []
+
+    session_id = "11111111-0000-4000-8000-000000000001"
+    client.seed("hiring_sessions", [{
+        "id": session_id,
+        "title": "Backend Engineer Intern",
+        "description": "Backend intern working on Python and SQL services, REST APIs and Docker deployments.",
+        "requirements": {"required_skills": ["Python", "SQL", "Docker", "REST APIs", "Git"]},
+        "eligibility_criteria": {
+            "education": ["B.Tech", "Computer Science"],
+            "experience_years": 0,
+            "cgpa_minimum": 7.0,
+            "eligible_years": [3, 4],
+        },
+        "status": "active",
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+    }])
+    return client, student_ids, session_id
+
+
+def build_scenarios(rng: random.Random, student_ids: list[str], session_id: str) -> dict:
+    """
+    Scenario name -> factory returning (method, url, request kwargs) for one request.
+    """
+    words = ["python", "backend", "machine learning", "react", "data", "cloud", "intern", "sql", "docker", "api"]
+
+    def query() -> str:
+        return " ".join(rng.sample(words, 3)) + f" {rng.randrange(10**6)}"
+
+    def upload():
+        student_id = rng.choice(student_ids)
+        pdf = make_pdf(resume_lines(rng, f"Uploaded Student {rng.randrange(10**6)}"))
+        return "POST", "/embed-resume/", {
+            "data": {"student_id": student_id},
+            "files": {"file": ("resume.pdf", pdf, "application/pdf")},
+        }
+
+    return {
+        "search_semantic": lambda: ("POST", "/search-students/", {"json": {"query": query(), "limit": 10}}),
+        "search_hybrid": lambda: ("POST", "/search-students/", {
+            "json": {"query": query(), "skills": rng.sample(SKILLS, 2), "limit": 10},
+        }),
+        "search_skills": lambda: ("POST", "/search-students/", {
+            "json": {"skills": rng.sample(SKILLS, 2), "limit": rng.randint(5, 50)},
+        }),
+        "find_matching": lambda: ("POST", f"/find-matching-students/{session_id}", {"params": {"min_score": 60}}),
+        "detailed_analysis": lambda: ("GET", f"/detailed-match-analysis/{session_id}/{rng.choice(student_ids)}", {}),
+        "batch_analysis": lambda: ("POST", f"/batch-detailed-match-analysis/{session_id}", {
+            "json": rng.sample(student_ids, min(50, len(student_ids))),
+        }),
+        "analytics": lambda: ("GET", f"/session-analytics/{session_id}", {}),
+        "export_csv": lambda: ("POST", "/download-students-csv/", {
+            "json": rng.sample(student_ids, min(100, len(student_ids))),
+        }),
+        "export_zip": lambda: ("POST", "/download-resumes-zip/", {
+            "json": rng.sample(student_ids, min(20, len(student_ids))),
+        }),
+        # Last: every upload invalidates the search index
+        "upload": upload,
+    }
+
+
+def percentiles_ms(samples: list[float]) -> dict:
+    return {f"p{p}": round(float(np.percentile(samples, p)) * 1000, 2) for p in (50, 95, 99)}
+
+
+async def run_size(size: int, requests: int, seed: int) -> dict:
+    start = time.perf_counter()
+    client, student_ids, session_id = seed_backend(size, seed)
+    embed_resume.configure_backends(client, HashEmbedder(embed_resume.EMBEDDING_DIM))
+    print(f"\n{size} students (seeded in {time.perf_counter() - start:.1f}s)")
+
+    results = {}
+    rng = random.Random(seed)
+    transport = httpx.ASGITransport(app=embed_resume.app)
+    async with embed_resume.app.router.lifespan_context(embed_resume.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+            while (await http.get("/ready")).status_code != 200:
+                await asyncio.sleep(0.05)
+            for name, make_request in build_scenarios(rng, student_ids, session_id).items():
+                samples = []
+                failures = 0
+                for i in range(requests + 1):
+                    method, url, kwargs = make_request()
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        started = time.perf_counter()
+                        response = await http.request(method, url, **kwargs)
+                        elapsed = time.perf_counter() - started
+                    if response.status_code >= 400:
+                        failures += 1
+                    if i > 0:
+                        samples.append(elapsed)
+                results[name] = {**percentiles_ms(samples), "failures": failures}
+                print(f"  {name:<18} p50 {results[name]['p50']:>9.2f} ms  p95 {results[name]['p95']:>9.2f} ms  "
+                      f"p99 {results[name]['p99']:>9.2f} ms" + (f"  ({failures} failed)" if failures else ""))
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, scenarios in results.items():
+        for name, stats in scenarios.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous and stats["p95"] > previous["p95"] * (1 + tolerance):
+                regressions.append(
+                    f"{size} students / {name}: p95 {stats['p95']:.2f} ms vs baseline {previous['p95']:.2f} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated student counts, e.g. 1000,10000,100000")
+    parser.add_argument("--requests", type=int, default=30, help="measured requests per scenario")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", help="JSON results from an earlier --save-baseline run")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        results[str(size)] = asyncio.run(run_size(size, args.requests, args.seed))
+
+    failed = [f"{size}/{name}" for size, scenarios in results.items() for name, s in scenarios.items() if s["failures"]]
+    if failed:
+        print(f"\nScenarios with failed requests: {', '.join(failed)}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%})")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
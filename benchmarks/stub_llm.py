@@ -0,0 +1,94 @@
+"""
+Stub Groq and Ollama chat servers for exercising the summary client locally.
+
+Serves Groq's OpenAI-compatible POST /openai/v1/chat/completions and Ollama's
+POST /api/chat, answering with a canned summary of the user message after a
+fixed latency, with a configurable failure rate and status per provider.
+GET /stats reports request counts and the peak number of concurrent
+requests. Point the app at it with:
+
+    python benchmarks/stub_llm.py --port 11601 --groq-latency-ms 200 --groq-fail-rate 0.2
+    GROQ_API_KEY=stub GROQ_API_BASE=http://127.0.0.1:11601/openai/v1 \\
+        OLLAMA_BASE_URL=http://127.0.0.1:11601 OLLAMA_SUMMARY_MODEL=llama3.2 \\
+        uvicorn embed_resume:app
+"""
+import argparse
+import asyncio
+import random
+
+
+def create_app(groq_latency_ms: float = 0.0, groq_fail_rate: float = 0.0, groq_fail_status: int = 500,
+               ollama_latency_ms: float = 0.0, ollama_fail_rate: float = 0.0, seed: int = 0):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    rng = random.Random(seed)
+    state = {"groq": 0, "ollama": 0, "in_flight": 0, "max_in_flight": 0}
+    app.state.stats = state
+
+    def summary_of(data: dict) -> str:
+        user = [m.get("content", "") for m in data.get("messages", []) if m.get("role") == "user"]
+        return "Summary: " + (user[-1] if user else "")[:80]
+
+    async def serve(provider: str, latency_ms: float, fail_rate: float, fail_status: int, request: Request, respond):
+        state[provider] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            data = await request.json()
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000.0)
+            if rng.random() < fail_rate:
+                return JSONResponse({"error": "stub failure"}, status_code=fail_status)
+            return respond(data, summary_of(data))
+        finally:
+            state["in_flight"] -= 1
+
+    @app.post("/openai/v1/chat/completions")
+    async def groq_chat(request: Request):
+        return await serve(
+            "groq", groq_latency_ms, groq_fail_rate, groq_fail_status, request,
+            lambda data, content: {
+                "model": data.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+            },
+        )
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        return await serve(
+            "ollama", ollama_latency_ms, ollama_fail_rate, 500, request,
+            lambda data, content: {
+                "model": data.get("model"),
+                "message": {"role": "assistant", "content": content},
+                "done": True,
+            },
+        )
+
+    @app.get("/stats")
+    async def stats():
+        return dict(state)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11601)
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0)
+    parser.add_argument("--groq-fail-rate", type=float, default=0.0)
+    parser.add_argument("--groq-fail-status", type=int, default=500, help="e.g. 429 to simulate rate limiting")
+    parser.add_argument("--ollama-latency-ms", type=float, default=0.0)
+    parser.add_argument("--ollama-fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.groq_latency_ms, args.groq_fail_rate, args.groq_fail_status,
+                     args.ollama_latency_ms, args.ollama_fail_rate, seed=args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
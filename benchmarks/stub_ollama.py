@@ -0,0 +1,97 @@
+"""
+Stub Ollama embeddings server for exercising the embedding pool locally.
+
+Serves POST /api/embeddings and the batch POST /api/embed with
+deterministic HashEmbedder vectors, and GET /api/tags, with configurable latency, error rate and a cold start (the
+first request waits as if the model were being loaded). Latency and error
+rate can be changed while serving through app.state.config, e.g. to take an
+endpoint down and bring it back in tests. Run several on different ports and
+point OLLAMA_EMBEDDING_URLS at them:
+
+    python benchmarks/stub_ollama.py --port 11501 --latency-ms 20
+    python benchmarks/stub_ollama.py --port 11502 --fail-rate 0.5 --cold-start-seconds 5
+    OLLAMA_EMBEDDING_URLS=http://127.0.0.1:11501/api/embeddings,http://127.0.0.1:11502/api/embeddings \\
+        uvicorn embed_resume:app
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from embedders import HashEmbedder  # noqa: E402
+
+
+def create_app(latency_ms: float = 0.0, fail_rate: float = 0.0, cold_start_seconds: float = 0.0,
+               dim: int = 1024, model: str = "bge-m3:latest", seed: int = 0):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    embedder = HashEmbedder(dim)
+    rng = random.Random(seed)
+    state = {"loaded": cold_start_seconds <= 0, "loading": None, "requests": 0}
+    config = {"latency_ms": latency_ms, "fail_rate": fail_rate}
+    app.state.stats = state
+    app.state.config = config
+
+    async def respond_delay():
+        if config["latency_ms"]:
+            await asyncio.sleep(rng.expovariate(1000.0 / config["latency_ms"]))
+
+    async def load_model():
+        if state["loaded"]:
+            return
+        if state["loading"] is None:
+            state["loading"] = asyncio.create_task(asyncio.sleep(cold_start_seconds))
+        await state["loading"]
+        state["loaded"] = True
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: Request):
+        state["requests"] += 1
+        data = await request.json()
+        await load_model()
+        await respond_delay()
+        if rng.random() < config["fail_rate"]:
+            return JSONResponse({"error": "stub failure"}, status_code=500)
+        return {"embedding": embedder.embed_sync(data.get("prompt", ""))}
+
+    @app.post("/api/embed")
+    async def embed_batch(request: Request):
+        state["requests"] += 1
+        data = await request.json()
+        await load_model()
+        await respond_delay()
+        if rng.random() < config["fail_rate"]:
+            return JSONResponse({"error": "stub failure"}, status_code=500)
+        inputs = data.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        return {"model": model, "embeddings": [embedder.embed_sync(text) for text in inputs]}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": model}], "requests": state["requests"]}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11501)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean of exponentially distributed latency")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--cold-start-seconds", type=float, default=0.0)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency_ms, args.fail_rate, args.cold_start_seconds, args.dim, seed=args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
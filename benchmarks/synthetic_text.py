@@ -0,0 +1,157 @@
+"""
+Synthetic resume and job-description text for benchmarks.
+
+generate_resume() returns 400-900 words laid out like text extracted from a
+student resume PDF. Section headings, bullet styles and academic-score
+formats vary, and `noise` controls how much PDF-extraction debris is mixed
+in: page footers, split lines, doubled spaces, ligatures, stray casing.
+generate_job_description() returns a recruiter-style posting with skills,
+experience, CGPA and eligible-year phrasing in the forms the job extractors
+look for.
+"""
+import random
+
+SKILL_POOL = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Kotlin", "SQL", "MySQL",
+    "PostgreSQL", "MongoDB", "Redis", "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask",
+    "Spring", "HTML", "CSS", "Tailwind", "Bootstrap", "AWS", "Azure", "GCP", "Docker", "Kubernetes",
+    "Jenkins", "CI/CD", "Terraform", "Linux", "Git", "GitHub", "Machine Learning", "Deep Learning",
+    "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy", "OpenCV", "NLP", "Computer Vision",
+    "Spark", "Kafka", "Airflow", "LangChain", "LLM", "RAG", "GraphQL", "REST API", "Microservices",
+    "Agile", "Jira", "Postman", "Figma", "Flutter", "Android", "Selenium", "PyTest", "Jest",
+]
+FILLER_WORDS = [
+    "scalable", "team", "performance", "users", "pipeline", "dashboard", "latency", "service", "model",
+    "dataset", "feature", "module", "deployment", "automation", "integration", "testing", "workflow",
+    "accuracy", "reporting", "analysis", "design", "cloud", "mobile", "backend", "frontend", "students",
+]
+DEGREES = ["B.Tech", "B.E.", "B.Sc", "BCA", "M.Tech", "MCA", "Bachelor of Technology", "Bachelor of Engineering"]
+BRANCHES = [
+    "Computer Science", "Information Technology", "Electronics and Communication", "Electrical Engineering",
+    "Mechanical Engineering", "Artificial Intelligence and Data Science",
+]
+COLLEGES = ["National Institute of Technology", "Anna University", "VIT", "SRM Institute", "PSG College of Technology"]
+COMPANIES = ["Infosys", "TCS", "Zoho", "Freshworks", "Acme Labs", "Globex", "Initech", "Razorpay", "Swiggy"]
+ROLES = ["Software Engineering Intern", "Data Science Intern", "Backend Developer", "ML Engineer Intern",
+         "Web Developer", "Research Assistant", "Full Stack Developer Intern"]
+HEADINGS = {
+    "summary": ["SUMMARY", "Profile", "Career Objective", "OBJECTIVE:"],
+    "education": ["EDUCATION", "Education:", "Academic Background", "Educational Qualifications"],
+    "skills": ["SKILLS", "Technical Skills", "Key Skills:", "Technologies"],
+    "experience": ["EXPERIENCE", "Work Experience", "Internships", "Professional Experience:"],
+    "projects": ["PROJECTS", "Academic Projects", "Key Projects:", "Personal Projects"],
+    "certifications": ["CERTIFICATIONS", "Certificates"],
+    "achievements": ["ACHIEVEMENTS", "Honors and Awards", "Awards:"],
+    "activities": ["Extra-Curricular Activities", "Activities", "Volunteering"],
+}
+BULLETS = ["• ", "- ", "* ", "", "● "]
+
+
+def _sentence(rng: random.Random, skills: list[str], words: int) -> str:
+    parts = [rng.choice(FILLER_WORDS) for _ in range(words)]
+    for skill in rng.sample(skills, min(len(skills), rng.randint(1, 2))):
+        parts.insert(rng.randrange(len(parts) + 1), skill)
+    verb = rng.choice(["Built", "Developed", "Designed", "Implemented", "Optimized", "Led", "Created"])
+    return f"{verb} {' '.join(parts)}."
+
+
+def _academic_lines(rng: random.Random) -> list[str]:
+    cgpa = rng.choice([
+        f"CGPA: {rng.uniform(6.0, 9.9):.2f}", f"CGPA {rng.uniform(6.0, 9.9):.1f}/10",
+        f"GPA: {rng.uniform(2.5, 4.0):.2f}", f"Cumulative GPA: {rng.uniform(6.0, 9.9):.2f}",
+    ])
+    twelfth = rng.choice(["12th", "Class 12", "HSC", "Higher Secondary"]) + f": {rng.uniform(60, 98):.1f}%"
+    tenth = rng.choice(["10th", "Class 10", "SSLC", "Matriculation"]) + f": {rng.uniform(60, 99):.1f}%"
+    return [cgpa, twelfth, tenth]
+
+
+def _add_noise(lines: list[str], rng: random.Random, noise: float) -> list[str]:
+    noisy = []
+    for i, line in enumerate(lines):
+        if rng.random() < noise * 0.3:
+            line = line.replace("fi", "ﬁ").replace("fl", "ﬂ")
+        if rng.random() < noise * 0.3:
+            line = line.replace(" ", "  ", rng.randint(1, 3))
+        if rng.random() < noise * 0.2 and len(line) > 40:
+            cut = rng.randrange(20, len(line) - 10)
+            noisy.extend([line[:cut] + "-", line[cut:]])
+            continue
+        if rng.random() < noise * 0.1:
+            line = line.upper() if rng.random() < 0.5 else line.lower()
+        noisy.append(line)
+        if rng.random() < noise * 0.05:
+            noisy.append(f"Page {i // 40 + 1} of 2")
+    return noisy
+
+
+def generate_resume(rng: random.Random, noise: float = 0.2) -> str:
+    name = f"{rng.choice(['Arjun', 'Priya', 'Rahul', 'Sneha', 'Karthik', 'Divya'])} {rng.choice(['Kumar', 'Sharma', 'Iyer', 'Reddy', 'Nair'])}"
+    skills = rng.sample(SKILL_POOL, rng.randint(6, 18))
+    bullet = rng.choice(BULLETS)
+    heading = {section: rng.choice(options) for section, options in HEADINGS.items()}
+    grad_year = rng.randint(2024, 2027)
+
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@gmail.com | +91 9{rng.randrange(10**9):09d} | linkedin.com/in/{name.split()[0].lower()}",
+        heading["summary"],
+        _sentence(rng, skills, rng.randint(15, 25)),
+        heading["education"],
+        f"{rng.choice(DEGREES)} in {rng.choice(BRANCHES)}, {rng.choice(COLLEGES)} ({grad_year - 4} - {grad_year})",
+        *_academic_lines(rng),
+        heading["skills"],
+    ]
+    if rng.random() < 0.5:
+        lines.append(", ".join(skills))
+    else:
+        chunk = max(1, len(skills) // 3)
+        for label, start in (("Languages", 0), ("Frameworks", chunk), ("Tools", 2 * chunk)):
+            lines.append(f"{label}: {', '.join(skills[start:start + chunk])}")
+
+    lines.append(heading["experience"])
+    for _ in range(rng.randint(1, 3)):
+        month = rng.choice(["Jan", "May", "Jun", "Dec"])
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({month} {rng.randint(2022, 2025)} - Present)")
+        lines.extend(bullet + _sentence(rng, skills, rng.randint(10, 20)) for _ in range(rng.randint(2, 4)))
+
+    lines.append(heading["projects"])
+    for _ in range(rng.randint(2, 5)):
+        title = " ".join(w.capitalize() for w in rng.sample(FILLER_WORDS, 2))
+        lines.append(f"{title} | {', '.join(rng.sample(skills, min(3, len(skills))))}")
+        lines.extend(bullet + _sentence(rng, skills, rng.randint(12, 22)) for _ in range(rng.randint(1, 3)))
+
+    lines.append(heading["certifications"])
+    lines.extend(bullet + c for c in rng.sample([
+        "AWS Certified Cloud Practitioner", "Google Data Analytics Certificate", "NPTEL Python for Data Science",
+        "Coursera Deep Learning Specialization", "Oracle Certified Java Programmer",
+    ], rng.randint(1, 3)))
+    lines.append(heading["achievements"])
+    lines.extend(bullet + _sentence(rng, skills, rng.randint(8, 14)) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.6:
+        lines.append(heading["activities"])
+        lines.extend(bullet + _sentence(rng, skills, rng.randint(8, 12)) for _ in range(rng.randint(1, 2)))
+
+    return "\n".join(_add_noise(lines, rng, noise))
+
+
+def generate_job_description(rng: random.Random, noise: float = 0.1) -> str:
+    skills = rng.sample(SKILL_POOL, rng.randint(4, 10))
+    role = rng.choice(["Software Engineer", "Data Scientist", "Backend Developer", "ML Engineer", "Full Stack Developer"])
+    years = rng.choice(["final year", "3rd year", "fourth year", "2025 batch", "freshers"])
+    lines = [
+        f"{role} - {rng.choice(COMPANIES)}",
+        f"We are hiring a {role} to join our {rng.choice(FILLER_WORDS)} team working on {rng.choice(FILLER_WORDS)} systems.",
+        "Responsibilities:",
+        *(f"- {_sentence(rng, skills, rng.randint(8, 14))}" for _ in range(rng.randint(3, 6))),
+        "Requirements:",
+        f"- Experience with {', '.join(skills[:3])} and {skills[3]} is required.",
+        f"- Knowledge of {rng.choice(skills)} or {rng.choice(SKILL_POOL)} preferred.",
+        f"- {rng.randint(0, 3)}+ years of experience in software development.",
+        f"- {rng.choice(['B.Tech', 'B.E', 'Bachelor’s', 'M.Tech'])} in {rng.choice(['Computer Science', 'Information Technology', 'Electronics Engineering'])}.",
+        f"- Minimum CGPA of {rng.choice(['6.5', '7.0', '7.5', '8'])}.",
+        f"- Open to {years} students.",
+        f"Tools: {', '.join(rng.sample(SKILL_POOL, 3))}.",
+        f"Must have strong {rng.choice(FILLER_WORDS)} and communication skills.",
+        f"Good to have: {rng.choice(SKILL_POOL)} certification.",
+    ]
+    return "\n".join(_add_noise(lines, rng, noise))
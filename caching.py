@@ -0,0 +1,192 @@
+"""
+Small in-process caching primitives shared by the API.
+
+TTLCache is a thread-safe LRU with per-entry expiry and hit/miss counters.
+ReadThroughCache puts a loader in front of one, for rows read by key.
+SingleFlight coalesces concurrent async calls for the same key so only one of
+them does the work and the rest await its result.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire `ttl_seconds` after they were set.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 60.0, name: str = ""):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class ReadThroughCache:
+    """
+    TTLCache that loads missing keys with `loader(key)` (single) or
+    `bulk_loader(keys) -> {key: value}` (many). None results are not cached,
+    so missing rows are looked up again next time. A `ttl_seconds` of 0
+    disables caching: every read goes to the loader.
+
+    Every invalidation bumps a generation counter; a value loaded while an
+    invalidation happened is returned but not stored, since it may predate
+    the change that was invalidated.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Hashable], Any],
+        bulk_loader: Optional[Callable[[list], Dict[Hashable, Any]]] = None,
+        maxsize: int = 1024,
+        ttl_seconds: float = 60.0,
+        name: str = "",
+    ):
+        self._loader = loader
+        self._bulk_loader = bulk_loader
+        self._cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds, name=name)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.invalidations = 0
+        self.stale_loads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.ttl_seconds > 0
+
+    def _store(self, loaded: Dict[Hashable, Any], generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                self.stale_loads += 1
+                return
+            for key, value in loaded.items():
+                if value is not None:
+                    self._cache.set(key, value)
+
+    def get(self, key: Hashable) -> Any:
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self._generation
+            value = self._loader(key)
+            self._store({key: value}, generation)
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Returns {key: value} for the keys that exist, loading all misses in one bulk call.
+        """
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            generation = self._generation
+            if self._bulk_loader is not None:
+                loaded = self._bulk_loader(missing)
+            else:
+                loaded = {key: self._loader(key) for key in missing}
+            self._store(loaded, generation)
+            found.update((key, value) for key, value in loaded.items() if value is not None)
+        return found
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "invalidations": self.invalidations, "stale_loads": self.stale_loads}
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its result or exception.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield() so one cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
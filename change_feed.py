@@ -0,0 +1,110 @@
+"""
+Optional Postgres LISTEN/NOTIFY listener for invalidating process-local caches
+when rows are changed outside this backend (dashboard edits, other workers).
+
+Needs the asyncpg package and a direct database DSN. The notify_row_change
+trigger (see supabase/migrations) sends a JSON payload such as
+{"table": "students", "id": "...", "session_id": null} for every insert,
+update and delete. After a (re)connect the handler receives {"table": "*"},
+since notifications sent while disconnected are lost.
+"""
+import asyncio
+import json
+import traceback
+from typing import Callable, Optional
+
+try:
+    import asyncpg
+except ImportError:  # optional dependency
+    asyncpg = None
+
+
+class RowChangeListener:
+    """
+    Listens on `channel` and calls `handler(payload_dict)` for each notification,
+    reconnecting every `reconnect_seconds` while the database is unreachable.
+    """
+
+    def __init__(self, dsn: Optional[str], channel: str, handler: Callable[[dict], None], reconnect_seconds: float = 5.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.handler = handler
+        self.reconnect_seconds = reconnect_seconds
+        self.notifications = 0
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.dsn) and asyncpg is not None
+
+    async def start(self) -> None:
+        if not self.dsn:
+            return
+        if asyncpg is None:
+            print("Row change listener disabled: asyncpg package is not installed")
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, payload: dict) -> None:
+        try:
+            self.handler(payload)
+        except Exception as e:
+            print(f"Row change handler error: {e}")
+            traceback.print_exc()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            print(f"Ignoring malformed row change payload: {payload!r}")
+            return
+        self._dispatch(data)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            connection = None
+            lost = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                print(f"Listening for row changes on '{self.channel}'")
+                # Anything changed while we were not listening is unknown
+                self._dispatch({"table": "*"})
+
+                stop_wait = asyncio.create_task(self._stopping.wait())
+                lost_wait = asyncio.create_task(lost.wait())
+                done, pending = await asyncio.wait({stop_wait, lost_wait}, return_when=asyncio.FIRST_COMPLETED)
+                for task in pending:
+                    task.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Row change listener error: {e}")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    try:
+                        await connection.close()
+                    except Exception:
+                        pass
+            if not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.reconnect_seconds)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,294 @@
+"""
+Text embedding backends.
+
+OllamaEmbedder calls the Ollama embeddings API (bge-m3 in production).
+HashEmbedder is a deterministic offline stand-in for tests and load tests:
+it hashes word unigrams and bigrams into a fixed number of dimensions, so
+texts sharing words get similar vectors without any model or network.
+Both expose `async embed(text) -> list[float]` and
+`async embed_batch(texts) -> list[list[float]]`, and raise on failure.
+
+EmbeddingPool spreads requests over several embedders (one per Ollama
+endpoint). It routes each request to the healthy endpoint with the fewest
+requests in flight, fails over to the next one on error, and opens a
+circuit breaker on an endpoint after repeated failures. A background probe
+keeps every endpoint's model loaded and closes circuits again once the
+endpoint recovers.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+
+class EmbeddingUnavailable(Exception):
+    """
+    Raised by EmbeddingPool when no endpoint could produce an embedding.
+    """
+
+
+class OllamaEmbedder:
+    """
+    Keeps one pooled HTTP client per event loop, so consecutive requests
+    reuse connections instead of opening a new one each time.
+    """
+
+    def __init__(self, url: str, model: str, timeout_seconds: float = 30.0):
+        self.name = url
+        self.url = url
+        # Batches go to /api/embed, which takes a list of inputs in one request
+        self.batch_url = url[:-len("/api/embeddings")] + "/api/embed" if url.endswith("/api/embeddings") else None
+        self.model = model
+        self.timeout_seconds = timeout_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+            self._client_loop = loop
+        return self._client
+
+    async def embed(self, text: str) -> list[float]:
+        response = await self._get_client().post(self.url, json={"model": self.model, "prompt": text})
+        response.raise_for_status()
+        return response.json().get("embedding", [])
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if self.batch_url is not None:
+            response = await self._get_client().post(self.batch_url, json={"model": self.model, "input": texts})
+            # Ollama before 0.2 has no /api/embed; fall back to one request per text
+            if response.status_code != 404:
+                response.raise_for_status()
+                return response.json().get("embeddings", [])
+            self.batch_url = None
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+
+
+class HashEmbedder:
+    """
+    Deterministic bag-of-words embedder: every token and token bigram adds a
+    signed unit to a hashed dimension, and the result is L2-normalized.
+    """
+
+    def __init__(self, dim: int = 1024, seed: str = ""):
+        self.name = f"hash-{dim}"
+        self.dim = dim
+        self.seed = seed
+        self.calls = 0
+
+    def _bucket(self, token: str) -> tuple[int, float]:
+        digest = hashlib.blake2b((self.seed + token).encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed_sync(self, text: str) -> list[float]:
+        self.calls += 1
+        tokens = _TOKEN_RE.findall(text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            index, sign = self._bucket(token)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    async def embed(self, text: str) -> list[float]:
+        return self.embed_sync(text)
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_sync(text) for text in texts]
+
+
+class _Endpoint:
+    __slots__ = ("embedder", "name", "outstanding", "consecutive_failures", "open_until",
+                 "requests", "failures", "last_error", "latency_seconds")
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.name = getattr(embedder, "name", repr(embedder))
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0  # circuit is open while time.monotonic() < open_until
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.latency_seconds = 0.0  # moving average of successful calls
+
+
+class EmbeddingPool:
+    """
+    Least-outstanding-requests pool over several embedders with per-endpoint
+    circuit breakers.
+
+    A circuit opens after `failure_threshold` consecutive failures and stays
+    open for `open_seconds`, during which the endpoint gets no traffic. After
+    that it is half-open: one request (or health probe) at a time is let
+    through, and its outcome closes or re-opens the circuit. When every
+    endpoint fails or is open, embed() raises EmbeddingUnavailable at once
+    instead of waiting on a dead backend.
+    """
+
+    def __init__(
+        self,
+        embedders: list,
+        failure_threshold: int = 3,
+        open_seconds: float = 30.0,
+        health_interval_seconds: float = 30.0,
+        probe_text: str = "warm-up",
+    ):
+        if not embedders:
+            raise ValueError("EmbeddingPool needs at least one embedder")
+        self.endpoints = [_Endpoint(embedder) for embedder in embedders]
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.health_interval_seconds = health_interval_seconds
+        self.probe_text = probe_text
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def name(self) -> str:
+        return ",".join(endpoint.name for endpoint in self.endpoints)
+
+    def _state(self, endpoint: _Endpoint) -> str:
+        if endpoint.consecutive_failures < self.failure_threshold:
+            return "closed"
+        return "open" if time.monotonic() < endpoint.open_until else "half_open"
+
+    def _available(self, endpoint: _Endpoint) -> bool:
+        state = self._state(endpoint)
+        return state == "closed" or (state == "half_open" and endpoint.outstanding == 0)
+
+    def _pick(self, tried: set) -> Optional[_Endpoint]:
+        candidates = [e for e in self.endpoints if id(e) not in tried and self._available(e)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: (e.outstanding, e.latency_seconds))
+
+    def _record_success(self, endpoint: _Endpoint, elapsed: float) -> None:
+        endpoint.consecutive_failures = 0
+        endpoint.open_until = 0.0
+        endpoint.latency_seconds = elapsed if endpoint.latency_seconds == 0 else 0.8 * endpoint.latency_seconds + 0.2 * elapsed
+
+    def _record_failure(self, endpoint: _Endpoint, error: Exception) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        endpoint.last_error = str(error) or type(error).__name__
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            if endpoint.consecutive_failures == self.failure_threshold:
+                print(f"Embedding endpoint {endpoint.name} circuit opened: {endpoint.last_error}")
+            endpoint.open_until = time.monotonic() + self.open_seconds
+
+    async def _call(self, endpoint: _Endpoint, texts: list[str], batch: bool = False):
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        started = time.perf_counter()
+        try:
+            if batch:
+                vectors = await endpoint.embedder.embed_batch(texts)
+                if len(vectors) != len(texts) or not all(vectors):
+                    raise ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+                result = vectors
+            else:
+                result = await endpoint.embedder.embed(texts[0])
+                if not result:
+                    raise ValueError("empty embedding")
+        except Exception as e:
+            self._record_failure(endpoint, e)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        self._record_success(endpoint, time.perf_counter() - started)
+        return result
+
+    async def embed(self, text: str) -> list[float]:
+        return await self._embed_with_failover([text], batch=False)
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds all texts in one request to a single endpoint, failing over as a whole.
+        """
+        if not texts:
+            return []
+        return await self._embed_with_failover(texts, batch=True)
+
+    async def _embed_with_failover(self, texts: list[str], batch: bool):
+        tried: set = set()
+        errors = []
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                detail = "; ".join(errors) or "all endpoint circuits are open"
+                raise EmbeddingUnavailable(f"No embedding endpoint available ({detail})")
+            tried.add(id(endpoint))
+            try:
+                return await self._call(endpoint, texts, batch)
+            except Exception as e:
+                errors.append(f"{endpoint.name}: {e or type(e).__name__}")
+
+    async def _probe(self, endpoint: _Endpoint) -> Optional[str]:
+        try:
+            await self._call(endpoint, [self.probe_text])
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    async def warm_up(self) -> dict:
+        """
+        Embeds a short text on every endpoint at once so each loads its model.
+        Returns {endpoint name: error or None}.
+        """
+        results = await asyncio.gather(*(self._probe(endpoint) for endpoint in self.endpoints))
+        return {endpoint.name: error for endpoint, error in zip(self.endpoints, results)}
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval_seconds)
+            # Idle endpoints get a probe, which also keeps Ollama from unloading
+            # the model; open circuits are probed once their open period ends
+            probes = [
+                self._probe(endpoint) for endpoint in self.endpoints
+                if endpoint.outstanding == 0 and self._state(endpoint) != "open"
+            ]
+            await asyncio.gather(*probes)
+
+    async def start(self) -> None:
+        if self._health_task is None and self.health_interval_seconds > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for endpoint in self.endpoints:
+            if hasattr(endpoint.embedder, "aclose"):
+                await endpoint.embedder.aclose()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "endpoint": endpoint.name,
+                "state": self._state(endpoint),
+                "outstanding": endpoint.outstanding,
+                "requests": endpoint.requests,
+                "failures": endpoint.failures,
+                "consecutive_failures": endpoint.consecutive_failures,
+                "latency_ms": round(endpoint.latency_seconds * 1000, 1),
+                "last_error": endpoint.last_error,
+            }
+            for endpoint in self.endpoints
+        ]
@@ -0,0 +1,193 @@
+"""
+Durable retry queue for embeddings that could not be computed at upload time.
+
+When the embedding backend is down, the resume pipeline stores NULL instead
+of a zero vector and enqueues (student_id, column, text) here. A background
+worker re-embeds queued items with exponential backoff and hands each vector
+to a writer callback, so the row gets a real vector once the backend is
+back. Items are kept in a local SQLite file and survive restarts; an item
+that still fails after max_attempts is marked failed and left for the
+backfill command.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, Optional
+
+RETRY_PENDING = "pending"
+RETRY_FAILED = "failed"
+
+# (student_id, column, vector) -> None; called in a worker thread
+EmbeddingWriter = Callable[[str, str, list], None]
+# (student_id, column, text) -> vector
+EmbedFunction = Callable[[str, str, str], Awaitable[list]]
+
+
+class EmbeddingRetryQueue:
+    def __init__(
+        self,
+        path: str,
+        embed: EmbedFunction,
+        writer: EmbeddingWriter,
+        max_attempts: int = 20,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 3600.0,
+        poll_interval: float = 5.0,
+        batch_size: int = 16,
+    ):
+        self.path = path
+        self.embed = embed
+        self.writer = writer
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.backfilled = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_retries (
+                student_id TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                text TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (student_id, column_name)
+            )
+        """)
+        self._task: Optional[asyncio.Task] = None
+
+    # Store operations (thread-safe, blocking)
+    def enqueue(self, student_id: str, column: str, text: str) -> None:
+        """
+        Queues a re-embed; a pending item for the same column is replaced, so the newest text wins.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO embedding_retries (student_id, column_name, text, status, attempts, next_run_at, updated_at)
+                   VALUES (?, ?, ?, ?, 0, ?, ?)
+                   ON CONFLICT (student_id, column_name) DO UPDATE SET
+                   text = excluded.text, status = excluded.status, attempts = 0, error = NULL,
+                   next_run_at = excluded.next_run_at, updated_at = excluded.updated_at""",
+                (student_id, column, text, RETRY_PENDING, now + self.backoff_seconds, now),
+            )
+
+    def discard(self, student_id: str, column: str) -> None:
+        """
+        Drops a queued retry, e.g. after a newer upload produced a real vector.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM embedding_retries WHERE student_id = ? AND column_name = ?", (student_id, column)
+            )
+
+    def queued_text(self, student_id: str, column: str) -> Optional[str]:
+        """
+        Returns the text queued for a column (pending or failed), if any.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM embedding_retries WHERE student_id = ? AND column_name = ?", (student_id, column)
+            ).fetchone()
+        return row["text"] if row else None
+
+    def _due(self, limit: int) -> list[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT * FROM embedding_retries WHERE status = ? AND next_run_at <= ?
+                   ORDER BY next_run_at LIMIT ?""",
+                (RETRY_PENDING, time.time(), limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _is_current(self, item: Dict) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM embedding_retries WHERE student_id = ? AND column_name = ? AND text = ?",
+                (item["student_id"], item["column_name"], item["text"]),
+            ).fetchone()
+        return row is not None
+
+    def _complete(self, item: Dict) -> None:
+        # Only delete the exact item we embedded; a newer enqueue replaced the text
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM embedding_retries WHERE student_id = ? AND column_name = ? AND text = ?",
+                (item["student_id"], item["column_name"], item["text"]),
+            )
+
+    def _reschedule(self, item: Dict, error: str) -> None:
+        attempts = item["attempts"] + 1
+        status = RETRY_FAILED if attempts >= self.max_attempts else RETRY_PENDING
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** attempts))
+        with self._lock:
+            self._conn.execute(
+                """UPDATE embedding_retries SET attempts = ?, status = ?, next_run_at = ?, error = ?, updated_at = ?
+                   WHERE student_id = ? AND column_name = ? AND text = ?""",
+                (attempts, status, time.time() + delay, error, time.time(),
+                 item["student_id"], item["column_name"], item["text"]),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM embedding_retries GROUP BY status").fetchall()
+        counts = {RETRY_PENDING: 0, RETRY_FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    # Worker
+    async def run_due(self) -> int:
+        """
+        Retries every item that is due now. Returns the number backfilled.
+        """
+        done = 0
+        while True:
+            items = await asyncio.to_thread(self._due, self.batch_size)
+            if not items:
+                return done
+            for item in items:
+                try:
+                    vector = await self.embed(item["student_id"], item["column_name"], item["text"])
+                    if not vector:
+                        raise ValueError("empty embedding")
+                    # Skip the write if a newer upload replaced or discarded the item meanwhile
+                    if await asyncio.to_thread(self._is_current, item):
+                        await asyncio.to_thread(self.writer, item["student_id"], item["column_name"], vector)
+                except Exception as e:
+                    await asyncio.to_thread(self._reschedule, item, str(e) or type(e).__name__)
+                    # The backend is most likely still down; leave the rest for the next poll
+                    return done
+                await asyncio.to_thread(self._complete, item)
+                done += 1
+                self.backfilled += 1
+                print(f"Backfilled {item['column_name']} for student {item['student_id']}")
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Embedding retry worker error: {e}")
+                traceback.print_exc()
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
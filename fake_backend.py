@@ -0,0 +1,389 @@
+"""
+In-memory stand-in for the Supabase client, for offline tests and load tests.
+
+FakeSupabase implements the part of the supabase-py query builder the
+backend uses (select with embedded relations, eq, in_, overlaps, order,
+limit, range, single, insert, upsert, update, delete, rpc) over plain
+dicts for the students, profiles, hiring_sessions, session_candidates and
+student_resume_chunks tables, plus a byte store for the resumes storage
+bucket. Vector columns are stored and returned in PostgREST's
+"[0.1,0.2,...]" text form, and the match_students_by_embedding* RPCs rank
+them by cosine similarity like pgvector would.
+"""
+import copy
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+
+VECTOR_COLUMNS = {"resume_embeddings", "summary_embedding", "job_embedding", "embedding"}
+
+# (table, embedded table) -> (local column, remote column) for many-to-one embeds
+RELATIONS = {
+    ("students", "profiles"): ("id", "id"),
+    ("profiles", "students"): ("id", "id"),
+    ("session_candidates", "students"): ("student_id", "id"),
+    ("session_candidates", "hiring_sessions"): ("session_id", "id"),
+}
+
+# Tables whose updated_at is bumped by a trigger in the real schema
+TOUCHED_TABLES = {"hiring_sessions", "session_candidates", "students", "profiles"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(columns: str) -> list[str]:
+    parts, depth, current = [], 0, []
+    for char in columns:
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _parse_columns(columns: str) -> tuple[Optional[list[str]], list[tuple[str, str, str]]]:
+    """
+    Returns (plain columns or None for '*', [(alias, table, sub-columns)]).
+    """
+    plain: Optional[list[str]] = []
+    embeds = []
+    for part in _split_top_level(columns or "*"):
+        if "(" in part:
+            head, sub = part.split("(", 1)
+            alias, _, table = head.partition(":")
+            table = table or alias
+            embeds.append((alias.strip(), table.strip(), sub.rsplit(")", 1)[0]))
+        elif part == "*":
+            plain = None
+        elif plain is not None:
+            plain.append(part)
+    return plain, embeds
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._columns = "*"
+        self._filters: list = []
+        self._order: list = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+        self._action = "select"
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._count: Optional[str] = None
+
+    # Builder methods
+    def select(self, columns: str = "*", count: Optional[str] = None, **_):
+        self._columns = columns
+        self._count = count
+        return self
+
+    def eq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def in_(self, column: str, values):
+        values = set(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def overlaps(self, column: str, values):
+        values = set(values)
+        self._filters.append(lambda row: bool(values.intersection(row.get(column) or [])))
+        return self
+
+    def order(self, column: str, desc: bool = False, **_):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int, **_):
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int, **_):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def insert(self, payload, **_):
+        self._action, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None, **_):
+        self._action, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload: dict, **_):
+        self._action, self._payload = "update", payload
+        return self
+
+    def delete(self, **_):
+        self._action = "delete"
+        return self
+
+    def execute(self) -> FakeResponse:
+        count = None
+        with self._db._lock:
+            if self._action == "select":
+                data = self._select()
+                if self._count:
+                    count = len(self._matching())
+            elif self._action in ("insert", "upsert"):
+                data = self._insert()
+            elif self._action == "update":
+                data = self._update()
+            else:
+                data = self._delete()
+        if self._single:
+            if len(data) != 1:
+                raise ValueError(f"single() expected 1 row from {self._table}, got {len(data)}")
+            data = data[0]
+        return FakeResponse(data, count)
+
+    # Execution
+    def _matching(self) -> list[dict]:
+        return [row for row in self._db._rows(self._table) if all(f(row) for f in self._filters)]
+
+    def _select(self) -> list[dict]:
+        rows = self._matching()
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset:end]
+        lookups: dict = {}
+        return [self._db._project(self._table, row, self._columns, lookups) for row in rows]
+
+    def _touch(self) -> None:
+        if self._table == "students":
+            self._db._students_version += 1
+
+    def _insert(self) -> list[dict]:
+        self._touch()
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        conflict = [c.strip() for c in self._on_conflict.split(",")] if self._on_conflict else ["id"]
+        table = self._db._rows(self._table)
+        written = []
+        for item in payload:
+            existing = None
+            if self._action == "upsert":
+                existing = next(
+                    (row for row in table if all(row.get(c) == item.get(c) for c in conflict)), None
+                )
+            if existing is not None:
+                existing.update(self._db._store_values(item))
+                existing["updated_at"] = _now()
+                written.append(existing)
+                continue
+            row = {"id": str(uuid.uuid4()), "created_at": _now(), "updated_at": _now()}
+            row.update(self._db._store_values(item))
+            table.append(row)
+            written.append(row)
+        return [self._db._project(self._table, row, "*") for row in written]
+
+    def _update(self) -> list[dict]:
+        self._touch()
+        rows = self._matching()
+        values = self._db._store_values(self._payload)
+        for row in rows:
+            row.update(values)
+            if self._table in TOUCHED_TABLES:
+                row["updated_at"] = _now()
+        return [self._db._project(self._table, row, "*") for row in rows]
+
+    def _delete(self) -> list[dict]:
+        self._touch()
+        rows = self._matching()
+        doomed = {id(row) for row in rows}
+        self._db._tables[self._table] = [row for row in self._db._rows(self._table) if id(row) not in doomed]
+        return [self._db._project(self._table, row, "*") for row in rows]
+
+
+class FakeRpc:
+    def __init__(self, db: "FakeSupabase", name: str, params: dict):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    def execute(self) -> FakeResponse:
+        handler = getattr(self._db, f"_rpc_{self._name}", None)
+        if handler is None:
+            raise ValueError(f"Unknown RPC {self._name}")
+        with self._db._lock:
+            return FakeResponse(handler(**self._params))
+
+
+class FakeBucket:
+    def __init__(self, files: dict):
+        self._files = files
+
+    def upload(self, path: str, file: bytes, *_, **__):
+        self._files[path] = bytes(file)
+        return {"path": path}
+
+    def download(self, path: str) -> bytes:
+        if path not in self._files:
+            raise FileNotFoundError(f"Object not found: {path}")
+        return self._files[path]
+
+
+class FakeStorage:
+    def __init__(self):
+        self._buckets: dict[str, dict] = {}
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self._buckets.setdefault(bucket, {}))
+
+
+class FakeSupabase:
+    """
+    Thread-safe in-memory tables with the supabase-py call surface used by the backend.
+    """
+
+    def __init__(self):
+        self._tables: dict[str, list[dict]] = {
+            "students": [], "profiles": [], "hiring_sessions": [], "session_candidates": [],
+        }
+        self._lock = threading.RLock()
+        self._students_version = 0
+        self._embedding_matrix: Optional[tuple[int, list[dict], np.ndarray]] = None
+        self.storage = FakeStorage()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> FakeRpc:
+        return FakeRpc(self, name, params or {})
+
+    def seed(self, table: str, rows: list[dict]) -> None:
+        """
+        Bulk-loads rows as-is (plus stored vector conversion), without per-row timestamps.
+        """
+        with self._lock:
+            self._rows(table).extend(self._store_values(row) for row in rows)
+            if table == "students":
+                self._students_version += 1
+
+    def _rows(self, table: str) -> list[dict]:
+        return self._tables.setdefault(table, [])
+
+    @staticmethod
+    def _store_values(values: dict) -> dict:
+        stored = {}
+        for key, value in values.items():
+            if key in VECTOR_COLUMNS and value is not None and not isinstance(value, str):
+                value = json.dumps(np.round(np.asarray(value, dtype=np.float64), 6).tolist(), separators=(",", ":"))
+            elif key == "updated_at" and value == "now()":
+                value = _now()
+            else:
+                value = copy.deepcopy(value)
+            stored[key] = value
+        return stored
+
+    @staticmethod
+    def _output_value(value):
+        return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+
+    def _project(self, table: str, row: dict, columns: str, lookups: Optional[dict] = None) -> dict:
+        """
+        Picks the selected columns of a row and resolves embedded relations;
+        `lookups` caches the relation key maps across the rows of one query.
+        """
+        lookups = {} if lookups is None else lookups
+        plain, embeds = _parse_columns(columns)
+        keys = row.keys() if plain is None else plain
+        out = {key: self._output_value(row.get(key)) for key in keys}
+        for alias, other, sub_columns in embeds:
+            local, remote = RELATIONS.get((table, other), ("id", "id"))
+            if (other, remote) not in lookups:
+                lookups[(other, remote)] = {r.get(remote): r for r in self._rows(other)}
+            target = lookups[(other, remote)].get(row.get(local))
+            out[alias] = self._project(other, target, sub_columns, lookups) if target is not None else None
+        return out
+
+    # RPCs mirroring the SQL functions
+    def _resume_matrix(self) -> tuple[list[dict], np.ndarray]:
+        """
+        Students with a resume vector and their unit-normalized vectors, parsed
+        once per version of the students table.
+        """
+        if self._embedding_matrix is None or self._embedding_matrix[0] != self._students_version:
+            rows = [row for row in self._rows("students") if row.get("resume_embeddings")]
+            if rows:
+                matrix = np.stack([np.asarray(json.loads(row["resume_embeddings"]), dtype=np.float32) for row in rows])
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                matrix /= norms
+            else:
+                matrix = np.zeros((0, 0), dtype=np.float32)
+            self._embedding_matrix = (self._students_version, rows, matrix)
+        return self._embedding_matrix[1], self._embedding_matrix[2]
+
+    def _rank_by_embedding(self, query_embedding, match_count: int, filter_skills=None) -> list[dict]:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        rows, matrix = self._resume_matrix()
+        if not rows or query_norm == 0 or matrix.shape[1] != query.shape[0]:
+            return []
+        similarity = matrix @ (query / query_norm)
+        if filter_skills:
+            skills = set(filter_skills)
+            keep = np.array([bool(skills.intersection(row.get("skills") or [])) for row in rows])
+            similarity = np.where(keep, similarity, -np.inf)
+        profiles = {row["id"]: row for row in self._rows("profiles")}
+        results = []
+        for i in np.argsort(-similarity, kind="stable")[:match_count]:
+            if similarity[i] == -np.inf:
+                break
+            row = rows[i]
+            profile = profiles.get(row["id"])
+            if profile is None:
+                continue
+            results.append({
+                "id": row["id"],
+                "email": profile.get("email"),
+                "full_name": profile.get("full_name"),
+                "role": profile.get("role"),
+                **{key: copy.deepcopy(row.get(key)) for key in (
+                    "year", "department", "gpa", "skills", "resume_url", "ats_score", "has_internship",
+                )},
+                "similarity": float(similarity[i]),
+            })
+        return results
+
+    def _rpc_match_students_by_embedding(self, query_embedding, match_count: int = 5):
+        return self._rank_by_embedding(query_embedding, match_count)
+
+    def _rpc_match_students_by_embedding_and_skills(self, query_embedding, filter_skills, match_count: int = 20):
+        return self._rank_by_embedding(query_embedding, match_count, filter_skills)
@@ -0,0 +1,254 @@
+"""
+Boolean keyword search over resume text with BM25 ranking.
+
+Queries run against the TermIndex of ats.py, whose term columns are the
+postings lists of every resume term (built from the term frequencies
+stored at upload, and updated in place as resumes are added or removed).
+
+Query syntax:
+    kafka spark               both terms (implicit AND)
+    kafka AND spark           the same
+    kafka OR flink
+    NOT php, -php             exclusion
+    (kafka OR flink) AND "machine learning"
+    "machine learning"        phrase
+
+Operators are only recognized in upper case. Terms are tokenized like the
+resumes, so "node.js" and "c++" stay whole and stopwords are ignored. A
+phrase is matched through the index's adjacent-word bigrams: a two-word
+phrase is exact, a longer one requires each consecutive pair to occur.
+
+Matches are ranked by BM25 over the terms that are not negated.
+"""
+import math
+import re
+from typing import Optional, Union
+
+import numpy as np
+
+from ats import STOPWORDS, TermIndex, TermSnapshot, tokenize
+
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"?|(\()|(\))|([^\s()"]+)')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+# ("terms", [index terms, all required]) | ("and", [nodes]) | ("or", [nodes]) | ("not", node)
+QueryNode = tuple
+
+
+class KeywordQueryError(ValueError):
+    pass
+
+
+def phrase_terms(text: str) -> list[str]:
+    """
+    Index terms a word or phrase must match: bigrams within runs of
+    non-stopwords, or the word itself for a single-word run.
+    """
+    terms = []
+    run: list[str] = []
+    for token in tokenize(text) + [None]:
+        if token is None or token in STOPWORDS:
+            if len(run) == 1:
+                terms.append(run[0])
+            terms.extend(f"{a} {b}" for a, b in zip(run, run[1:]))
+            run = []
+        else:
+            run.append(token)
+    return list(dict.fromkeys(terms))
+
+
+def _lex(query: str) -> list[tuple[str, str]]:
+    tokens = []
+    for match in _QUERY_TOKEN_RE.finditer(query):
+        phrase, opening, closing, word = match.groups()
+        if opening:
+            tokens.append(("(", opening))
+        elif closing:
+            tokens.append((")", closing))
+        elif word is not None:
+            if word in _OPERATORS:
+                tokens.append((word, word))
+            elif word.startswith("-") and len(word) > 1:
+                tokens.append(("NOT", "-"))
+                tokens.append(("WORD", word[1:]))
+            else:
+                tokens.append(("WORD", word))
+        else:
+            tokens.append(("PHRASE", phrase))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent: or := and (OR and)*; and := unary ([AND] unary)*;
+    unary := NOT unary | atom; atom := ( or ) | WORD | PHRASE.
+    Words made only of stopwords parse to None and drop out of their group.
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> Optional[QueryNode]:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise KeywordQueryError(f"Unexpected '{self.tokens[self.position][1]}' in keyword query")
+        return node
+
+    def parse_or(self) -> Optional[QueryNode]:
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return _group("or", children)
+
+    def parse_and(self) -> Optional[QueryNode]:
+        children = [self.parse_unary()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.parse_unary())
+        return _group("and", children)
+
+    def parse_unary(self) -> Optional[QueryNode]:
+        if self.peek() == "NOT":
+            self.take()
+            child = self.parse_unary()
+            return ("not", child) if child is not None else None
+        return self.parse_atom()
+
+    def parse_atom(self) -> Optional[QueryNode]:
+        kind = self.peek()
+        if kind is None:
+            raise KeywordQueryError("Keyword query ends unexpectedly")
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise KeywordQueryError("Unbalanced parentheses in keyword query")
+            self.take()
+            return node
+        if kind in ("WORD", "PHRASE"):
+            terms = phrase_terms(self.take()[1])
+            return ("terms", terms) if terms else None
+        raise KeywordQueryError(f"Unexpected '{self.tokens[self.position][1]}' in keyword query")
+
+
+def _group(kind: str, children: list[Optional[QueryNode]]) -> Optional[QueryNode]:
+    children = [child for child in children if child is not None]
+    if not children:
+        return None
+    return children[0] if len(children) == 1 else (kind, children)
+
+
+def parse_keyword_query(query: str) -> QueryNode:
+    """
+    Parses a keyword query; raises KeywordQueryError when it is malformed or has no searchable terms.
+    """
+    tokens = _lex(query or "")
+    node = _Parser(tokens).parse() if tokens else None
+    if node is None:
+        raise KeywordQueryError("Keyword query has no searchable terms")
+    return node
+
+
+def any_of_clause(texts: list[str], label: str = "term") -> QueryNode:
+    """
+    Node matching resumes containing at least one of the texts, each as a phrase.
+    Built directly rather than spliced into a query string, so quotes and
+    operators in the texts are literal. Raises KeywordQueryError for a text
+    without searchable terms, which could otherwise never be required.
+    """
+    children = []
+    for text in texts:
+        terms = phrase_terms(text)
+        if not terms:
+            raise KeywordQueryError(f"{label.capitalize()} '{text}' has no searchable terms for keyword search")
+        children.append(("terms", terms))
+    if not children:
+        raise KeywordQueryError(f"No {label}s given")
+    return _group("or", children)
+
+
+def positive_terms(node: QueryNode, negated: bool = False) -> set[str]:
+    """
+    Terms that count towards ranking: everything outside a NOT.
+    """
+    kind, value = node
+    if kind == "terms":
+        return set() if negated else set(value)
+    if kind == "not":
+        return positive_terms(value, not negated)
+    return set().union(*(positive_terms(child, negated) for child in value))
+
+
+def _evaluate(node: QueryNode, snapshot: TermSnapshot, postings: dict) -> np.ndarray:
+    kind, value = node
+    if kind == "terms":
+        documents = [postings[term][0] for term in value]
+        result = documents[0]
+        for other in documents[1:]:
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+    if kind == "not":
+        return np.setdiff1d(snapshot.documents(), _evaluate(value, snapshot, postings), assume_unique=True)
+    results = [_evaluate(child, snapshot, postings) for child in value]
+    if kind == "or":
+        return np.unique(np.concatenate(results))
+    result = results[0]
+    for other in results[1:]:
+        result = np.intersect1d(result, other, assume_unique=True)
+    return result
+
+
+def _collect_terms(node: QueryNode) -> set[str]:
+    kind, value = node
+    if kind == "terms":
+        return set(value)
+    if kind == "not":
+        return _collect_terms(value)
+    return set().union(*(_collect_terms(child) for child in value))
+
+
+def search_keywords(
+    index: Union[TermIndex, TermSnapshot],
+    query: Union[str, QueryNode],
+    limit: Optional[int] = None,
+    k1: float = 1.2,
+) -> tuple[list[tuple[str, float]], int]:
+    """
+    Students matching the query ranked by BM25, as ([(student_id, score)], total matches).
+    limit=None returns every match.
+    """
+    node = parse_keyword_query(query) if isinstance(query, str) else query
+    snapshot = index.snapshot() if isinstance(index, TermIndex) else index
+    postings = {term: snapshot.postings(term) for term in _collect_terms(node)}
+    matched = _evaluate(node, snapshot, postings)
+    if matched.size == 0:
+        return [], 0
+
+    # BM25: idf * tf (k1 + 1) / (tf + k1 * length_norm), summed over the ranking terms
+    documents = len(snapshot)
+    scores = np.zeros(len(snapshot.student_ids), dtype=np.float64)
+    for term in positive_terms(node):
+        term_documents, counts, norms = postings[term]
+        if term_documents.size == 0:
+            continue
+        idf = math.log(1 + (documents - term_documents.size + 0.5) / (term_documents.size + 0.5))
+        scores[term_documents] += idf * counts * (k1 + 1) / (counts + k1 * norms)
+
+    matched_scores = scores[matched]
+    order = np.arange(matched.size)
+    if limit is not None and limit < matched.size:
+        order = np.argpartition(-matched_scores, limit)[:limit] if limit > 0 else order[:0]
+    top = order[np.argsort(-matched_scores[order], kind="stable")].tolist()
+    ranked = [(snapshot.student_ids[matched[i]], round(float(matched_scores[i]), 4)) for i in top]
+    return ranked, int(matched.size)
@@ -0,0 +1,437 @@
+"""
+Student/job match scoring.
+
+A hiring session's requirements compile once into a SessionMatcher, whose
+`components` kernel computes the five rule-based component scores (skills,
+education, experience, academic, year). The summary score calls it without
+explanations, so it allocates no per-match structures; the detailed analysis
+passes an `explain` dict that the kernel fills with the matched/missing items
+behind each score. Both combine the components with
+`combine_match_components`, so they always produce the same score.
+"""
+import os
+import random
+import re
+from typing import Optional
+
+# Fraction of per-student score breakdowns to print (0 disables them)
+MATCH_SCORE_LOG_SAMPLE_RATE = float(os.environ.get("MATCH_SCORE_LOG_SAMPLE_RATE", "0"))
+
+# Weights of the rule-based match components (sum to 1)
+MATCH_WEIGHTS = {
+    'skills': 0.4,
+    'education': 0.25,
+    'experience': 0.2,
+    'academic': 0.1,
+    'year': 0.05,
+}
+# Share of the final score taken by job/student embedding similarity; the rule-based
+# components keep their relative weights within the remaining share. 0 disables it.
+MATCH_SEMANTIC_WEIGHT = float(os.environ.get("MATCH_SEMANTIC_WEIGHT", "0"))
+
+_EXPERIENCE_YEARS_RE = re.compile(r'(\d+)\s*(?:year|yr)')
+
+
+def blend_semantic_score(rule_score: float, semantic_similarity: Optional[float]) -> float:
+    """
+    Mixes the rule-based score with cosine similarity mapped to 0-100.
+    Students without a usable vector keep their rule-based score.
+    """
+    if MATCH_SEMANTIC_WEIGHT <= 0 or semantic_similarity is None:
+        return rule_score
+    semantic_score = max(0.0, min(1.0, semantic_similarity)) * 100
+    return (1 - MATCH_SEMANTIC_WEIGHT) * rule_score + MATCH_SEMANTIC_WEIGHT * semantic_score
+
+
+def _education_text(student_edu) -> str:
+    if isinstance(student_edu, dict):
+        return str(student_edu.get('degree', '') + ' ' + student_edu.get('field', '')).lower()
+    return str(student_edu).lower()
+
+
+def experience_years(student_experience) -> float:
+    """
+    Half a year per experience entry plus explicit "N years" mentions.
+    """
+    if not student_experience:
+        return 0
+    years = len(student_experience) * 0.5
+    for exp in student_experience:
+        year_matches = _EXPERIENCE_YEARS_RE.findall(str(exp).lower())
+        if year_matches:
+            years += sum(int(y) for y in year_matches)
+    return years
+
+
+def _empty_analysis() -> dict:
+    return {
+        'overall_score': 0.0,
+        'skills_analysis': {},
+        'education_analysis': {},
+        'experience_analysis': {},
+        'academic_analysis': {},
+        'year_eligibility_analysis': {},
+        'recommendations': []
+    }
+
+
+def combine_match_components(components: tuple, semantic_similarity: Optional[float] = None) -> float:
+    """
+    Weighted sum of the component scores, blended with the embedding similarity and capped to 0-100.
+    """
+    skills_score, education_score, experience_score, academic_score, year_score = components
+    total_score = (
+        skills_score * MATCH_WEIGHTS['skills'] +
+        education_score * MATCH_WEIGHTS['education'] +
+        experience_score * MATCH_WEIGHTS['experience'] +
+        academic_score * MATCH_WEIGHTS['academic'] +
+        year_score * MATCH_WEIGHTS['year']
+    )
+    total_score = blend_semantic_score(total_score, semantic_similarity)
+    return max(0, min(100, total_score))
+
+
+class SessionMatcher:
+    """
+    A hiring session's requirements compiled for scoring many students:
+    lowercased required skills, education requirements with their word
+    lists, experience/CGPA thresholds and an eligible-years bitmask. Treat
+    it as immutable; the only state that changes is a memo of which
+    required skills each distinct student skill matches.
+    """
+
+    __slots__ = (
+        'job_requirements', 'job_eligibility', 'required_skills', 'required_skills_lower',
+        'education_requirements', 'required_experience', 'half_required_experience',
+        'required_cgpa', 'near_required_cgpa', 'eligible_years', 'eligible_years_mask', '_skill_hits',
+    )
+
+    def __init__(self, job_requirements: dict, job_eligibility: dict):
+        self.job_requirements = job_requirements or {}
+        self.job_eligibility = job_eligibility or {}
+
+        self.required_skills = tuple(self.job_requirements.get('required_skills', []))
+        self.required_skills_lower = tuple(skill.lower().strip() for skill in self.required_skills)
+
+        # (as written, lowercased, words) per education requirement
+        self.education_requirements = tuple(
+            (req_edu, req_edu.lower(), tuple(req_edu.lower().split()))
+            for req_edu in self.job_eligibility.get('education', [])
+        )
+
+        self.required_experience = self.job_eligibility.get('experience_years', 0)
+        self.half_required_experience = self.required_experience * 0.5 if self.required_experience > 0 else 0
+
+        self.required_cgpa = self.job_eligibility.get('cgpa_minimum', 0)
+        self.near_required_cgpa = self.required_cgpa * 0.9 if self.required_cgpa > 0 else 0
+
+        self.eligible_years = tuple(self.job_eligibility.get('eligible_years', []))
+        mask = 0
+        for year in self.eligible_years:
+            # Same membership as `int(student_year) in eligible_years`, so 4.0 counts and "4" does not
+            if isinstance(year, (int, float)) and float(year).is_integer() and 0 <= year < 64:
+                mask |= 1 << int(year)
+        self.eligible_years_mask = mask
+
+        self._skill_hits: dict = {}
+
+    def _required_skill_hits(self, student_skill: str) -> frozenset:
+        """
+        Indices of required skills matched (substring either way) by one lowercased student skill.
+        """
+        hits = self._skill_hits.get(student_skill)
+        if hits is None:
+            hits = frozenset(
+                i for i, req_skill in enumerate(self.required_skills_lower)
+                if req_skill in student_skill or student_skill in req_skill
+            )
+            self._skill_hits[student_skill] = hits
+        return hits
+
+    def _academic_score(self, student_gpa) -> float:
+        if self.required_cgpa > 0 and student_gpa:
+            try:
+                student_gpa_float = float(student_gpa)
+                if student_gpa_float >= self.required_cgpa:
+                    return 100
+                if student_gpa_float >= self.near_required_cgpa:  # Within 90% of required
+                    return 80
+                return 50
+            except (ValueError, TypeError):
+                return 50  # Default if GPA parsing fails
+        if not self.required_cgpa:  # No minimum GPA required
+            return 100
+        return 50  # No GPA data
+
+    def _year_score(self, student_year) -> float:
+        if self.eligible_years and student_year:
+            try:
+                year = int(student_year)
+            except (ValueError, TypeError):
+                return 50
+            if 0 <= year < 64:
+                return 100 if self.eligible_years_mask >> year & 1 else 0
+            return 100 if year in self.eligible_years else 0
+        if not self.eligible_years:  # No year restriction
+            return 100
+        return 50
+
+    def components(self, student_data: dict, explain: Optional[dict] = None) -> tuple[float, float, float, float, float]:
+        """
+        Returns the (skills, education, experience, academic, year) scores, each 0-100.
+        When `explain` is a dict it is filled with matched_skills, missing_skills,
+        additional_skills, requirements_met, requirements_not_met and
+        student_experience_years; otherwise no per-match structures are built.
+        """
+        # 1. Skills: share of required skills matched (substring either way) by a student skill
+        skills_score = 0.0
+        student_skills = student_data.get('skills', [])
+        if explain is not None:
+            explain['matched_skills'] = []
+            explain['missing_skills'] = []
+            explain['additional_skills'] = []
+
+        if self.required_skills and student_skills:
+            student_skills_lower = [skill.lower().strip() for skill in student_skills]
+            if explain is None:
+                matched = set()
+                for student_skill in student_skills_lower:
+                    matched |= self._required_skill_hits(student_skill)
+                matched_skills = len(matched)
+            else:
+                # First matching student skill per requirement, in order
+                matched_skills = 0
+                student_hits = [self._required_skill_hits(student_skill) for student_skill in student_skills_lower]
+                for i, req_skill in enumerate(self.required_skills):
+                    first_match = next((j for j, hits in enumerate(student_hits) if i in hits), None)
+                    if first_match is None:
+                        explain['missing_skills'].append(req_skill)
+                    else:
+                        explain['matched_skills'].append({'required': req_skill, 'student_has': student_skills[first_match]})
+                        matched_skills += 1
+                explain['additional_skills'] = [
+                    skill for skill, hits in zip(student_skills, student_hits) if not hits
+                ]
+            skills_score = (matched_skills / len(self.required_skills)) * 100
+
+        # 2. Education: 100 if any requirement appears in the student's education, 50 for any degree
+        student_education = student_data.get('education', [])
+        if explain is not None:
+            explain['requirements_met'] = []
+            explain['requirements_not_met'] = []
+
+        if self.education_requirements and student_education:
+            student_education_text = [_education_text(student_edu) for student_edu in student_education]
+            education_matched = False
+            for req_edu, req_edu_lower, req_words in self.education_requirements:
+                matched_text = None
+                for student_edu_str in student_education_text:
+                    if req_edu_lower in student_edu_str or any(word in student_edu_str for word in req_words):
+                        matched_text = student_edu_str
+                        break
+                if matched_text is not None:
+                    education_matched = True
+                    if explain is None:
+                        break
+                    explain['requirements_met'].append({'required': req_edu, 'student_has': matched_text})
+                elif explain is not None:
+                    explain['requirements_not_met'].append(req_edu)
+            education_score = 100 if education_matched else 50
+        elif not self.education_requirements:  # No specific education required
+            education_score = 100
+        else:
+            education_score = 0  # No education data for student
+
+        # 3. Experience: half a year per entry plus explicit "N years" mentions
+        student_exp_years = 0
+        if self.required_experience > 0:
+            student_exp_years = experience_years(student_data.get('experience', []))
+
+            if student_exp_years >= self.required_experience:
+                experience_score = 100
+            elif student_exp_years >= self.half_required_experience:  # At least 50% of required experience
+                experience_score = 80
+            else:
+                experience_score = 40  # Some experience but not enough
+        else:
+            experience_score = 100  # No specific experience required
+        if explain is not None:
+            explain['student_experience_years'] = student_exp_years
+
+        # 4. Academic performance
+        academic_score = self._academic_score(student_data.get('gpa'))
+
+        # 5. Year eligibility
+        year_score = self._year_score(student_data.get('year'))
+
+        return skills_score, education_score, experience_score, academic_score, year_score
+
+    def score(self, student_data: dict, semantic_similarity: Optional[float] = None) -> float:
+        """
+        Match score from 0-100, blended with the job/resume embedding
+        similarity when MATCH_SEMANTIC_WEIGHT is set. 0 on malformed rows.
+        """
+        try:
+            components = self.components(student_data)
+            final_score = combine_match_components(components, semantic_similarity)
+
+            # Logging every breakdown costs more than scoring itself on large populations
+            if MATCH_SCORE_LOG_SAMPLE_RATE > 0 and random.random() < MATCH_SCORE_LOG_SAMPLE_RATE:
+                print("Match score breakdown - Skills: {:.1f}, Education: {:.1f}, Experience: {:.1f}, "
+                      "Academic: {:.1f}, Year: {:.1f}, Final: {:.1f}".format(*components, final_score))
+
+            return final_score
+
+        except Exception as e:
+            print(f"Error calculating match score: {e}")
+            return 0.0
+
+    def upper_bound(self, student_data: dict, semantic_similarity: Optional[float] = None) -> float:
+        """
+        Cheap upper bound on score(). Skills, academic and year components are
+        exact; education and experience take their best reachable value unless
+        the student has no data for them. Components are combined exactly like
+        the full score, so the bound is never below it, and students whose
+        bound is under min_score can be skipped.
+        """
+        # 1. Skills: the number of required skills matched by any student skill
+        skills_score = 0.0
+        student_skills = student_data.get('skills', [])
+        if self.required_skills and student_skills:
+            matched = set()
+            for skill in student_skills:
+                matched |= self._required_skill_hits(skill.lower().strip())
+            skills_score = (len(matched) / len(self.required_skills)) * 100
+
+        # 2. Education: full marks unless a degree is required and the student lists none
+        education_score = 0 if self.education_requirements and not student_data.get('education', []) else 100
+
+        # 3. Experience: students without any entries get the fixed low score
+        experience_score = 40 if self.required_experience > 0 and not student_data.get('experience', []) else 100
+
+        # 4-5. Academic and year scores are exact
+        academic_score = self._academic_score(student_data.get('gpa'))
+        year_score = self._year_score(student_data.get('year'))
+
+        # The semantic blend is monotonic in the rule-based score
+        return combine_match_components(
+            (skills_score, education_score, experience_score, academic_score, year_score), semantic_similarity
+        )
+
+    def detailed_analysis(self, student_data: dict, semantic_similarity: Optional[float] = None) -> dict:
+        """
+        Detailed match analysis with breakdown of each component.
+        overall_score equals score() rounded to two decimals.
+        """
+        analysis = _empty_analysis()
+
+        try:
+            explain = {}
+            components = self.components(student_data, explain)
+            skills_score, education_score, experience_score, academic_score, year_score = components
+
+            required_cgpa = self.required_cgpa
+            student_gpa = student_data.get('gpa')
+            eligible_years = self.job_eligibility.get('eligible_years', [])
+            student_year = student_data.get('year')
+
+            analysis['skills_analysis'] = {
+                'weight': round(MATCH_WEIGHTS['skills'] * 100),
+                'score': skills_score,
+                'matched_skills': explain['matched_skills'],
+                'missing_skills': explain['missing_skills'],
+                'additional_skills': explain['additional_skills']
+            }
+            analysis['education_analysis'] = {
+                'weight': round(MATCH_WEIGHTS['education'] * 100),
+                'score': education_score,
+                'requirements_met': explain['requirements_met'],
+                'requirements_not_met': explain['requirements_not_met'],
+                'student_education': student_data.get('education', [])
+            }
+            analysis['experience_analysis'] = {
+                'weight': round(MATCH_WEIGHTS['experience'] * 100),
+                'score': experience_score,
+                'required_years': self.required_experience,
+                'student_experience_years': explain['student_experience_years'],
+                'student_experiences': student_data.get('experience', []),
+                'has_internship': student_data.get('has_internship', False)
+            }
+            analysis['academic_analysis'] = {
+                'weight': round(MATCH_WEIGHTS['academic'] * 100),
+                'score': academic_score,
+                'required_cgpa': required_cgpa,
+                'student_gpa': student_gpa,
+                'meets_requirement': required_cgpa > 0 and academic_score == 100
+            }
+            analysis['year_eligibility_analysis'] = {
+                'weight': round(MATCH_WEIGHTS['year'] * 100),
+                'score': year_score,
+                'eligible_years': eligible_years,
+                'student_year': student_year,
+                'is_eligible': year_score == 100
+            }
+
+            # 6. Semantic similarity between the job description and the resume
+            analysis['semantic_analysis'] = {
+                'weight': round(MATCH_SEMANTIC_WEIGHT * 100),
+                'similarity': round(semantic_similarity, 4) if semantic_similarity is not None else None,
+                'score': round(max(0.0, min(1.0, semantic_similarity)) * 100, 2) if semantic_similarity is not None else None
+            }
+
+            analysis['overall_score'] = round(combine_match_components(components, semantic_similarity), 2)
+
+            # Generate recommendations
+            recommendations = []
+
+            if explain['missing_skills']:
+                recommendations.append(f"Consider developing skills in: {', '.join(explain['missing_skills'][:3])}")
+
+            if not explain['requirements_met'] and explain['requirements_not_met']:
+                recommendations.append("Educational background may not fully align with requirements")
+
+            required_years = analysis['experience_analysis']['required_years']
+            if required_years > explain['student_experience_years']:
+                recommendations.append(f"Gain more experience (has {explain['student_experience_years']} years, needs {required_years})")
+
+            if not analysis['academic_analysis']['meets_requirement'] and required_cgpa > 0:
+                recommendations.append(f"CGPA requirement not met (has {student_gpa}, needs {required_cgpa})")
+
+            if year_score != 100 and eligible_years:
+                recommendations.append(f"Not in eligible academic year (in year {student_year}, eligible: {eligible_years})")
+
+            if len(recommendations) == 0:
+                recommendations.append("Strong candidate with good alignment to job requirements!")
+
+            analysis['recommendations'] = recommendations
+
+            return analysis
+
+        except Exception as e:
+            print(f"Error in detailed match analysis: {e}")
+            return analysis
+
+
+def calculate_student_job_match_score(student_data: dict, job_requirements: dict, job_eligibility: dict, semantic_similarity: Optional[float] = None) -> float:
+    """
+    Calculate match score between a student and job requirements.
+    Endpoints scoring many students should compile a SessionMatcher once instead.
+    """
+    try:
+        matcher = SessionMatcher(job_requirements, job_eligibility)
+    except Exception as e:
+        print(f"Error calculating match score: {e}")
+        return 0.0
+    return matcher.score(student_data, semantic_similarity)
+
+
+def calculate_detailed_match_analysis(student_data: dict, job_requirements: dict, job_eligibility: dict, semantic_similarity: Optional[float] = None) -> dict:
+    """
+    Calculate detailed match analysis with breakdown of each component.
+    """
+    try:
+        matcher = SessionMatcher(job_requirements, job_eligibility)
+    except Exception as e:
+        print(f"Error in detailed match analysis: {e}")
+        return _empty_analysis()
+    return matcher.detailed_analysis(student_data, semantic_similarity)
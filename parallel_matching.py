@@ -0,0 +1,420 @@
+"""
+Parallel match scoring for large student populations.
+
+MatchFeatures compiles the student rows once into flat numeric arrays: the
+session-independent inputs of SessionMatcher.components. Skills and
+education texts become ids into per-population vocabularies (CSR layout),
+next to experience years, parsed GPA and year. The arrays are written to a
+single memory-mapped file, so process pool workers map them instead of
+receiving pickled rows.
+
+For a session the parent compiles the matcher against the vocabularies
+(the required skills each distinct skill matches, as a bitmask, and
+whether each distinct education text meets a requirement), then hands
+each worker a row range. The worker scores its shard with numpy,
+reproducing SessionMatcher.score exactly, and returns its number of
+students at or above min_score plus its local top K; the parent merges
+the shards with a k-way heap.
+
+score_matrix scores many sessions in the same pass over the features,
+returning the full students x sessions matrix for batch refreshes.
+"""
+import heapq
+import math
+import re
+import tempfile
+import time
+from concurrent.futures import Executor
+from typing import Optional
+
+import numpy as np
+
+from matching import MATCH_SEMANTIC_WEIGHT, MATCH_WEIGHTS, SessionMatcher, _education_text, experience_years
+
+YEAR_MISSING = 0  # falsy year: scored 50 when years are restricted
+YEAR_INVALID = 1  # not parseable as an int: scored 50
+YEAR_VALID = 2
+
+# Fields SessionMatcher.score fails on (scoring the student 0), but only when
+# the session's requirements make it read them
+MALFORMED_SKILLS = 1
+MALFORMED_EDUCATION = 2
+MALFORMED_YEAR = 4
+MALFORMED_EXPERIENCE = 8
+
+_ALIGNMENT = 64
+# Education vocabulary entries are joined with this for the substring scan
+_SEPARATOR = "\x00"
+
+
+def _parse_gpa(value) -> float:
+    # Same reading as SessionMatcher._academic_score: missing and unparseable both score 50 (NaN)
+    if not value:
+        return math.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+
+def _parse_year(value) -> tuple[int, int]:
+    if not value:
+        return 0, YEAR_MISSING
+    try:
+        year = int(value)
+    except (ValueError, TypeError):
+        return 0, YEAR_INVALID
+    # Years beyond int64 cannot be eligible; -1 never is either
+    return (year if -2**62 < year < 2**62 else -1), YEAR_VALID
+
+
+class MatchFeatures:
+    """
+    Student rows compiled for vectorized scoring; see the module docstring.
+    Fields that SessionMatcher.score would fail on are flagged in `malformed`.
+    """
+
+    def __init__(self, rows: list[dict], mmap_dir: Optional[str] = None):
+        self.built_at = time.time()
+        self.student_ids: list[str] = []
+        skill_vocab: dict[str, int] = {}
+        education_vocab: dict[str, int] = {}
+        skill_counts, skill_ids, education_counts, education_ids = [], [], [], []
+        experience, gpa, year, year_state, malformed = [], [], [], [], []
+
+        for row in rows:
+            self.student_ids.append(row['id'])
+            bad = 0
+            try:
+                skills = [skill.lower().strip() for skill in row.get('skills') or []]
+            except Exception:
+                skills, bad = [], bad | MALFORMED_SKILLS
+            try:
+                educations = [_education_text(student_edu) for student_edu in row.get('education') or []]
+            except Exception:
+                educations, bad = [], bad | MALFORMED_EDUCATION
+            try:
+                student_year, student_year_state = _parse_year(row.get('year'))
+            except Exception:
+                (student_year, student_year_state), bad = (0, YEAR_MISSING), bad | MALFORMED_YEAR
+            try:
+                student_experience = experience_years(row.get('experience') or [])
+            except Exception:
+                student_experience, bad = 0, bad | MALFORMED_EXPERIENCE
+            student_gpa = _parse_gpa(row.get('gpa'))
+            skill_counts.append(len(skills))
+            skill_ids.extend(skill_vocab.setdefault(skill, len(skill_vocab)) for skill in skills)
+            education_counts.append(len(educations))
+            education_ids.extend(education_vocab.setdefault(text, len(education_vocab)) for text in educations)
+            experience.append(student_experience)
+            gpa.append(student_gpa)
+            year.append(student_year)
+            year_state.append(student_year_state)
+            malformed.append(bad)
+
+        self.skill_vocab = list(skill_vocab)
+        self.education_vocab = list(education_vocab)
+        arrays = {
+            "skill_indptr": np.concatenate([[0], np.cumsum(skill_counts, dtype=np.int64)]).astype(np.int64),
+            "skill_ids": np.asarray(skill_ids, dtype=np.int32),
+            "education_indptr": np.concatenate([[0], np.cumsum(education_counts, dtype=np.int64)]).astype(np.int64),
+            "education_ids": np.asarray(education_ids, dtype=np.int32),
+            "experience_years": np.asarray(experience, dtype=np.float64),
+            "gpa": np.asarray(gpa, dtype=np.float64),
+            "year": np.asarray(year, dtype=np.int64),
+            "year_state": np.asarray(year_state, dtype=np.int8),
+            "malformed": np.asarray(malformed, dtype=np.int8),
+        }
+
+        # One file holds every array; workers map it read-only by path
+        self.layout: dict[str, tuple[int, str, tuple]] = {}
+        offset = 0
+        for name, array in arrays.items():
+            self.layout[name] = (offset, array.dtype.str, array.shape)
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        self._mmap_file = tempfile.NamedTemporaryFile(prefix="match_features_", suffix=".bin", dir=mmap_dir)
+        self.path = self._mmap_file.name
+        data = np.memmap(self.path, dtype=np.uint8, mode="w+", shape=(max(offset, 1),))
+        for name, array in arrays.items():
+            start = self.layout[name][0]
+            data[start:start + array.nbytes] = array.view(np.uint8).reshape(-1)
+        data.flush()
+        self.arrays = _map_arrays(data, self.layout)
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def similarity_array(self, similarities: dict) -> Optional[np.ndarray]:
+        """
+        Per-row semantic similarity (NaN where missing), or None when there are none.
+        """
+        if not similarities:
+            return None
+        return np.fromiter(
+            (similarities.get(student_id, math.nan) for student_id in self.student_ids),
+            dtype=np.float64, count=len(self.student_ids),
+        )
+
+    def compile_session(self, matcher: SessionMatcher) -> dict:
+        """
+        The session's requirements as small arrays over this population's vocabularies plus scalars.
+        """
+        # Required skills matched by each distinct student skill, as bits
+        required = len(matcher.required_skills_lower)
+        words = max(1, -(-required // 64))
+        skill_masks = np.zeros((len(self.skill_vocab), words), dtype=np.uint64)
+        if required:
+            for skill_id, skill in enumerate(self.skill_vocab):
+                for i in matcher._required_skill_hits(skill):
+                    skill_masks[skill_id, i // 64] |= np.uint64(1 << (i % 64))
+
+        # Distinct education texts meeting any requirement: one substring scan per needle over all texts
+        education_matches = np.zeros(len(self.education_vocab), dtype=bool)
+        if matcher.education_requirements and self.education_vocab:
+            blob = _SEPARATOR.join(self.education_vocab)
+            starts = np.cumsum([0] + [len(text) + 1 for text in self.education_vocab[:-1]])
+            for _, req_edu_lower, req_words in matcher.education_requirements:
+                for needle in (req_edu_lower, *req_words):
+                    if not needle:
+                        education_matches[:] = True
+                        continue
+                    positions = [match.start() for match in re.finditer(re.escape(needle), blob)]
+                    if positions:
+                        education_matches[np.searchsorted(starts, positions, side="right") - 1] = True
+
+        eligible_years = [float(year) for year in matcher.eligible_years if isinstance(year, (int, float))]
+        malformed = (
+            (MALFORMED_SKILLS if required else 0)
+            | (MALFORMED_EDUCATION if matcher.education_requirements else 0)
+            | (MALFORMED_YEAR if matcher.eligible_years else 0)
+            | (MALFORMED_EXPERIENCE if matcher.required_experience > 0 else 0)
+        )
+        return {
+            "malformed_fields": malformed,
+            "skill_masks": skill_masks,
+            "required_skills": required,
+            "education_matches": education_matches,
+            "has_education_requirements": bool(matcher.education_requirements),
+            "required_experience": matcher.required_experience,
+            "half_required_experience": matcher.half_required_experience,
+            "required_cgpa": matcher.required_cgpa,
+            "near_required_cgpa": matcher.near_required_cgpa,
+            "has_eligible_years": bool(matcher.eligible_years),
+            "eligible_years": np.asarray(eligible_years, dtype=np.float64),
+        }
+
+
+def _map_arrays(data: np.ndarray, layout: dict) -> dict[str, np.ndarray]:
+    arrays = {}
+    for name, (offset, dtype, shape) in layout.items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape)) if shape else 1
+        arrays[name] = data[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+    return arrays
+
+
+# Per worker process: the mapped feature file of the most recent population
+_mapped: dict[str, dict[str, np.ndarray]] = {}
+
+
+def _attach(path: str, layout: dict) -> dict[str, np.ndarray]:
+    arrays = _mapped.get(path)
+    if arrays is None:
+        _mapped.clear()  # a newer feature set supersedes the old mapping
+        arrays = _mapped[path] = _map_arrays(np.memmap(path, dtype=np.uint8, mode="r"), layout)
+    return arrays
+
+
+def _segment_reduce(ufunc, values: np.ndarray, indptr: np.ndarray, empty) -> np.ndarray:
+    """
+    ufunc.reduce over each CSR segment; empty segments get `empty`.
+    """
+    counts = np.diff(indptr)
+    result = np.full((len(counts),) + values.shape[1:], empty, dtype=values.dtype)
+    nonempty = counts > 0
+    if nonempty.any():
+        # Without the empty segments, each start runs exactly to the next one
+        result[nonempty] = ufunc.reduceat(values, (indptr[:-1] - indptr[0])[nonempty], axis=0)
+    return result
+
+
+def score_rows(arrays: dict, start: int, stop: int, session: dict,
+               similarities: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Match scores of rows [start, stop), equal to SessionMatcher.score for each row.
+    """
+    n = stop - start
+
+    # 1. Skills: share of required skills matched by any of the student's skills
+    skill_indptr = arrays["skill_indptr"][start:stop + 1]
+    skills_score = np.zeros(n, dtype=np.float64)
+    if session["required_skills"]:
+        skill_ids = arrays["skill_ids"][skill_indptr[0]:skill_indptr[-1]]
+        masks = _segment_reduce(np.bitwise_or, session["skill_masks"][skill_ids], skill_indptr, 0)
+        matched = np.unpackbits(np.ascontiguousarray(masks).view(np.uint8), axis=1).sum(axis=1)
+        skills_score = matched / session["required_skills"] * 100
+
+    # 2. Education: 100 if a requirement is met, 50 for other education, 0 for none
+    education_indptr = arrays["education_indptr"][start:stop + 1]
+    if session["has_education_requirements"]:
+        education_ids = arrays["education_ids"][education_indptr[0]:education_indptr[-1]]
+        met = _segment_reduce(np.logical_or, session["education_matches"][education_ids], education_indptr, False)
+        education_score = np.where(met, 100.0, np.where(np.diff(education_indptr) > 0, 50.0, 0.0))
+    else:
+        education_score = np.full(n, 100.0)
+
+    # 3. Experience
+    if session["required_experience"] > 0:
+        years = arrays["experience_years"][start:stop]
+        experience_score = np.where(
+            years >= session["required_experience"], 100.0,
+            np.where(years >= session["half_required_experience"], 80.0, 40.0),
+        )
+    else:
+        experience_score = np.full(n, 100.0)
+
+    # 4. Academic: NaN (missing or unparseable GPA) compares false and scores 50
+    if session["required_cgpa"] > 0:
+        gpa = arrays["gpa"][start:stop]
+        academic_score = np.where(
+            gpa >= session["required_cgpa"], 100.0, np.where(gpa >= session["near_required_cgpa"], 80.0, 50.0)
+        )
+    else:
+        academic_score = np.full(n, 100.0 if not session["required_cgpa"] else 50.0)
+
+    # 5. Year eligibility
+    if session["has_eligible_years"]:
+        year_state = arrays["year_state"][start:stop]
+        eligible = np.isin(arrays["year"][start:stop].astype(np.float64), session["eligible_years"])
+        year_score = np.where(year_state == YEAR_VALID, np.where(eligible, 100.0, 0.0), 50.0)
+    else:
+        year_score = np.full(n, 100.0)
+
+    # Same operation order as combine_match_components, so scores match bit for bit
+    total = skills_score * MATCH_WEIGHTS['skills']
+    total = total + education_score * MATCH_WEIGHTS['education']
+    total = total + experience_score * MATCH_WEIGHTS['experience']
+    total = total + academic_score * MATCH_WEIGHTS['academic']
+    total = total + year_score * MATCH_WEIGHTS['year']
+    if MATCH_SEMANTIC_WEIGHT > 0 and similarities is not None:
+        semantic_score = np.clip(similarities, 0.0, 1.0) * 100
+        blended = (1 - MATCH_SEMANTIC_WEIGHT) * total + MATCH_SEMANTIC_WEIGHT * semantic_score
+        total = np.where(np.isnan(similarities), total, blended)
+    total = np.clip(total, 0, 100)
+    if session["malformed_fields"]:
+        total[(arrays["malformed"][start:stop] & session["malformed_fields"]) != 0] = 0.0
+    return total
+
+
+def _shard_top(scores: np.ndarray, start: int, min_score: float, top_k: int) -> tuple[int, list[tuple[float, int]]]:
+    passing = np.flatnonzero(scores >= min_score)
+    if top_k <= 0:
+        passing = passing[:0]
+    elif top_k < passing.size:
+        # Everything above the k-th best score, then the earliest rows tied with it
+        kth = np.partition(scores[passing], passing.size - top_k)[passing.size - top_k]
+        better = passing[scores[passing] > kth]
+        passing = np.concatenate([better, passing[scores[passing] == kth][:top_k - better.size]])
+    # Best first, earlier rows first on ties, like the serial stable sort
+    order = np.lexsort((passing, -scores[passing]))
+    top = [(float(scores[row]), start + int(row)) for row in passing[order]]
+    return int(np.count_nonzero(scores >= min_score)), top
+
+
+def score_shard(path: str, layout: dict, start: int, stop: int, session: dict,
+                similarities: Optional[np.ndarray], min_score: float, top_k: int) -> tuple[int, list[tuple[float, int]]]:
+    """
+    Pool task: scores one row range of the mapped features and returns
+    (rows at or above min_score, their top_k as (score, row) best first).
+    """
+    return _shard_top(score_rows(_attach(path, layout), start, stop, session, similarities), start, min_score, top_k)
+
+
+def shard_bounds(size: int, shards: int) -> list[tuple[int, int]]:
+    shards = max(1, min(shards, size))
+    edges = np.linspace(0, size, shards + 1).astype(int).tolist()
+    return [(a, b) for a, b in zip(edges, edges[1:]) if b > a]
+
+
+def merge_top_k(shard_tops: list[list[tuple[float, int]]], top_k: int) -> list[tuple[float, int]]:
+    """
+    k-way heap merge of per-shard lists sorted best first.
+    """
+    merged = heapq.merge(*shard_tops, key=lambda item: (-item[0], item[1]))
+    return [item for _, item in zip(range(top_k), merged)]
+
+
+def score_population(features: MatchFeatures, matcher: SessionMatcher, similarities: dict, min_score: float,
+                     top_k: int, executor: Optional[Executor] = None, shards: int = 1) -> tuple[int, list[tuple[str, float]]]:
+    """
+    Scores every student against the session; returns (students at or above
+    min_score, the best top_k of them as (student_id, score)). Shards run in
+    `executor` when given, otherwise in this process.
+    """
+    session = features.compile_session(matcher)
+    similarity = features.similarity_array(similarities)
+    if executor is None:
+        scores = score_rows(features.arrays, 0, len(features), session, similarity)
+        results = [_shard_top(scores, 0, min_score, top_k)]
+    else:
+        futures = [
+            executor.submit(score_shard, features.path, features.layout, start, stop, session,
+                            similarity[start:stop] if similarity is not None else None, min_score, top_k)
+            for start, stop in shard_bounds(len(features), shards)
+        ]
+        results = [future.result() for future in futures]
+    total = sum(count for count, _ in results)
+    top = merge_top_k([shard_top for _, shard_top in results], top_k)
+    return total, [(features.student_ids[row], score) for score, row in top]
+
+
+def _score_columns(arrays: dict, start: int, stop: int, sessions: list[dict],
+                   similarities: list[Optional[np.ndarray]]) -> np.ndarray:
+    columns = [score_rows(arrays, start, stop, session, similarity) for session, similarity in zip(sessions, similarities)]
+    return np.column_stack(columns) if columns else np.zeros((stop - start, 0))
+
+
+def score_matrix_shard(path: str, layout: dict, start: int, stop: int, sessions: list[dict],
+                       similarities: list[Optional[np.ndarray]]) -> np.ndarray:
+    """
+    Pool task: the score block of rows [start, stop) against every session.
+    """
+    return _score_columns(_attach(path, layout), start, stop, sessions, similarities)
+
+
+def score_matrix(features: MatchFeatures, matchers: list[SessionMatcher], similarities: list[dict],
+                 executor: Optional[Executor] = None, shards: int = 1) -> np.ndarray:
+    """
+    Students x sessions match scores; column j equals matchers[j].score for
+    every student, blended with similarities[j]. Row blocks run in `executor`
+    when given, otherwise in this process.
+    """
+    sessions = [features.compile_session(matcher) for matcher in matchers]
+    similarity = [features.similarity_array(session_similarities) for session_similarities in similarities]
+    if executor is None:
+        return _score_columns(features.arrays, 0, len(features), sessions, similarity)
+    futures = [
+        executor.submit(score_matrix_shard, features.path, features.layout, start, stop, sessions,
+                        [array[start:stop] if array is not None else None for array in similarity])
+        for start, stop in shard_bounds(len(features), shards)
+    ]
+    blocks = [future.result() for future in futures]
+    return np.vstack(blocks) if blocks else np.zeros((0, len(sessions)))
+
+
+def matrix_matches(features: MatchFeatures, scores: np.ndarray, min_score: float) -> list[list[tuple[str, float]]]:
+    """
+    Per session (column), every student at or above min_score as
+    (student_id, score), best first; ties keep row order.
+    """
+    matches = []
+    for column in range(scores.shape[1]):
+        session_scores = scores[:, column]
+        rows = np.flatnonzero(session_scores >= min_score)
+        rows = rows[np.argsort(-session_scores[rows], kind="stable")]
+        matches.append([(features.student_ids[row], float(session_scores[row])) for row in rows.tolist()])
+    return matches
@@ -0,0 +1,580 @@
+"""
+Durable background job queue for resume processing.
+
+Jobs are persisted in a local SQLite file (or Redis, when RESUME_JOB_REDIS_URL
+is set and the redis package is installed) and executed by asyncio workers.
+A job is identified for idempotency by student_id plus the SHA-256 of the
+uploaded file, so re-posting the same resume returns the existing job.
+
+A running job holds a lease that its worker renews while the handler runs.
+If the worker's process dies, the lease expires: the job may then be
+submitted again, and every queue's periodic sweep re-queues it (or fails
+it once its attempts are used up). Each claim gets a fresh claim_id, and a
+worker's progress, completion and failure writes only apply while its claim
+is still the running one, so a worker that lost its lease cannot overwrite
+the job's next attempt.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+LEASE_EXPIRED_ERROR = "Worker stopped renewing the job lease (process crashed or was killed)"
+
+# Handler signature: (student_id, file_bytes, report_progress) -> result dict
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+JobHandler = Callable[[str, bytes, ProgressCallback], Awaitable[Dict]]
+
+
+def hash_file_bytes(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def make_idempotency_key(student_id: str, file_hash: str) -> str:
+    return f"{student_id}:{file_hash}"
+
+
+class SQLiteJobStore:
+    """
+    Job store backed by a single SQLite file, which several processes may
+    share. Safe to call from worker threads. A running job's lease is its
+    updated_at, renewed by heartbeat().
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                id TEXT PRIMARY KEY,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                student_id TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                payload BLOB,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                next_run_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                claim_id TEXT
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(resume_jobs)")}
+        if "claim_id" not in columns:  # files created before claims existed
+            self._conn.execute("ALTER TABLE resume_jobs ADD COLUMN claim_id TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_resume_jobs_runnable ON resume_jobs (status, next_run_at)"
+        )
+
+    def _row_to_job(self, row: Optional[sqlite3.Row], include_payload: bool = False) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        if not include_payload:
+            job.pop("payload", None)
+        return job
+
+    def enqueue(self, student_id: str, file_bytes: bytes, max_attempts: int) -> tuple[Dict, bool]:
+        """
+        Adds a job unless one with the same idempotency key exists.
+        Returns (job, created). A previously failed job, or a running one whose
+        lease expired, is reset and re-queued.
+        """
+        file_hash = hash_file_bytes(file_bytes)
+        key = make_idempotency_key(student_id, file_hash)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT * FROM resume_jobs WHERE idempotency_key = ?", (key,)).fetchone()
+                if row is not None and row["status"] != JOB_FAILED and not (
+                    row["status"] == JOB_RUNNING and row["updated_at"] < now - self.lease_seconds
+                ):
+                    self._conn.execute("COMMIT")
+                    return self._row_to_job(row), False
+
+                if row is not None:
+                    job_id = row["id"]
+                    self._conn.execute(
+                        """UPDATE resume_jobs SET payload = ?, status = ?, stage = NULL, progress = 0, attempts = 0,
+                           max_attempts = ?, next_run_at = ?, result = NULL, error = NULL, updated_at = ?,
+                           claim_id = NULL WHERE id = ?""",
+                        (file_bytes, JOB_QUEUED, max_attempts, now, now, job_id),
+                    )
+                else:
+                    job_id = str(uuid.uuid4())
+                    self._conn.execute(
+                        """INSERT INTO resume_jobs (id, idempotency_key, student_id, file_hash, payload, status,
+                           max_attempts, next_run_at, created_at, updated_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (job_id, key, student_id, file_hash, file_bytes, JOB_QUEUED, max_attempts, now, now, now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(job_id), True
+
+    def claim_next(self) -> Optional[Dict]:
+        """
+        Atomically marks the oldest runnable job as running and returns it with
+        its payload and the claim_id its worker passes to later writes.
+        """
+        now = time.time()
+        claim_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """SELECT * FROM resume_jobs WHERE status = ? AND next_run_at <= ?
+                       ORDER BY next_run_at LIMIT 1""",
+                    (JOB_QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE resume_jobs SET status = ?, attempts = attempts + 1, updated_at = ?, claim_id = ? WHERE id = ?",
+                    (JOB_RUNNING, now, claim_id, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._row_to_job(row, include_payload=True)
+        job["status"] = JOB_RUNNING
+        job["attempts"] += 1
+        job["claim_id"] = claim_id
+        return job
+
+    # The writes below apply only while claim_id still holds the running job,
+    # and return whether they did
+
+    def update_progress(self, job_id: str, claim_id: str, stage: str, progress: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE resume_jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ? AND status = ? AND claim_id = ?",
+                (stage, progress, time.time(), job_id, JOB_RUNNING, claim_id),
+            )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, claim_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE resume_jobs SET updated_at = ? WHERE id = ? AND status = ? AND claim_id = ?",
+                (time.time(), job_id, JOB_RUNNING, claim_id),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, claim_id: str, result: Dict) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE resume_jobs SET status = ?, stage = 'done', progress = 100, result = ?, error = NULL,
+                   payload = NULL, updated_at = ? WHERE id = ? AND status = ? AND claim_id = ?""",
+                (JOB_SUCCEEDED, json.dumps(result), time.time(), job_id, JOB_RUNNING, claim_id),
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, claim_id: str, error: str, retry_at: Optional[float]) -> bool:
+        """
+        Records an error. The job is re-queued for retry_at, or failed for good if retry_at is None.
+        """
+        now = time.time()
+        with self._lock:
+            if retry_at is None:
+                cursor = self._conn.execute(
+                    """UPDATE resume_jobs SET status = ?, error = ?, payload = NULL, updated_at = ?
+                       WHERE id = ? AND status = ? AND claim_id = ?""",
+                    (JOB_FAILED, error, now, job_id, JOB_RUNNING, claim_id),
+                )
+            else:
+                cursor = self._conn.execute(
+                    """UPDATE resume_jobs SET status = ?, error = ?, next_run_at = ?, updated_at = ?
+                       WHERE id = ? AND status = ? AND claim_id = ?""",
+                    (JOB_QUEUED, error, retry_at, now, job_id, JOB_RUNNING, claim_id),
+                )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM resume_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def requeue_interrupted(self) -> int:
+        # Other processes may be running jobs from the shared file; only expired leases are theirs to lose
+        return self.requeue_expired()
+
+    def requeue_expired(self) -> int:
+        """
+        Re-queues running jobs whose lease expired, failing those out of attempts. Returns how many were re-queued.
+        """
+        now = time.time()
+        cutoff = now - self.lease_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """UPDATE resume_jobs SET status = ?, error = ?, payload = NULL, updated_at = ?
+                       WHERE status = ? AND updated_at < ? AND attempts >= max_attempts""",
+                    (JOB_FAILED, LEASE_EXPIRED_ERROR, now, JOB_RUNNING, cutoff),
+                )
+                cursor = self._conn.execute(
+                    """UPDATE resume_jobs SET status = ?, error = ?, next_run_at = ?, updated_at = ?
+                       WHERE status = ? AND updated_at < ?""",
+                    (JOB_QUEUED, LEASE_EXPIRED_ERROR, now, now, JOB_RUNNING, cutoff),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+
+class RedisJobStore:
+    """
+    Job store backed by Redis: one hash per job, an idempotency key per
+    (student, file), a sorted set of queued job ids scored by next_run_at and
+    one of running job ids scored by their last heartbeat (the lease).
+    """
+
+    def __init__(self, url: str, prefix: str = "resume_jobs", lease_seconds: float = 60.0):
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._queue_key = f"{prefix}:queue"
+        self._running_key = f"{prefix}:running"
+        self.lease_seconds = lease_seconds
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._prefix}:job:{job_id}"
+
+    def _payload_key(self, job_id: str) -> str:
+        return f"{self._prefix}:payload:{job_id}"
+
+    def _decode(self, raw: Dict) -> Optional[Dict]:
+        if not raw:
+            return None
+        job = {k.decode(): v.decode() for k, v in raw.items()}
+        for field in ("progress", "attempts", "max_attempts"):
+            job[field] = int(job.get(field, 0))
+        for field in ("next_run_at", "created_at", "updated_at"):
+            job[field] = float(job.get(field, 0))
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        job["stage"] = job.get("stage") or None
+        job["error"] = job.get("error") or None
+        job["claim_id"] = job.get("claim_id") or None
+        return job
+
+    def enqueue(self, student_id: str, file_bytes: bytes, max_attempts: int) -> tuple[Dict, bool]:
+        file_hash = hash_file_bytes(file_bytes)
+        idem_key = f"{self._prefix}:idem:{make_idempotency_key(student_id, file_hash)}"
+        job_id = str(uuid.uuid4())
+        now = time.time()
+
+        if not self._redis.set(idem_key, job_id, nx=True):
+            existing_id = self._redis.get(idem_key).decode()
+            existing = self.get(existing_id)
+            if existing is not None and existing["status"] != JOB_FAILED and not (
+                existing["status"] == JOB_RUNNING and existing["updated_at"] < now - self.lease_seconds
+            ):
+                return existing, False
+            job_id = existing_id
+
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._running_key, job_id)
+        pipe.hset(self._job_key(job_id), mapping={
+            "id": job_id,
+            "idempotency_key": make_idempotency_key(student_id, file_hash),
+            "student_id": student_id,
+            "file_hash": file_hash,
+            "status": JOB_QUEUED,
+            "stage": "",
+            "progress": 0,
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "next_run_at": now,
+            "result": "",
+            "error": "",
+            "created_at": now,
+            "updated_at": now,
+            "claim_id": "",
+        })
+        pipe.set(self._payload_key(job_id), file_bytes)
+        pipe.zadd(self._queue_key, {job_id: now})
+        pipe.execute()
+        return self.get(job_id), True
+
+    def claim_next(self) -> Optional[Dict]:
+        now = time.time()
+        for raw_id in self._redis.zrangebyscore(self._queue_key, 0, now, start=0, num=5):
+            # ZREM succeeds for exactly one competing worker
+            if not self._redis.zrem(self._queue_key, raw_id):
+                continue
+            job_id = raw_id.decode()
+            pipe = self._redis.pipeline()
+            pipe.hset(self._job_key(job_id), mapping={"status": JOB_RUNNING, "updated_at": now, "claim_id": str(uuid.uuid4())})
+            pipe.hincrby(self._job_key(job_id), "attempts", 1)
+            pipe.zadd(self._running_key, {job_id: now})
+            pipe.execute()
+            job = self.get(job_id)
+            job["payload"] = self._redis.get(self._payload_key(job_id))
+            return job
+        return None
+
+    def _write_if_claimed(self, job_id: str, claim_id: str, write: Callable) -> bool:
+        """
+        Runs write(pipe) in a transaction if claim_id still holds the running job; returns whether it did.
+        """
+        job_key = self._job_key(job_id)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(job_key)
+                    status, current = pipe.hmget(job_key, "status", "claim_id")
+                    if status is None or status.decode() != JOB_RUNNING or (current or b"").decode() != claim_id:
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    write(pipe)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue  # a concurrent write to the job; check the claim again
+
+    def update_progress(self, job_id: str, claim_id: str, stage: str, progress: int) -> bool:
+        now = time.time()
+
+        def write(pipe) -> None:
+            pipe.hset(self._job_key(job_id), mapping={"stage": stage, "progress": progress, "updated_at": now})
+            pipe.zadd(self._running_key, {job_id: now}, xx=True)
+
+        return self._write_if_claimed(job_id, claim_id, write)
+
+    def heartbeat(self, job_id: str, claim_id: str) -> bool:
+        now = time.time()
+
+        def write(pipe) -> None:
+            pipe.hset(self._job_key(job_id), "updated_at", now)
+            pipe.zadd(self._running_key, {job_id: now}, xx=True)
+
+        return self._write_if_claimed(job_id, claim_id, write)
+
+    def complete(self, job_id: str, claim_id: str, result: Dict) -> bool:
+        def write(pipe) -> None:
+            pipe.hset(self._job_key(job_id), mapping={
+                "status": JOB_SUCCEEDED, "stage": "done", "progress": 100,
+                "result": json.dumps(result), "error": "", "updated_at": time.time(),
+            })
+            pipe.zrem(self._running_key, job_id)
+            pipe.delete(self._payload_key(job_id))
+
+        return self._write_if_claimed(job_id, claim_id, write)
+
+    def fail(self, job_id: str, claim_id: str, error: str, retry_at: Optional[float]) -> bool:
+        now = time.time()
+
+        def write(pipe) -> None:
+            pipe.zrem(self._running_key, job_id)
+            if retry_at is None:
+                pipe.hset(self._job_key(job_id), mapping={"status": JOB_FAILED, "error": error, "updated_at": now})
+                pipe.delete(self._payload_key(job_id))
+            else:
+                pipe.hset(self._job_key(job_id), mapping={
+                    "status": JOB_QUEUED, "error": error, "next_run_at": retry_at, "updated_at": now,
+                })
+                pipe.zadd(self._queue_key, {job_id: retry_at})
+
+        return self._write_if_claimed(job_id, claim_id, write)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._decode(self._redis.hgetall(self._job_key(job_id)))
+
+    def requeue_interrupted(self) -> int:
+        # Other processes may be running jobs from the shared queue; only expired leases are theirs to lose
+        return self.requeue_expired()
+
+    def requeue_expired(self) -> int:
+        """
+        Re-queues running jobs whose lease expired, failing those out of attempts. Returns how many were re-queued.
+        """
+        now = time.time()
+        cutoff = now - self.lease_seconds
+        requeued = 0
+        for raw_id in self._redis.zrangebyscore(self._running_key, 0, cutoff):
+            job_id = raw_id.decode()
+            job_key = self._job_key(job_id)
+            with self._redis.pipeline() as pipe:
+                try:
+                    # A heartbeat, completion or competing sweep in between aborts the transaction
+                    pipe.watch(job_key, self._running_key)
+                    score = pipe.zscore(self._running_key, job_id)
+                    job = self._decode(pipe.hgetall(job_key))
+                    if score is None or score >= cutoff or job is None or job["status"] != JOB_RUNNING:
+                        pipe.unwatch()
+                        continue
+                    pipe.multi()
+                    pipe.zrem(self._running_key, job_id)
+                    if job["attempts"] >= job["max_attempts"]:
+                        pipe.hset(job_key, mapping={"status": JOB_FAILED, "error": LEASE_EXPIRED_ERROR, "updated_at": now})
+                        pipe.delete(self._payload_key(job_id))
+                    else:
+                        pipe.hset(job_key, mapping={
+                            "status": JOB_QUEUED, "error": LEASE_EXPIRED_ERROR, "next_run_at": now, "updated_at": now,
+                        })
+                        pipe.zadd(self._queue_key, {job_id: now})
+                        requeued += 1
+                    pipe.execute()
+                except redis.WatchError:
+                    continue
+        return requeued
+
+
+class ResumeJobQueue:
+    """
+    Runs queued jobs on `concurrency` asyncio workers with exponential backoff between attempts.
+    """
+
+    def __init__(
+        self,
+        store,
+        handler: JobHandler,
+        concurrency: int = 2,
+        max_attempts: int = 3,
+        backoff_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval = poll_interval
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        requeued = await asyncio.to_thread(self.store.requeue_interrupted)
+        if requeued:
+            print(f"Re-queued {requeued} resume jobs interrupted by a previous shutdown")
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.concurrency)]
+        self._workers.append(asyncio.create_task(self._requeue_expired_leases()))
+        print(f"Started {self.concurrency} resume job workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, student_id: str, file_bytes: bytes) -> tuple[Dict, bool]:
+        job, created = await asyncio.to_thread(self.store.enqueue, student_id, file_bytes, self.max_attempts)
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return job, created
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _wait_for_work(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _requeue_expired_leases(self) -> None:
+        """
+        Sweeps for jobs whose worker died; any process's queue can pick them up.
+        """
+        while True:
+            await asyncio.sleep(self.store.lease_seconds)
+            try:
+                requeued = await asyncio.to_thread(self.store.requeue_expired)
+            except Exception as e:
+                print(f"Resume job lease sweep failed: {e}")
+                continue
+            if requeued:
+                print(f"Re-queued {requeued} resume jobs whose worker stopped renewing the lease")
+                self._wakeup.set()
+
+    async def _heartbeat(self, job_id: str, claim_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.store.heartbeat, job_id, claim_id)
+            except Exception as e:
+                print(f"Resume job {job_id} heartbeat failed: {e}")
+
+    async def _worker(self, worker_number: int) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim_next)
+            except Exception as e:
+                print(f"Resume job worker {worker_number} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                await self._wait_for_work()
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: Dict) -> None:
+        job_id = job["id"]
+        claim_id = job["claim_id"]
+
+        async def report_progress(stage: str, progress: int) -> None:
+            await asyncio.to_thread(self.store.update_progress, job_id, claim_id, stage, progress)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, claim_id))
+        try:
+            result = await self.handler(job["student_id"], job["payload"], report_progress)
+            if await asyncio.to_thread(self.store.complete, job_id, claim_id, result):
+                print(f"Resume job {job_id} succeeded on attempt {job['attempts']}")
+            else:
+                print(f"Resume job {job_id} finished after its lease was lost; result discarded")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            retryable = getattr(e, "retryable", True)
+            if retryable and job["attempts"] < job["max_attempts"]:
+                retry_at = time.time() + self.backoff_seconds * (2 ** (job["attempts"] - 1))
+                print(f"Resume job {job_id} failed (attempt {job['attempts']}), retrying: {e}")
+            else:
+                retry_at = None
+                print(f"Resume job {job_id} failed permanently: {e}")
+            if not await asyncio.to_thread(self.store.fail, job_id, claim_id, str(e), retry_at):
+                print(f"Resume job {job_id} failed after its lease was lost; error discarded")
+        finally:
+            heartbeat.cancel()
@@ -1,4 +1,4 @@
-import { useState, useRef } from 'react';
+import { useState, useRef, useEffect } from 'react';
 import { Button } from '@/components/ui/button';
 import { Upload, FileText, CheckCircle, X, AlertCircle } from 'lucide-react';
 import { useToast } from '@/hooks/use-toast';
@@ -14,6 +14,29 @@ interface ResumeUploadProps {
   hasExistingResume?: boolean;
 }
 
+interface ResumeJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  stage: string | null;
+  progress: number;
+  error: string | null;
+}
+
+const API_BASE_URL = 'http://localhost:8000';
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+const JOB_STAGE_LABELS: Record<string, string> = {
+  pdf_extraction: 'Reading your resume...',
+  embedding: 'Indexing your resume for search...',
+  summary: 'Summarizing your experience...',
+  extraction: 'Extracting skills and education...',
+  supabase_update: 'Updating your profile...',
+  summary_embedding: 'Indexing your summary...',
+};
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUploadProps) => {
   const [isDragging, setIsDragging] = useState(false);
   const [uploadStatus, setUploadStatus] = useState<'idle' | 'uploading' | 'success' | 'error'>('idle');
@@ -24,6 +47,39 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
   const updateStudentData = useUpdateStudentData();
   const [showUploadDialog, setShowUploadDialog] = useState(false);
   const [isUploading, setIsUploading] = useState(false);
+  const [jobProgress, setJobProgress] = useState<{ stage: string | null; progress: number } | null>(null);
+  const [errorMessage, setErrorMessage] = useState<string | null>(null);
+  const mountedRef = useRef(true);
+
+  useEffect(() => {
+    mountedRef.current = true;
+    return () => {
+      mountedRef.current = false;
+    };
+  }, []);
+
+  // Polls the background job until it succeeds or fails, reporting its stage as it goes
+  const waitForResumeJob = async (jobId: string): Promise<ResumeJob> => {
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+    while (mountedRef.current) {
+      const response = await fetch(`${API_BASE_URL}/resume-jobs/${jobId}`);
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || 'Could not check the resume processing status.');
+      }
+      const { job } = (await response.json()) as { job: ResumeJob };
+      if (!mountedRef.current) break;
+      setJobProgress({ stage: job.stage, progress: job.progress });
+      if (job.status === 'succeeded' || job.status === 'failed') {
+        return job;
+      }
+      if (Date.now() > deadline) {
+        throw new Error('Your resume is still being processed. Please check back in a few minutes.');
+      }
+      await sleep(JOB_POLL_INTERVAL_MS);
+    }
+    throw new Error('Upload cancelled.');
+  };
 
   const handleDragOver = (e: React.DragEvent) => {
     e.preventDefault();
@@ -84,7 +140,10 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
     if (!selectedFile || !user) return;
 
     setIsUploading(true);
+    setUploadStatus('uploading');
     setShowUploadDialog(false); // Close dialog when upload starts
+    setJobProgress(null);
+    setErrorMessage(null);
     
     try {
       // Create unique filename
@@ -110,12 +169,12 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
         resume_url: data.publicUrl
       });
 
-      // --- NEW: Call FastAPI to embed resume and update resume_embedding ---
+      // --- NEW: Queue the resume on FastAPI for background embedding and extraction ---
       const formData = new FormData();
       formData.append('student_id', user.id);
       formData.append('file', selectedFile);
 
-      const response = await fetch('http://localhost:8000/embed-resume/', {
+      const response = await fetch(`${API_BASE_URL}/embed-resume-async/`, {
         method: 'POST',
         body: formData
       });
@@ -124,31 +183,45 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
         const errorData = await response.json().catch(() => ({}));
         throw new Error(errorData.detail || 'Embedding failed.');
       }
+
+      // The upload only queues the job; report success once it has been processed
+      const queuedJob = (await response.json()) as ResumeJob;
+      const job = await waitForResumeJob(queuedJob.job_id);
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Your resume could not be processed.');
+      }
       // --- END NEW ---
       
+      if (!mountedRef.current) return;
       setUploadStatus('success');
       onUploadSuccess(true);
       
       toast({
         title: "Upload Successful!",
-        description: "Your resume has been uploaded and is being analyzed. Please wait for the analysis to complete."
+        description: "Your resume has been processed and your profile has been updated."
       });
     } catch (error: any) {
       console.error('Upload error:', error);
+      if (!mountedRef.current) return;
       setUploadStatus('error');
+      setErrorMessage(error.message || null);
       toast({
         title: "Upload Failed",
         description: error.message || "There was an error uploading or embedding your resume. Please try again.",
         variant: "destructive"
       });
     } finally {
-      setIsUploading(false);
+      if (mountedRef.current) {
+        setIsUploading(false);
+      }
     }
   };
 
   const resetUpload = () => {
     setSelectedFile(null);
     setUploadStatus('idle');
+    setJobProgress(null);
+    setErrorMessage(null);
     setShowUploadDialog(false);
     if (fileInputRef.current) {
       fileInputRef.current.value = '';
@@ -243,10 +316,17 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
         </div>
         <div>
           <h3 className="text-lg font-medium text-gray-900">Uploading & Processing...</h3>
-          <p className="text-sm text-gray-600">Please wait while we upload and analyze your resume.</p>
+          <p className="text-sm text-gray-600">
+            {jobProgress?.stage
+              ? JOB_STAGE_LABELS[jobProgress.stage] || 'Analyzing your resume...'
+              : 'Please wait while we upload and analyze your resume.'}
+          </p>
         </div>
         <div className="w-full bg-gray-200 rounded-full h-2">
-          <div className="bg-primary h-2 rounded-full animate-pulse" style={{ width: '75%' }}></div>
+          <div
+            className="bg-primary h-2 rounded-full transition-all duration-500"
+            style={{ width: `${Math.max(5, jobProgress?.progress ?? 5)}%` }}
+          ></div>
         </div>
       </div>
     );
@@ -261,7 +341,7 @@ const ResumeUpload = ({ onUploadSuccess, hasExistingResume = false }: ResumeUplo
         <div>
           <h3 className="text-lg font-medium text-gray-900">Upload Failed</h3>
           <p className="text-sm text-gray-600">
-            There was an error uploading your resume. Please try again.
+            {errorMessage || 'There was an error uploading your resume.'} Please try again.
           </p>
         </div>
         <Button onClick={resetUpload}>
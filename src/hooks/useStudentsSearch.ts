@@ -34,19 +34,23 @@ export const useStudentsSearch = (searchQuery?: string, selectedSkills: string[]
       }
       const data = await response.json();
       // Map backend results to SearchResultStudent interface
-      return (data.results || []).map((student: any): SearchResultStudent => ({
-        id: student.id,
-        name: student.full_name || 'Unknown',
-        year: student.year || 'Not specified',
-        department: student.department || 'Not specified',
-        skills: Array.isArray(student.skills) ? student.skills : (student.skills ? student.skills.split(',') : []),
-        gpa: student.gpa !== undefined && student.gpa !== null ? String(student.gpa) : 'N/A',
-        resumeUrl: student.resume_url || '',
-        email: student.email || '',
-        matchScore: student.similarity ? Math.round(student.similarity * 100) : 0,
-        ats_score: student.ats_score, // Map ats_score
-        has_internship: student.has_internship, // Map has_internship
-      }));
+      return (data.results || []).map((student: any): SearchResultStudent => {
+        // Hybrid (query + skills) results carry a fused score; fall back to raw similarity
+        const score = student.hybrid_score ?? student.similarity;
+        return {
+          id: student.id,
+          name: student.full_name || 'Unknown',
+          year: student.year || 'Not specified',
+          department: student.department || 'Not specified',
+          skills: Array.isArray(student.skills) ? student.skills : (student.skills ? student.skills.split(',') : []),
+          gpa: student.gpa !== undefined && student.gpa !== null ? String(student.gpa) : 'N/A',
+          resumeUrl: student.resume_url || '',
+          email: student.email || '',
+          matchScore: score ? Math.round(score * 100) : 0,
+          ats_score: student.ats_score, // Map ats_score
+          has_internship: student.has_internship, // Map has_internship
+        };
+      });
     },
     enabled: false, // Only run when explicitly called
   });
@@ -19,8 +19,11 @@ export type Database = {
           created_at: string
           current_hires: number
           description: string | null
+          description_hash: string | null
           eligibility_criteria: Json
           id: string
+          job_embedding: string | null
+          job_embedding_hash: string | null
           recruiter_id: string
           requirements: Json
           role: string
@@ -33,8 +36,11 @@ export type Database = {
           created_at?: string
           current_hires?: number
           description?: string | null
+          description_hash?: string | null
           eligibility_criteria?: Json
           id?: string
+          job_embedding?: string | null
+          job_embedding_hash?: string | null
           recruiter_id: string
           requirements?: Json
           role: string
@@ -47,8 +53,11 @@ export type Database = {
           created_at?: string
           current_hires?: number
           description?: string | null
+          description_hash?: string | null
           eligibility_criteria?: Json
           id?: string
+          job_embedding?: string | null
+          job_embedding_hash?: string | null
           recruiter_id?: string
           requirements?: Json
           role?: string
@@ -154,6 +163,38 @@ export type Database = {
           },
         ]
       }
+      student_resume_chunks: {
+        Row: {
+          chunk_index: number
+          content: string
+          created_at: string
+          embedding: string
+          student_id: string
+        }
+        Insert: {
+          chunk_index: number
+          content: string
+          created_at?: string
+          embedding: string
+          student_id: string
+        }
+        Update: {
+          chunk_index?: number
+          content?: string
+          created_at?: string
+          embedding?: string
+          student_id?: string
+        }
+        Relationships: [
+          {
+            foreignKeyName: "student_resume_chunks_student_id_fkey"
+            columns: ["student_id"]
+            isOneToOne: false
+            referencedRelation: "students"
+            referencedColumns: ["id"]
+          },
+        ]
+      }
       students: {
         Row: {
           ats_score: number | null
@@ -161,6 +202,7 @@ export type Database = {
           created_at: string | null
           department: string | null
           education: Json | null
+          embedding_model: string | null
           experience: Json | null
           gpa: string | null
           has_internship: boolean | null
@@ -171,6 +213,7 @@ export type Database = {
           skills: string[] | null
           summary: string | null
           summary_embedding: string | null
+          term_frequencies: Json | null
           updated_at: string | null
           year: string | null
         }
@@ -180,6 +223,7 @@ export type Database = {
           created_at?: string | null
           department?: string | null
           education?: Json | null
+          embedding_model?: string | null
           experience?: Json | null
           gpa?: string | null
           has_internship?: boolean | null
@@ -190,6 +234,7 @@ export type Database = {
           skills?: string[] | null
           summary?: string | null
           summary_embedding?: string | null
+          term_frequencies?: Json | null
           updated_at?: string | null
           year?: string | null
         }
@@ -199,6 +244,7 @@ export type Database = {
           created_at?: string | null
           department?: string | null
           education?: Json | null
+          embedding_model?: string | null
           experience?: Json | null
           gpa?: string | null
           has_internship?: boolean | null
@@ -209,6 +255,7 @@ export type Database = {
           skills?: string[] | null
           summary?: string | null
           summary_embedding?: string | null
+          term_frequencies?: Json | null
           updated_at?: string | null
           year?: string | null
         }
@@ -290,6 +337,27 @@ export type Database = {
           similarity: number
         }[]
       }
+      match_students_by_embedding_and_skills: {
+        Args: {
+          query_embedding: string
+          filter_skills: string[]
+          match_count?: number
+        }
+        Returns: {
+          id: string
+          email: string
+          full_name: string
+          role: string
+          year: string
+          department: string
+          gpa: string
+          skills: string[]
+          resume_url: string
+          ats_score: number
+          has_internship: boolean
+          similarity: number
+        }[]
+      }
       sparsevec_out: {
         Args: { "": unknown }
         Returns: unknown
@@ -0,0 +1,214 @@
+"""
+Async resume summarization client.
+
+Calls Groq's OpenAI-compatible chat completions API over httpx so the event
+loop is never blocked, limits concurrency and request/token rates to the
+provider's quotas, falls back to a local model on the Ollama instance, and
+caches summaries per text hash. Concurrent requests for the same text share
+one provider call. Chat completions take one conversation per request, so
+there is no request batching beyond that coalescing. One HTTP connection pool
+is kept for the client's lifetime; call aclose() on shutdown. Both base URLs
+are configurable, so the client can be pointed at local stub servers
+(benchmarks/stub_llm.py).
+"""
+import asyncio
+import hashlib
+import time
+import traceback
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+from caching import SingleFlight
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a helpful assistant trained to summarize resumes. "
+    "Provide a concise and well-structured summary of the following resume text."
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket: holds up to `capacity` tokens, refilled continuously
+    at `refill_per_second`. acquire() waits until enough tokens are available.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.refill_per_second)
+
+
+class SummaryClient:
+    """
+    Summarizes text with Groq, falling back to an Ollama model, with a
+    concurrency limit, request/token rate limits, timeouts and an LRU cache.
+    Waiting for the rate limits counts against timeout_seconds too.
+    """
+
+    def __init__(
+        self,
+        groq_api_key: Optional[str],
+        groq_base_url: str = "https://api.groq.com/openai/v1",
+        groq_model: str = "llama3-8b-8192",
+        ollama_base_url: Optional[str] = None,
+        ollama_model: Optional[str] = None,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 6000,
+        timeout_seconds: float = 30.0,
+        max_tokens: int = 500,
+        cache_size: int = 512,
+    ):
+        self.groq_api_key = groq_api_key.strip() if groq_api_key else None
+        self.groq_base_url = groq_base_url.rstrip("/")
+        self.groq_model = groq_model
+        self.ollama_base_url = ollama_base_url.rstrip("/") if ollama_base_url else None
+        self.ollama_model = ollama_model
+        self.timeout_seconds = timeout_seconds
+        self.max_tokens = max_tokens
+        self.cache_size = cache_size
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self._token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight = SingleFlight()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _http_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop, and again after aclose()
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=self.timeout_seconds)
+        return self._http
+
+    async def aclose(self) -> None:
+        """Closes the shared HTTP connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def groq_enabled(self) -> bool:
+        return bool(self.groq_api_key)
+
+    @property
+    def fallback_enabled(self) -> bool:
+        return bool(self.ollama_base_url and self.ollama_model)
+
+    @property
+    def enabled(self) -> bool:
+        return self.groq_enabled or self.fallback_enabled
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+
+    def _messages(self, text: str) -> list[dict]:
+        return [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ]
+
+    async def _acquire_groq_quota(self, text: str) -> None:
+        await self._request_bucket.acquire(1)
+        await self._token_bucket.acquire(self._estimate_tokens(text) + self.max_tokens)
+
+    async def _summarize_with_groq(self, text: str) -> str:
+        response = await self._http_client().post(
+            f"{self.groq_base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.groq_api_key}"},
+            json={
+                "model": self.groq_model,
+                "messages": self._messages(text),
+                "temperature": 0.7,
+                "max_tokens": self.max_tokens,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"] or ""
+
+    async def _summarize_with_ollama(self, text: str) -> str:
+        response = await self._http_client().post(
+            f"{self.ollama_base_url}/api/chat",
+            json={
+                "model": self.ollama_model,
+                "messages": self._messages(text),
+                "stream": False,
+                "options": {"temperature": 0.7, "num_predict": self.max_tokens},
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get("message", {}).get("content") or ""
+
+    async def summarize(self, text: str) -> str:
+        """
+        Returns a summary of text, or "" if no provider is configured or all providers failed.
+        """
+        text = text.strip() if text else ""
+        if not text or not self.enabled:
+            return ""
+
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        return await self._in_flight.do(key, lambda: self._summarize_uncached(text, key))
+
+    async def _summarize_uncached(self, text: str, key: str) -> str:
+        summary = ""
+        groq_ready = False
+        if self.groq_enabled:
+            # Wait for Groq's quota before taking a concurrency slot, and no
+            # longer than a request may take; past that the fallback is faster
+            try:
+                await asyncio.wait_for(self._acquire_groq_quota(text), self.timeout_seconds)
+                groq_ready = True
+            except asyncio.TimeoutError:
+                print(f"Groq rate limit wait exceeds {self.timeout_seconds}s, skipping Groq")
+
+        async with self._semaphore:
+            if groq_ready:
+                try:
+                    summary = await self._summarize_with_groq(text)
+                except Exception as e:
+                    print("Groq summarization error:", e)
+                    traceback.print_exc()
+
+            if not summary and self.fallback_enabled:
+                try:
+                    summary = await self._summarize_with_ollama(text)
+                    print(f"Generated summary with fallback model {self.ollama_model}")
+                except Exception as e:
+                    print("Ollama summarization error:", e)
+                    traceback.print_exc()
+
+        # Only successful summaries are cached, so failures are retried next time
+        if summary:
+            self._cache[key] = summary
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
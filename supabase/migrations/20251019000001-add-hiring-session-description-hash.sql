@@ -0,0 +1,3 @@
+-- Track which job description the stored requirements/eligibility_criteria were extracted from
+-- so the backend can detect edited descriptions and re-extract only when needed
+ALTER TABLE public.hiring_sessions ADD COLUMN IF NOT EXISTS description_hash TEXT;
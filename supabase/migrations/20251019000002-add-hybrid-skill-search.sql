@@ -0,0 +1,48 @@
+-- Hybrid search: filter students by skills first (served by idx_students_skills),
+-- then rank only the filtered candidates by cosine similarity to the query embedding
+CREATE OR REPLACE FUNCTION public.match_students_by_embedding_and_skills(
+  query_embedding vector(1024),
+  filter_skills TEXT[],
+  match_count INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+  id UUID,
+  email TEXT,
+  full_name TEXT,
+  role TEXT,
+  year TEXT,
+  department TEXT,
+  gpa TEXT,
+  skills TEXT[],
+  resume_url TEXT,
+  ats_score INTEGER,
+  has_internship BOOLEAN,
+  similarity DOUBLE PRECISION
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH filtered AS MATERIALIZED (
+    SELECT s.id, s.year, s.department, s.gpa, s.skills, s.resume_url, s.ats_score, s.has_internship, s.resume_embeddings
+    FROM public.students s
+    WHERE s.skills && filter_skills
+      AND s.resume_embeddings IS NOT NULL
+  )
+  SELECT
+    f.id,
+    p.email,
+    p.full_name,
+    p.role::TEXT,
+    f.year,
+    f.department,
+    f.gpa,
+    f.skills,
+    f.resume_url,
+    f.ats_score,
+    f.has_internship,
+    1 - (f.resume_embeddings <=> query_embedding) AS similarity
+  FROM filtered f
+  JOIN public.profiles p ON p.id = f.id
+  ORDER BY f.resume_embeddings <=> query_embedding
+  LIMIT match_count;
+$$;
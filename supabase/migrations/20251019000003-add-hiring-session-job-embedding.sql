@@ -0,0 +1,4 @@
+-- Cache the job description embedding on the session so semantic match scoring
+-- does not re-embed the description on every match/refresh
+ALTER TABLE public.hiring_sessions ADD COLUMN IF NOT EXISTS job_embedding vector(1024);
+ALTER TABLE public.hiring_sessions ADD COLUMN IF NOT EXISTS job_embedding_hash TEXT;
@@ -0,0 +1,46 @@
+-- Notify listeners when rows the backend caches change, so process-local
+-- caches can be invalidated on writes made outside the backend
+CREATE OR REPLACE FUNCTION public.notify_row_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  changed RECORD;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    changed := OLD;
+  ELSE
+    changed := NEW;
+  END IF;
+
+  PERFORM pg_notify(
+    'talentmap_row_changes',
+    json_build_object(
+      'table', TG_TABLE_NAME,
+      'id', changed.id,
+      'session_id', CASE WHEN TG_TABLE_NAME = 'session_candidates' THEN to_jsonb(changed)->>'session_id' END
+    )::text
+  );
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER notify_hiring_sessions_change
+  AFTER INSERT OR UPDATE OR DELETE ON public.hiring_sessions
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_row_change();
+
+CREATE TRIGGER notify_students_change
+  AFTER INSERT OR UPDATE OR DELETE ON public.students
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_row_change();
+
+CREATE TRIGGER notify_profiles_change
+  AFTER INSERT OR UPDATE OR DELETE ON public.profiles
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_row_change();
+
+CREATE TRIGGER notify_session_candidates_change
+  AFTER INSERT OR UPDATE OR DELETE ON public.session_candidates
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_row_change();
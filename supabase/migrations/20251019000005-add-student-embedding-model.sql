@@ -0,0 +1,10 @@
+-- Record which embedding model produced a student's vectors, so placeholder and
+-- old-model vectors can be found and re-embedded by backfill_embeddings.py
+ALTER TABLE public.students ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+-- Every vector written so far came from bge-m3; all-zero placeholders stay untagged
+UPDATE public.students
+SET embedding_model = 'bge-m3:latest'
+WHERE embedding_model IS NULL
+  AND resume_embeddings IS NOT NULL
+  AND vector_norm(resume_embeddings) > 0;
@@ -0,0 +1,11 @@
+-- Chunk vectors of resumes embedded in RESUME_EMBEDDING_MODE=chunked; the
+-- pooled vector stays in students.resume_embeddings and search scores a
+-- resume by its best-matching chunk
+CREATE TABLE IF NOT EXISTS public.student_resume_chunks (
+  student_id UUID NOT NULL REFERENCES public.students(id) ON DELETE CASCADE,
+  chunk_index INTEGER NOT NULL,
+  content TEXT NOT NULL,
+  embedding vector(1024) NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  PRIMARY KEY (student_id, chunk_index)
+);
@@ -0,0 +1,3 @@
+-- Per-resume term frequencies (unigrams and bigrams) for session ATS scoring;
+-- written on upload, NULL until a student's resume is processed again
+ALTER TABLE public.students ADD COLUMN IF NOT EXISTS term_frequencies JSONB;
@@ -0,0 +1,27 @@
+-- Include the operation in row change notifications, so listeners can drop
+-- deleted students from process-local indexes rather than just invalidating
+CREATE OR REPLACE FUNCTION public.notify_row_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  changed RECORD;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    changed := OLD;
+  ELSE
+    changed := NEW;
+  END IF;
+
+  PERFORM pg_notify(
+    'talentmap_row_changes',
+    json_build_object(
+      'table', TG_TABLE_NAME,
+      'op', TG_OP,
+      'id', changed.id,
+      'session_id', CASE WHEN TG_TABLE_NAME = 'session_candidates' THEN to_jsonb(changed)->>'session_id' END
+    )::text
+  );
+  RETURN NULL;
+END;
+$$;
@@ -0,0 +1,73 @@
+"""
+Tests that drive the FastAPI app run it in-process against the in-memory
+data backend (fake_backend.FakeSupabase) and the deterministic
+HashEmbedder, so no database, Ollama or network is needed.
+"""
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+# Must be set before the app module is imported
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["EMBEDDING_BACKEND"] = "hash"
+os.environ["GROQ_API_KEY"] = ""
+os.environ["OLLAMA_SUMMARY_MODEL"] = ""
+os.environ["ROW_CACHE_NOTIFY_DSN"] = ""
+os.environ["STARTUP_WARMUP"] = "0"
+_state_dir = tempfile.mkdtemp(prefix="talentmap-tests-")
+os.environ.setdefault("RESUME_JOB_DB", os.path.join(_state_dir, "jobs.sqlite3"))
+os.environ.setdefault("EMBEDDING_RETRY_DB", os.path.join(_state_dir, "embedding_retries.sqlite3"))
+
+
+@pytest.fixture
+def backend():
+    """
+    A fresh in-memory database swapped into the app, with every cache dropped.
+    """
+    import embed_resume
+    from embedders import HashEmbedder
+    from fake_backend import FakeSupabase
+
+    client = FakeSupabase()
+    embed_resume.configure_backends(client, HashEmbedder(embed_resume.EMBEDDING_DIM))
+    return client
+
+
+@pytest.fixture
+def client(backend):
+    import embed_resume
+    from fastapi.testclient import TestClient
+
+    with TestClient(embed_resume.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def serve_app():
+    """
+    Serves ASGI apps (the stub servers in benchmarks/) with uvicorn on free
+    local ports for the rest of the test; returns each one's base URL.
+    """
+    import uvicorn
+
+    servers = []
+
+    def serve(app) -> str:
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not server.started:
+            assert time.monotonic() < deadline, "stub server did not start"
+            time.sleep(0.01)
+        servers.append((server, thread))
+        port = server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    yield serve
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=10)
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from ats import AtsIndex, TermIndex, document_length, skill_terms, term_frequencies, tokenize
+
+WORDS = ["python", "java", "kafka", "spark", "sql", "react", "docker", "aws", "c++", "node.js", "ml", "go"]
+
+
+def random_resume(rng: random.Random) -> dict[str, int]:
+    return term_frequencies(" ".join(rng.choice(WORDS + ["and", "the", "with"]) for _ in range(rng.randint(3, 40))))
+
+
+def test_tokenize_keeps_skill_spellings_and_drops_noise():
+    assert tokenize("C++, C#, Node.js and R; 3 years, a b") == ["c++", "c#", "node.js", "and", "r", "years"]
+    assert tokenize(None) == []
+
+
+def test_term_frequencies_counts_unigrams_and_bigrams_within_stopword_runs():
+    frequencies = term_frequencies("Machine learning and machine learning with Kafka Streams")
+    assert frequencies == {
+        "machine": 2, "learning": 2, "machine learning": 2,
+        "kafka": 1, "streams": 1, "kafka streams": 1,
+    }
+    assert document_length(frequencies) == 6
+
+
+def test_skill_terms():
+    assert skill_terms("Python") == ["python"]
+    assert skill_terms("Machine Learning") == ["machine learning"]
+    assert skill_terms("Google Cloud Platform") == ["google cloud", "cloud platform"]
+    assert skill_terms("the") == []
+
+
+def test_compile_keywords_weights_sum_to_one_and_boost_required_skills():
+    index = AtsIndex.from_rows([
+        {"id": "a", "term_frequencies": term_frequencies("python kafka spark")},
+        {"id": "b", "term_frequencies": term_frequencies("python react")},
+        {"id": "c", "term_frequencies": term_frequencies("java spring")},
+    ])
+    keywords = index.compile_keywords("Python and Kafka engineer, blockchain a plus", required_skills=["Java"])
+    assert sum(keywords.values()) == pytest.approx(1.0)
+    assert "blockchain" not in keywords  # no resume uses it
+    assert max(keywords, key=keywords.get) == "java"
+    assert keywords["kafka"] > keywords["python"]  # rarer across resumes
+
+
+def test_scores_saturate_and_penalize_length():
+    index = AtsIndex.from_rows([
+        {"id": "once", "term_frequencies": term_frequencies("kafka spark")},
+        {"id": "thrice", "term_frequencies": term_frequencies("kafka spark kafka spark kafka spark")},
+        {"id": "long", "term_frequencies": term_frequencies("kafka spark " + "docker aws react sql " * 10)},
+        {"id": "none", "term_frequencies": term_frequencies("java")},
+    ])
+    scores = index.scores({"kafka": 0.5, "spark": 0.5})
+    assert scores["thrice"] > scores["once"] > scores["long"] > scores["none"] == 0
+    assert scores["thrice"] < 2 * scores["once"]
+    assert all(0 <= score <= 100 for score in scores.values())
+
+
+def test_explain_lists_matched_and_missing_keywords_heaviest_first():
+    index = AtsIndex.from_rows([{"id": "a", "term_frequencies": term_frequencies("python kafka")}])
+    index.upsert("b", term_frequencies("kafka"))
+    keywords = {"kafka": 0.5, "python": 0.3, "spark": 0.2}
+    assert index.explain("a", keywords) == {"matched_keywords": ["kafka", "python"], "missing_keywords": ["spark"]}
+    assert index.explain("b", keywords) == {"matched_keywords": ["kafka"], "missing_keywords": ["python", "spark"]}
+    assert index.explain("unknown", keywords)["matched_keywords"] == []
+
+
+def postings_by_student(index: TermIndex, term: str) -> dict[str, float]:
+    snapshot = index.snapshot()
+    documents, counts, _ = snapshot.postings(term)
+    return {snapshot.student_ids[document]: float(count) for document, count in zip(documents.tolist(), counts.tolist())}
+
+
+@pytest.mark.parametrize("delta_limit", [0, 3, 1000])
+def test_delta_upserts_and_removes_match_a_fresh_build(delta_limit):
+    rng = random.Random(delta_limit)
+    resumes = {f"student-{i}": random_resume(rng) for i in range(30)}
+    index = AtsIndex.from_rows([{"id": student_id, "term_frequencies": tf} for student_id, tf in resumes.items()],
+                               delta_limit=delta_limit)
+    for step in range(60):
+        student_id = f"student-{rng.randrange(40)}"
+        if rng.random() < 0.3:
+            index.remove(student_id)
+            resumes.pop(student_id, None)
+        else:
+            resumes[student_id] = random_resume(rng)
+            index.upsert(student_id, resumes[student_id])
+
+    fresh = AtsIndex.from_rows([{"id": student_id, "term_frequencies": tf} for student_id, tf in resumes.items()])
+    assert len(index) == len(fresh) == len(resumes)
+    for term in WORDS + ["python java", "kafka spark", "unknown"]:
+        assert postings_by_student(index, term) == postings_by_student(fresh, term)
+
+    # Length norms of delta entries use the last build's average, so scores agree once merged
+    index._merge()
+    keywords = fresh.compile_keywords("python kafka spark sql c++ node.js")
+    assert index.scores(keywords) == pytest.approx(fresh.scores(keywords), abs=0.011)
+    for term in WORDS:
+        assert index.document_frequency(term) == fresh.document_frequency(term)
+
+
+def test_removed_and_replaced_resumes_drop_their_old_terms():
+    index = AtsIndex.from_rows([
+        {"id": "a", "term_frequencies": term_frequencies("python kafka")},
+        {"id": "b", "term_frequencies": term_frequencies("java")},
+    ])
+    index.upsert("a", term_frequencies("rust"))
+    index.remove("b")
+    assert postings_by_student(index, "python") == {}
+    assert postings_by_student(index, "java") == {}
+    assert postings_by_student(index, "rust") == {"a": 1.0}
+    assert set(index.scores({"rust": 1.0})) == {"a"}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import backfill_embeddings
+from backfill_embeddings import BackfillState, EmbeddingBackfill, columns_to_refresh
+from embedders import EmbeddingUnavailable
+from fake_backend import FakeSupabase
+
+DIM = 8
+MODEL = "bge-m3:latest"
+VECTOR = [0.5] * DIM
+
+
+def seed(client: FakeSupabase) -> None:
+    """
+    40 students: every fourth is current, the rest have old-model, zero or
+    missing vectors; every other one has a summary.
+    """
+    bucket = client.storage.from_("resumes")
+    for i in range(40):
+        student_id = f"student-{i:02d}"
+        bucket.upload(f"{student_id}.pdf", f"Resume of {student_id}".encode())
+        kind = i % 4
+        client.table("students").insert({
+            "id": student_id,
+            "resume_url": f"{student_id}.pdf",
+            "summary": f"Summary of {student_id}" if i % 2 else None,
+            "resume_embeddings": [VECTOR, VECTOR, [0.0] * DIM, None][kind],
+            "summary_embedding": VECTOR if i % 2 and kind < 2 else None,
+            "embedding_model": MODEL if kind == 0 else "nomic-embed-text:latest",
+        }).execute()
+
+
+def stale_rows(client: FakeSupabase) -> set[str]:
+    rows = client.table("students").select(backfill_embeddings.STUDENT_COLUMNS).execute().data
+    return {row["id"] for row in rows if columns_to_refresh(row, MODEL, DIM)}
+
+
+def backfill(client: FakeSupabase, state: BackfillState, embed) -> EmbeddingBackfill:
+    return EmbeddingBackfill(
+        client, embed, bytes.decode, lambda url: url, state, MODEL, DIM, page_size=5, concurrency=1, rate=0,
+    )
+
+
+def test_interrupted_backfill_resumes_and_skips_current_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill_embeddings, "UNAVAILABLE_BACKOFF_SECONDS", 0)
+    client = FakeSupabase()
+    seed(client)
+    state = BackfillState(str(tmp_path / "backfill.sqlite3"))
+    assert len(stale_rows(client)) == 30
+    calls = []
+
+    async def flaky_embed(student_id, column, text):
+        if len(calls) >= 12:
+            raise EmbeddingUnavailable("backend down")
+        calls.append((student_id, column))
+        return VECTOR
+
+    first = asyncio.run(backfill(client, state, flaky_embed).run())
+    assert first["interrupted"] and not first["completed"]
+    checkpoint = state.load_checkpoint(MODEL)
+    assert checkpoint["cursor"] and checkpoint["cursor"] < "student-39"
+    assert checkpoint["scanned"] % 5 == 0
+
+    # Rows fully re-embedded before the outage are current now
+    remaining = stale_rows(client)
+    assert 0 < len(remaining) < 30
+    calls.clear()
+
+    async def embed(student_id, column, text):
+        calls.append((student_id, column))
+        assert text == (f"Resume of {student_id}" if column == "resume_embeddings" else f"Summary of {student_id}")
+        return VECTOR
+
+    second = asyncio.run(backfill(client, state, embed).run())
+    assert second["completed"] and not second["interrupted"]
+    assert second["scanned"] == 40  # the resumed run continues the counts
+    assert {student_id for student_id, _ in calls} == remaining
+    assert stale_rows(client) == set()
+
+    # A finished checkpoint starts over, finding nothing to do
+    calls.clear()
+    third = asyncio.run(backfill(client, state, embed).run())
+    assert third["completed"] and third["scanned"] == 40
+    assert calls == []
+
+
+@pytest.mark.parametrize("row, expected", [
+    ({"resume_embeddings": VECTOR, "embedding_model": MODEL}, {}),
+    ({"resume_embeddings": VECTOR, "embedding_model": "other"}, {"resume_embeddings": "old_model"}),
+    ({"resume_embeddings": [0.0] * DIM, "embedding_model": MODEL}, {"resume_embeddings": "zero"}),
+    ({"resume_embeddings": VECTOR[:4], "embedding_model": MODEL}, {"resume_embeddings": "invalid"}),
+    ({"resume_embeddings": VECTOR, "summary": "x", "embedding_model": MODEL}, {"summary_embedding": "missing"}),
+])
+def test_columns_to_refresh(row, expected):
+    assert columns_to_refresh(row, MODEL, DIM) == expected
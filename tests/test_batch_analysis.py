@@ -0,0 +1,68 @@
+import json
+import random
+import uuid
+
+import pytest
+
+import embed_resume
+from bench_match_kernel import random_session, random_student
+
+
+def seed(backend, students: int = 60) -> tuple[str, list[str]]:
+    rng = random.Random(2)
+    student_ids = []
+    for i in range(students):
+        student = random_student(rng)
+        student['id'] = f"00000000-0000-0000-0000-{i:012d}"
+        backend.table("profiles").insert({"id": student['id'], "full_name": f"Student {i}", "email": f"s{i}@example.com"}).execute()
+        backend.table("students").insert(student).execute()
+        student_ids.append(student['id'])
+    requirements, eligibility = random_session(rng)
+    eligibility['experience_years'] = 2
+    session_id = str(uuid.uuid4())
+    backend.table("hiring_sessions").insert({
+        "id": session_id, "title": "Backend", "status": "active",
+        "requirements": requirements, "eligibility_criteria": eligibility,
+    }).execute()
+    return session_id, student_ids
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_batch_analysis_streams_one_item_per_id_in_request_order(backend, client, monkeypatch, use_pool):
+    session_id, student_ids = seed(backend)
+    monkeypatch.setattr(embed_resume, "BATCH_ANALYSIS_CHUNK_SIZE", 7)
+    get_pool = embed_resume.get_match_process_pool
+    pools = []
+    monkeypatch.setattr(embed_resume, "get_match_process_pool", lambda: pools.append(get_pool()) or pools[-1])
+    if use_pool:
+        monkeypatch.setattr(embed_resume, "BATCH_ANALYSIS_PARALLEL_THRESHOLD", 10)
+        monkeypatch.setattr(embed_resume, "MATCH_PROCESS_WORKERS", 2)
+    else:
+        monkeypatch.setattr(embed_resume, "BATCH_ANALYSIS_PARALLEL_THRESHOLD", 10**6)
+
+    # Shuffled, with a repeated id and unknown ids at the start, middle and end of chunks
+    requested = random.Random(4).sample(student_ids, len(student_ids))
+    requested[6:6] = ["missing-1", requested[0]]
+    requested = ["missing-0"] + requested + ["missing-2"]
+
+    with client.stream("POST", f"/batch-detailed-match-analysis/{session_id}", json=requested) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        parts = list(response.iter_text())
+    items = json.loads("".join(parts))
+
+    assert [item["student_id"] for item in items] == requested
+    for student_id, item in zip(requested, items):
+        if student_id.startswith("missing"):
+            assert item == {"student_id": student_id, "status": "error", "message": "Student not found"}
+            continue
+        assert item["status"] == "success"
+        single = client.get(f"/detailed-match-analysis/{session_id}/{student_id}").json()
+        assert item["analysis"] == single["analysis"]
+    assert len(pools) == use_pool
+
+
+def test_batch_analysis_rejects_empty_lists_and_unknown_sessions(backend, client):
+    session_id, student_ids = seed(backend, students=1)
+    assert client.post(f"/batch-detailed-match-analysis/{session_id}", json=[]).status_code == 400
+    assert client.post(f"/batch-detailed-match-analysis/{uuid.uuid4()}", json=student_ids).status_code == 404
@@ -0,0 +1,77 @@
+import random
+import uuid
+
+import pytest
+
+import embed_resume
+from bench_match_kernel import random_session, random_student
+
+
+def seed(backend, students: int = 300, sessions: int = 4) -> list[str]:
+    rng = random.Random(1)
+    for i in range(students):
+        student = random_student(rng)
+        student['id'] = f"00000000-0000-0000-0000-{i:012d}"
+        student.pop('has_internship')
+        backend.table("profiles").insert({"id": student['id'], "full_name": f"Student {i}", "email": f"s{i}@example.com"}).execute()
+        backend.table("students").insert(student).execute()
+    session_ids = []
+    for k in range(sessions):
+        requirements, eligibility = random_session(rng)
+        eligibility['experience_years'] = 1 + k % 2  # every session reads experience
+        session_id = str(uuid.uuid4())
+        backend.table("hiring_sessions").insert({
+            "id": session_id, "title": f"Role {k}", "description": rng.choice(["python developer", "java backend", ""]),
+            "status": "active", "requirements": requirements, "eligibility_criteria": eligibility,
+        }).execute()
+        session_ids.append(session_id)
+    return session_ids
+
+
+def candidates(backend, session_id: str) -> list[tuple]:
+    rows = backend.table("session_candidates").select("*").eq("session_id", session_id).execute().data
+    return sorted((row["student_id"], row["match_score"], row["status"]) for row in rows)
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_batch_refresh_equals_per_session_refresh(backend, client, monkeypatch, use_pool):
+    session_ids = seed(backend)
+    closed = str(uuid.uuid4())
+    backend.table("hiring_sessions").insert({"id": closed, "title": "Closed", "status": "closed"}).execute()
+    backend.table("session_candidates").insert({"session_id": closed, "student_id": "x", "match_score": 1, "status": "rejected"}).execute()
+    # Stale candidates the refresh must remove
+    backend.table("session_candidates").insert([
+        {"session_id": session_ids[0], "student_id": f"00000000-0000-0000-0000-{i:012d}", "match_score": 1, "status": "rejected"}
+        for i in range(300)
+    ]).execute()
+    if use_pool:
+        monkeypatch.setattr(embed_resume, "MATCH_PARALLEL_MIN_STUDENTS", 10)
+        monkeypatch.setattr(embed_resume, "MATCH_PROCESS_WORKERS", 2)
+    monkeypatch.setattr(embed_resume, "SESSION_CANDIDATE_WRITE_BATCH_SIZE", 37)
+
+    response = client.post("/refresh-all-session-matches/?min_score=40").json()
+    assert response["status"] == "success"
+    assert [session["session_id"] for session in response["sessions"]] == session_ids
+    batch = {session_id: candidates(backend, session_id) for session_id in session_ids}
+    assert candidates(backend, closed) == [("x", 1, "rejected")]
+
+    for session_id in session_ids:
+        client.post(f"/find-matching-students/{session_id}?min_score=40")
+        assert candidates(backend, session_id) == batch[session_id]
+
+    # Nothing changed since, so a second pass removes nothing
+    response = client.post("/refresh-all-session-matches/?min_score=40").json()
+    assert [session["candidates_removed"] for session in response["sessions"]] == [0] * len(session_ids)
+
+
+def test_malformed_student_does_not_stop_the_refresh(backend, client):
+    seed(backend, students=50, sessions=2)
+    bad_id = "00000000-0000-0000-0000-000000000007"
+    backend.table("students").update({"experience": 5}).eq("id", bad_id).execute()
+
+    response = client.post("/refresh-all-session-matches/?min_score=0")
+    assert response.status_code == 200
+    for session in response.json()["sessions"]:
+        assert session["total_matches"] == 50
+        scores = {student_id: score for student_id, score, _ in candidates(backend, session["session_id"])}
+        assert scores[bad_id] == 0.0  # scored like SessionMatcher.score: 0, not an error
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from caching import ReadThroughCache, SingleFlight, TTLCache
+from change_feed import RowChangeListener
+
+
+def test_ttl_cache_entries_expire():
+    cache = TTLCache(ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=60)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a", "gone") == "gone"
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    cache.set("a", 10)  # overwriting refreshes recency too
+    cache.set("d", 4)
+    assert (cache.get("c"), cache.get("a")) == (None, 10)
+    assert cache.stats()["evictions"] == 2
+
+
+def test_read_through_cache_loads_misses_once_and_not_missing_rows():
+    rows = {"a": {"id": "a"}, "b": {"id": "b"}, "c": {"id": "c"}}
+    single, bulk = [], []
+    cache = ReadThroughCache(
+        lambda key: single.append(key) or rows.get(key),
+        lambda keys: bulk.append(list(keys)) or {key: rows[key] for key in keys if key in rows},
+    )
+    assert cache.get("a") == {"id": "a"}
+    assert cache.get("a") == {"id": "a"}
+    assert cache.get("missing") is None
+    assert cache.get("missing") is None
+    assert single == ["a", "missing", "missing"]
+
+    assert cache.get_many(["a", "b", "c", "b", "missing"]) == {key: rows[key] for key in "abc"}
+    assert bulk == [["b", "c", "missing"]]
+    assert cache.get_many(["b", "c"]) == {"b": rows["b"], "c": rows["c"]}
+    assert len(bulk) == 1
+
+
+def test_read_through_cache_reloads_after_invalidation():
+    rows = {"a": 1}
+    cache = ReadThroughCache(rows.get)
+    assert cache.get("a") == 1
+    rows["a"] = 2
+    assert cache.get("a") == 1
+    cache.invalidate("a")
+    assert cache.get("a") == 2
+    rows["a"] = 3
+    cache.clear()
+    assert cache.get("a") == 3
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    rows = {"a": "old", "b": "old"}
+    calls = []
+
+    def load(key):
+        calls.append(key)
+        value = rows[key]
+        if len(calls) == 1:
+            # The row changes and its NOTIFY arrives while this read is in flight
+            rows[key] = "new"
+            cache.invalidate(key)
+        return value
+
+    cache = ReadThroughCache(load, lambda keys: {key: load(key) for key in keys})
+    assert cache.get("a") == "old"
+    assert cache.get("a") == "new"
+    assert cache.get("a") == "new"
+    assert calls == ["a", "a"]
+
+    calls.clear()
+    rows.update(a="old", b="old")
+    cache.clear()
+    assert cache.get_many(["a", "b"]) == {"a": "old", "b": "old"}
+    assert cache.get_many(["a", "b"]) == {"a": "new", "b": "old"}
+    assert cache.get_many(["a", "b"]) == {"a": "new", "b": "old"}
+    assert calls == ["a", "b", "a", "b"]
+    assert cache.stats()["stale_loads"] == 2
+
+
+def test_read_through_cache_with_zero_ttl_always_loads():
+    calls = []
+    cache = ReadThroughCache(lambda key: calls.append(key) or key, lambda keys: {key: key for key in keys}, ttl_seconds=0)
+    assert not cache.enabled
+    assert cache.get("a") == cache.get("a") == "a"
+    assert cache.get_many(["a", "b"]) == {"a": "a", "b": "b"}
+    assert calls == ["a", "a"]
+    assert cache.stats()["size"] == 0
+
+
+def test_single_flight_shares_one_call_per_key():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"result {key}"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do(key, lambda key=key: work(key)) for key in ["a", "a", "a", "b"]))
+        # Nothing is remembered once the call finishes
+        again = await flight.do("a", lambda: work("a"))
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results == ["result a", "result a", "result a", "result b"]
+    assert again == "result a"
+    assert calls == ["a", "b", "a"]
+    assert flight.coalesced == 2
+
+
+def test_single_flight_shares_exceptions_and_survives_cancelled_waiters():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append("failing")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+        first = asyncio.ensure_future(flight.do("other", slow))
+        second = asyncio.ensure_future(flight.do("other", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return results, await second
+
+    results, shared = asyncio.run(main())
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert all(result is results[0] for result in results)
+    assert shared == "done"
+    assert calls == ["failing", "slow"]
+
+
+def test_row_change_listener_dispatches_notifications():
+    received = []
+
+    def handler(change):
+        if change.get("table") == "broken":
+            raise ValueError("handler bug")
+        received.append(change)
+
+    listener = RowChangeListener(None, "channel", handler)
+    assert not listener.enabled
+    asyncio.run(listener.start())  # no DSN: nothing to listen to
+    listener._on_notify(None, 1, "channel", json.dumps({"table": "students", "id": "s-1"}))
+    listener._on_notify(None, 1, "channel", "not json")
+    listener._on_notify(None, 1, "channel", json.dumps({"table": "broken"}))
+    listener._on_notify(None, 1, "channel", json.dumps({"table": "profiles", "id": "s-2"}))
+    assert received == [{"table": "students", "id": "s-1"}, {"table": "profiles", "id": "s-2"}]
+    assert listener.notifications == 4
+
+
+@pytest.mark.parametrize("dsn", ["", None])
+def test_row_change_listener_without_dsn_is_disabled(dsn):
+    listener = RowChangeListener(dsn, "channel", lambda change: None)
+
+    async def main():
+        await listener.start()
+        await listener.stop()
+
+    asyncio.run(main())
+    assert not listener.enabled and not listener.connected
@@ -0,0 +1,165 @@
+"""
+EmbeddingPool and EmbeddingRetryQueue against stub Ollama servers
+(benchmarks/stub_ollama.py) served on free local ports.
+"""
+import asyncio
+import time
+
+import pytest
+
+from embedders import EmbeddingPool, EmbeddingUnavailable, OllamaEmbedder
+from embedding_retry import RETRY_PENDING, EmbeddingRetryQueue
+from stub_ollama import create_app
+
+DIM = 8
+
+
+@pytest.fixture
+def stub_ollama(serve_app):
+    """
+    Starts stub Ollama servers; returns (embedder, app) pairs whose app.state.config can be changed while serving.
+    """
+    def start(count: int = 1, **options):
+        stubs = []
+        for seed in range(count):
+            app = create_app(dim=DIM, seed=seed, **options)
+            url = serve_app(app)
+            stubs.append((OllamaEmbedder(f"{url}/api/embeddings", "bge-m3:latest", timeout_seconds=5), app))
+        return stubs
+
+    return start
+
+
+def requests(app) -> int:
+    return app.state.stats["requests"]
+
+
+def run(pool: EmbeddingPool, coroutine):
+    async def main():
+        try:
+            return await coroutine()
+        finally:
+            await pool.stop()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_spread_over_least_outstanding_endpoints(stub_ollama):
+    (first, first_app), (second, second_app) = stub_ollama(2, latency_ms=100)
+    pool = EmbeddingPool([first, second], health_interval_seconds=0)
+
+    vectors = run(pool, lambda: asyncio.gather(*(pool.embed(f"resume {i}") for i in range(6))))
+    assert all(len(vector) == DIM for vector in vectors)
+    assert (requests(first_app), requests(second_app)) == (3, 3)
+
+
+def test_idle_pool_prefers_the_faster_endpoint(stub_ollama):
+    (fast, fast_app), (slow, slow_app) = stub_ollama(2)
+    fast_app.state.config["latency_ms"] = 1
+    slow_app.state.config["latency_ms"] = 200
+    pool = EmbeddingPool([fast, slow], health_interval_seconds=0)
+
+    async def sequential():
+        for i in range(8):
+            await pool.embed(f"resume {i}")
+
+    run(pool, sequential)
+    # The slow endpoint is tried once, before its latency is known
+    assert requests(slow_app) == 1
+    assert requests(fast_app) == 7
+
+
+def test_circuit_opens_then_half_open_probe_closes_it(stub_ollama):
+    (flaky, flaky_app), (healthy, healthy_app) = stub_ollama(2)
+    flaky_app.state.config["fail_rate"] = 1.0
+    pool = EmbeddingPool([flaky, healthy], failure_threshold=2, open_seconds=0.3, health_interval_seconds=0)
+
+    def state() -> str:
+        return pool.stats()[0]["state"]
+
+    async def scenario():
+        # Every request fails over to the healthy endpoint; two failures open the circuit
+        for i in range(5):
+            assert len(await pool.embed(f"resume {i}")) == DIM
+        assert state() == "open"
+        assert requests(flaky_app) == 2
+
+        # Half-open: one trial request, which fails and re-opens the circuit
+        await asyncio.sleep(0.35)
+        assert state() == "half_open"
+        await pool.embed("trial")
+        assert requests(flaky_app) == 3
+        assert state() == "open"
+
+        # The endpoint recovers; the next trial closes the circuit
+        flaky_app.state.config["fail_rate"] = 0.0
+        await asyncio.sleep(0.35)
+        await pool.embed("trial")
+        assert requests(flaky_app) == 4
+        assert state() == "closed"
+
+    run(pool, scenario)
+    assert requests(healthy_app) == 6
+
+
+def test_pool_raises_at_once_when_every_circuit_is_open(stub_ollama):
+    ((down, down_app),) = stub_ollama(1, fail_rate=1.0)
+    pool = EmbeddingPool([down], failure_threshold=1, open_seconds=60, health_interval_seconds=0)
+
+    async def scenario():
+        with pytest.raises(EmbeddingUnavailable):
+            await pool.embed("first")
+        started = time.perf_counter()
+        with pytest.raises(EmbeddingUnavailable, match="circuits are open"):
+            await pool.embed("second")
+        assert time.perf_counter() - started < 0.05
+
+    run(pool, scenario)
+    assert requests(down_app) == 1
+
+
+def test_health_probe_closes_an_open_circuit(stub_ollama):
+    ((endpoint, app),) = stub_ollama(1, fail_rate=1.0)
+    pool = EmbeddingPool([endpoint], failure_threshold=1, open_seconds=0.1, health_interval_seconds=0.05)
+
+    async def scenario():
+        await pool.start()
+        with pytest.raises(EmbeddingUnavailable):
+            await pool.embed("resume")
+        app.state.config["fail_rate"] = 0.0
+        deadline = time.monotonic() + 5
+        while pool.stats()[0]["state"] != "closed":
+            assert time.monotonic() < deadline, "probe did not close the circuit"
+            await asyncio.sleep(0.02)
+
+    run(pool, scenario)
+
+
+def test_retry_queue_drains_once_the_backend_recovers(stub_ollama, tmp_path):
+    ((endpoint, app),) = stub_ollama(1, fail_rate=1.0)
+    pool = EmbeddingPool([endpoint], failure_threshold=10, health_interval_seconds=0)
+    written = {}
+
+    async def embed(student_id, column, text):
+        return await pool.embed(text)
+
+    def writer(student_id, column, vector):
+        written[(student_id, column)] = vector
+
+    queue = EmbeddingRetryQueue(str(tmp_path / "retries.sqlite3"), embed, writer, backoff_seconds=0)
+    queue.enqueue("student-1", "resume_embeddings", "Python developer")
+    queue.enqueue("student-2", "summary_embedding", "Java developer")
+
+    async def scenario():
+        # Down: the first item fails and the rest wait for the next poll
+        assert await queue.run_due() == 0
+        assert queue.counts()[RETRY_PENDING] == 2
+        assert written == {}
+
+        app.state.config["fail_rate"] = 0.0
+        assert await queue.run_due() == 2
+        assert queue.counts()[RETRY_PENDING] == 0
+
+    run(pool, scenario)
+    assert set(written) == {("student-1", "resume_embeddings"), ("student-2", "summary_embedding")}
+    assert all(len(vector) == DIM for vector in written.values())
@@ -0,0 +1,129 @@
+import pytest
+
+from ats import AtsIndex, TermIndex, term_frequencies
+from keyword_index import KeywordQueryError, any_of_clause, parse_keyword_query, phrase_terms, search_keywords
+
+RESUMES = {
+    "kafka-spark": "Kafka and Spark pipelines in Python",
+    "kafka-flink": "Flink streaming on Kafka, Java services",
+    "ml": "Machine learning research in Python with PyTorch",
+    "learning-ml": "Learning machine tooling, Python scripting",
+    "php": "PHP and Kafka monoliths",
+    "web": "React frontend, Node.js and TypeScript",
+}
+
+
+@pytest.fixture
+def index() -> TermIndex:
+    return AtsIndex.from_rows([{"id": student_id, "term_frequencies": term_frequencies(text)} for student_id, text in RESUMES.items()])
+
+
+def matches(index: TermIndex, query: str) -> set[str]:
+    ranked, total = search_keywords(index, query)
+    assert total == len(ranked)
+    return {student_id for student_id, _ in ranked}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("kafka", ("terms", ["kafka"])),
+    ("kafka spark", ("and", [("terms", ["kafka"]), ("terms", ["spark"])])),
+    ("kafka AND spark", ("and", [("terms", ["kafka"]), ("terms", ["spark"])])),
+    ("kafka OR flink spark", ("or", [("terms", ["kafka"]), ("and", [("terms", ["flink"]), ("terms", ["spark"])])])),
+    ("(kafka OR flink) spark", ("and", [("or", [("terms", ["kafka"]), ("terms", ["flink"])]), ("terms", ["spark"])])),
+    ("NOT php kafka", ("and", [("not", ("terms", ["php"])), ("terms", ["kafka"])])),
+    ("kafka -php", ("and", [("terms", ["kafka"]), ("not", ("terms", ["php"]))])),
+    ('"machine learning"', ("terms", ["machine learning"])),
+    ('"machine learning platform"', ("terms", ["machine learning", "learning platform"])),
+    ("the kafka", ("terms", ["kafka"])),
+    ("kafka and spark", ("and", [("terms", ["kafka"]), ("terms", ["spark"])])),  # lower-case "and" is a stopword
+    ("Node.js C++", ("and", [("terms", ["node.js"]), ("terms", ["c++"])])),
+])
+def test_parse_structure_and_precedence(query, expected):
+    assert parse_keyword_query(query) == expected
+
+
+@pytest.mark.parametrize("query, message", [
+    ("(kafka OR flink", "Unbalanced parentheses"),
+    ("kafka)", r"Unexpected '\)'"),
+    ("kafka AND", "ends unexpectedly"),
+    ("kafka OR", "ends unexpectedly"),
+    ("NOT", "ends unexpectedly"),
+    ("()", r"Unexpected '\)'"),
+    ("", "no searchable terms"),
+    ("   ", "no searchable terms"),
+    ("the", "no searchable terms"),
+    ('"" OR ++', "no searchable terms"),
+])
+def test_malformed_or_empty_queries_are_rejected(query, message):
+    with pytest.raises(KeywordQueryError, match=message):
+        parse_keyword_query(query)
+
+
+def test_phrase_terms_split_on_stopwords():
+    assert phrase_terms("machine learning and data science") == ["machine learning", "data science"]
+    assert phrase_terms("Kafka with Spark") == ["kafka", "spark"]
+    assert phrase_terms("of the") == []
+
+
+def test_any_of_clause_is_literal_and_rejects_empty_texts():
+    assert any_of_clause(['say "hi']) == ("terms", ["say hi"])
+    assert any_of_clause(["Kafka", "Machine Learning"]) == ("or", [("terms", ["kafka"]), ("terms", ["machine learning"])])
+    with pytest.raises(KeywordQueryError, match="Skill 'the'"):
+        any_of_clause(["Kafka", "the"], label="skill")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("kafka", {"kafka-spark", "kafka-flink", "php"}),
+    ("kafka python", {"kafka-spark"}),
+    ("kafka OR pytorch", {"kafka-spark", "kafka-flink", "php", "ml"}),
+    ("kafka -php", {"kafka-spark", "kafka-flink"}),
+    ("NOT kafka", {"ml", "learning-ml", "web"}),
+    ("(flink OR spark) AND kafka", {"kafka-spark", "kafka-flink"}),
+    ("python NOT (kafka OR pytorch)", {"learning-ml"}),
+    ('"machine learning"', {"ml"}),  # "learning machine" has the words but not the phrase
+    ("machine learning", {"ml", "learning-ml"}),
+    ("node.js", {"web"}),
+    ("cobol", set()),
+    ("cobol OR react", {"web"}),
+])
+def test_boolean_matching(index, query, expected):
+    assert matches(index, query) == expected
+
+
+def test_bm25_prefers_rare_terms_repeated_terms_and_short_resumes():
+    index = AtsIndex.from_rows([
+        {"id": "rare", "term_frequencies": term_frequencies("flink python")},
+        {"id": "common", "term_frequencies": term_frequencies("java python")},
+        {"id": "repeated", "term_frequencies": term_frequencies("java java java python")},
+        {"id": "long", "term_frequencies": term_frequencies("java python " + "docker aws react sql " * 10)},
+        {"id": "filler", "term_frequencies": term_frequencies("java")},
+    ])
+    ranked, total = search_keywords(index, "python (flink OR java)")
+    assert total == 4
+    assert [student_id for student_id, _ in ranked] == ["rare", "repeated", "common", "long"]
+    assert all(score > 0 for _, score in ranked)
+
+
+def test_negated_terms_filter_but_do_not_score(index):
+    plain = dict(search_keywords(index, "kafka")[0])
+    negated = dict(search_keywords(index, "kafka -php -flink")[0])
+    assert negated == {"kafka-spark": plain["kafka-spark"]}
+
+
+def test_limit_returns_the_top_of_the_full_ranking(index):
+    full, total = search_keywords(index, "kafka OR python OR react")
+    assert total == len(full) == 6
+    assert [score for _, score in full] == sorted((score for _, score in full), reverse=True)
+    for limit in range(total + 2):
+        top, limited_total = search_keywords(index, "kafka OR python OR react", limit=limit)
+        assert limited_total == total
+        assert [score for _, score in top] == [score for _, score in full[:limit]]
+
+
+def test_search_follows_upserts_and_removes(index):
+    index.upsert("new", term_frequencies("Kafka Streams and Flink"))
+    index.upsert("php", term_frequencies("Go microservices"))
+    index.remove("kafka-flink")
+    assert matches(index, "kafka") == {"kafka-spark", "new"}
+    assert matches(index, "go OR flink") == {"php", "new"}
+    assert matches(index, "NOT kafka") == {"ml", "learning-ml", "web", "php"}
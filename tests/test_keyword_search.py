@@ -0,0 +1,71 @@
+import pytest
+
+import embed_resume
+from ats import term_frequencies
+from embedders import HashEmbedder
+
+RESUMES = {
+    "student-kafka": "Data engineer: Kafka, Spark and Python pipelines; machine learning platform",
+    "student-flink": "Streaming with Flink and Kafka, Java services, say hi to the team",
+    "student-web": "Frontend developer, React and TypeScript, some Python scripting",
+    "student-ml": "Machine learning research in Python, Kafka consumers for model features",
+}
+
+
+@pytest.fixture
+def resumes(backend):
+    embedder = HashEmbedder(embed_resume.EMBEDDING_DIM)
+    for student_id, text in RESUMES.items():
+        backend.table("profiles").insert({"id": student_id, "full_name": student_id, "email": f"{student_id}@example.com"}).execute()
+        backend.table("students").insert({
+            "id": student_id, "skills": [], "term_frequencies": term_frequencies(text),
+            "resume_embeddings": embedder.embed_sync(text), "summary_embedding": embedder.embed_sync(text[:40]),
+        }).execute()
+    return backend
+
+
+def search(client, **body):
+    return client.post("/search-students/", json=body)
+
+
+@pytest.mark.parametrize("skill", ["++", "the"])
+def test_skill_without_searchable_terms_is_rejected(resumes, client, skill):
+    response = search(client, keyword_query="kafka", skills=[skill])
+    assert response.status_code == 400
+    assert skill in response.json()["error"]
+
+
+def test_skill_with_quotes_and_operators_is_taken_literally(resumes, client):
+    response = search(client, keyword_query="kafka", skills=['say "hi', "OR"])
+    assert response.status_code == 400  # "OR" has no searchable terms either
+    response = search(client, keyword_query="kafka", skills=['say "hi'])
+    assert response.status_code == 200
+    assert [result["id"] for result in response.json()["results"]] == ["student-flink"]
+
+
+def test_skill_filter_requires_one_of_the_skills(resumes, client):
+    response = search(client, keyword_query="kafka", skills=["Machine Learning", "Java"], limit=10)
+    assert response.status_code == 200
+    assert sorted(result["id"] for result in response.json()["results"]) == ["student-flink", "student-kafka", "student-ml"]
+
+
+def test_hybrid_keyword_search_reads_only_candidate_vectors_on_rpc_backend(resumes, client, monkeypatch):
+    assert embed_resume.SEARCH_BACKEND == "rpc"
+    index_get = embed_resume.student_vector_index.get
+
+    def no_full_index():
+        raise AssertionError("built the full student vector index")
+
+    monkeypatch.setattr(embed_resume.student_vector_index, "get", no_full_index)
+    rpc = search(client, keyword_query="kafka", query="python machine learning", limit=10).json()
+    assert rpc["mode"] == "keyword_semantic"
+
+    monkeypatch.setattr(embed_resume.student_vector_index, "get", index_get)
+    monkeypatch.setattr(embed_resume, "SEARCH_BACKEND", "multi_vector")
+    local = search(client, keyword_query="kafka", query="python machine learning", limit=10).json()
+
+    def ranking(response):
+        return [(result["id"], result["hybrid_score"], result["similarity"]) for result in response["results"]]
+
+    assert ranking(rpc) == ranking(local)
+    assert len(rpc["results"]) == 3
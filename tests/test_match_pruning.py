@@ -0,0 +1,88 @@
+"""
+find-matching-students skips students whose SessionMatcher.upper_bound is
+under min_score; the ranked output must be the same as scoring everyone.
+"""
+import random
+import uuid
+from collections import Counter
+
+import pytest
+
+import embed_resume
+from bench_match_kernel import random_student
+from matching import SessionMatcher
+
+REQUIREMENTS = {"required_skills": ["Python", "SQL", "Java"]}
+ELIGIBILITY = {"experience_years": 2, "cgpa_minimum": 8.0, "eligible_years": [3, 4], "education": ["Computer Science"]}
+
+
+@pytest.fixture
+def population(backend):
+    rng = random.Random(3)
+    students = []
+    for i in range(300):
+        # Every third student copies an earlier one, so equal scores tie
+        student = dict(students[rng.randrange(len(students))]) if i % 3 == 2 else random_student(rng)
+        student["id"] = f"00000000-0000-0000-0000-{i:012d}"
+        student.pop("has_internship", None)
+        students.append(student)
+        backend.table("profiles").insert({"id": student["id"], "full_name": f"Student {i}", "email": f"s{i}@example.com"}).execute()
+        backend.table("students").insert(student).execute()
+    session_id = str(uuid.uuid4())
+    backend.table("hiring_sessions").insert({
+        "id": session_id, "title": "Backend", "status": "active",
+        "requirements": REQUIREMENTS, "eligibility_criteria": ELIGIBILITY,
+    }).execute()
+    return session_id, students
+
+
+def thresholds(students: list[dict]) -> list[float]:
+    """
+    The most common score (ties at the threshold), values just around it,
+    and the most common upper bound (bounds exactly at the threshold).
+    """
+    matcher = SessionMatcher(REQUIREMENTS, ELIGIBILITY)
+    scores = Counter(matcher.score(student) for student in students)
+    bounds = Counter(matcher.upper_bound(student) for student in students)
+    tied_score = max((score for score in scores if score > 0), key=scores.get)
+    assert scores[tied_score] > 1
+    return [tied_score, tied_score - 1e-9, tied_score + 1e-9, max(bounds, key=bounds.get), 0.0, 60.0]
+
+
+def ranked_run(client, backend, session_id: str, min_score: float) -> tuple[list, list]:
+    response = client.post(f"/find-matching-students/{session_id}", params={"min_score": min_score}).json()
+    assert response["status"] == "success"
+    rows = backend.table("session_candidates").select("*").eq("session_id", session_id).execute().data
+    stored = [(row["student_id"], row["match_score"]) for row in rows]
+    return [(match["student_id"], match["match_score"]) for match in response["matches"]], stored
+
+
+def test_upper_bound_is_never_below_score(population):
+    _, students = population
+    matcher = SessionMatcher(REQUIREMENTS, ELIGIBILITY)
+    for student in students:
+        for similarity in (None, -0.2, 0.4, 1.0):
+            assert matcher.upper_bound(student, similarity) >= matcher.score(student, similarity)
+
+
+def test_pruned_and_unpruned_runs_rank_identically(population, backend, client, monkeypatch):
+    assert not embed_resume.MATCH_PARALLEL_SCORING  # the serial path is the one that prunes
+    session_id, students = population
+    upper_bound = SessionMatcher.upper_bound
+    pruned = []
+
+    def counting_bound(self, student, semantic_similarity=None):
+        bound = upper_bound(self, student, semantic_similarity)
+        pruned.append(bound < min_score)
+        return bound
+
+    for min_score in thresholds(students):
+        pruned.clear()
+        monkeypatch.setattr(SessionMatcher, "upper_bound", counting_bound)
+        with_pruning = ranked_run(client, backend, session_id, min_score)
+        monkeypatch.setattr(SessionMatcher, "upper_bound", lambda self, student, semantic_similarity=None: 100.0)
+        without_pruning = ranked_run(client, backend, session_id, min_score)
+
+        assert with_pruning == without_pruning, min_score
+        if min_score > 0:
+            assert any(pruned), min_score
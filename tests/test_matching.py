@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from bench_match_kernel import random_session, random_student
+from bench_parallel_matching import corrupt_student
+from matching import SessionMatcher
+
+
+def random_pairs(seed: int, count: int, malformed: float = 0.0):
+    rng = random.Random(seed)
+    matchers = [SessionMatcher(*random_session(rng)) for _ in range(200)]
+    for _ in range(count):
+        student = random_student(rng)
+        if rng.random() < malformed:
+            corrupt_student(rng, student)
+        yield student, rng.choice(matchers), rng.choice([None, rng.uniform(-0.2, 1.0)])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_detailed_overall_score_equals_summary_score(seed):
+    for student, matcher, similarity in random_pairs(seed, 5000):
+        summary = round(matcher.score(student, similarity), 2)
+        detailed = matcher.detailed_analysis(student, similarity)['overall_score']
+        assert detailed == summary, (student, matcher.job_requirements, matcher.job_eligibility, similarity)
+
+
+def test_detailed_overall_score_equals_summary_score_on_malformed_rows():
+    for student, matcher, similarity in random_pairs(99, 5000, malformed=0.5):
+        assert matcher.detailed_analysis(student, similarity)['overall_score'] == round(matcher.score(student, similarity), 2)
+
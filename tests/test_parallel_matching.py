@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from bench_match_kernel import random_session, random_student
+from bench_parallel_matching import MALFORMED_VALUES, corrupt_student
+from matching import SessionMatcher
+from parallel_matching import MatchFeatures, score_matrix, score_population
+
+
+@pytest.fixture(scope="module")
+def population():
+    rng = random.Random(11)
+    students = [random_student(rng) for _ in range(3000)]
+    for i, student in enumerate(students):
+        student['id'] = f"student-{i}"
+        if i % 10 == 0:
+            corrupt_student(rng, student)
+    similarities = {student['id']: rng.uniform(-0.2, 1.0) for student in students if rng.random() < 0.7}
+    return students, similarities
+
+
+def test_scores_match_session_matcher_including_malformed_rows(population):
+    students, similarities = population
+    features = MatchFeatures(students)
+    rng = random.Random(5)
+    matchers = [SessionMatcher(*random_session(rng)) for _ in range(40)]
+    scores = score_matrix(features, matchers, [similarities] * len(matchers))
+    for column, matcher in enumerate(matchers):
+        expected = [matcher.score(student, similarities.get(student['id'])) for student in students]
+        assert scores[:, column].tolist() == expected
+
+
+def test_top_k_matches_serial_order(population):
+    students, similarities = population
+    features = MatchFeatures(students)
+    matcher = SessionMatcher({'required_skills': ['Python', 'SQL']}, {'experience_years': 2, 'eligible_years': [3, 4]})
+    passing = [(student['id'], score) for student in students
+               if (score := matcher.score(student, similarities.get(student['id']))) >= 50]
+    passing.sort(key=lambda item: item[1], reverse=True)
+    assert score_population(features, matcher, similarities, 50, 100) == (len(passing), passing[:100])
+
+
+@pytest.mark.parametrize("experience", MALFORMED_VALUES['experience'])
+def test_malformed_experience_fails_only_sessions_that_read_it(experience):
+    student = {'id': 'student-0', 'skills': ['Python'], 'experience': experience, 'year': 4}
+    features = MatchFeatures([student])
+    for required_experience in (0, 2):
+        matcher = SessionMatcher({'required_skills': ['Python']}, {'experience_years': required_experience})
+        assert score_matrix(features, [matcher], [{}])[0, 0] == matcher.score(student)
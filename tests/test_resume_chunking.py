@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from embed_resume import _pack_chunks, chunk_resume_text
+
+
+def words(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def sections(*sizes: int) -> list[dict]:
+    # Headings are one word, so a section of size n has n words in total
+    return [{"heading": f"h{k}", "content": " ".join(words(f"s{k}w", size - 1))} for k, size in enumerate(sizes)]
+
+
+def test_short_resume_is_one_chunk():
+    text = "Jane Doe Python developer"
+    assert chunk_resume_text(text, sections=[]) == [text]
+    assert chunk_resume_text(text, sections(4, 3), chunk_words=200) == ["h0 s0w0 s0w1 s0w2 h1 s1w0 s1w1"]
+
+
+def test_sections_are_kept_whole_and_merged_up_to_the_budget():
+    chunks = chunk_resume_text("", sections(30, 50, 30, 80, 10), chunk_words=100, overlap_words=20)
+    assert [len(chunk.split()) for chunk in chunks] == [80, 30, 90]
+    assert [chunk.split()[0] for chunk in chunks] == ["h0", "h2", "h3"]
+
+
+def test_long_section_is_cut_into_overlapping_windows():
+    block = words("w", 500)
+    chunks = _pack_chunks([block], chunk_words=200, overlap_words=40)
+    assert [chunk[0] for chunk in chunks] == ["w0", "w160", "w320"]
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous[-40:] == current[:40]
+    assert chunks[-1][-1] == "w499"
+
+
+def test_short_sections_around_a_long_one_are_not_merged_into_its_windows():
+    chunks = _pack_chunks([words("a", 10), words("b", 250), words("c", 10)], chunk_words=100, overlap_words=20)
+    assert chunks[0] == words("a", 10)
+    assert chunks[-1] == words("c", 10)
+    assert all(chunk[0].startswith("b") and chunk[-1].startswith("b") for chunk in chunks[1:-1])
+
+
+def test_budget_widens_chunks_instead_of_dropping_text():
+    resume_sections = sections(*[150] * 12)
+    chunks = chunk_resume_text("", resume_sections, chunk_words=200, overlap_words=40, max_chunks=4)
+    assert len(chunks) <= 4
+    expected = [word for section in resume_sections for word in f"{section['heading']} {section['content']}".split()]
+    assert set(" ".join(chunks).split()) == set(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_every_word_is_kept_within_the_chunk_budget(seed):
+    rng = random.Random(seed)
+    sizes = [rng.randint(1, 600) for _ in range(rng.randint(1, 10))]
+    chunk_words = rng.randint(20, 250)
+    overlap_words = rng.randint(0, chunk_words // 2)
+    max_chunks = rng.randint(1, 10)
+    resume_sections = sections(*sizes)
+
+    chunks = chunk_resume_text("", resume_sections, chunk_words, overlap_words, max_chunks)
+    assert 1 <= len(chunks) <= max_chunks
+    expected = [word for section in resume_sections for word in f"{section['heading']} {section['content']}".split()]
+    chunk_words_seen = [word for chunk in chunks for word in chunk.split()]
+    assert set(chunk_words_seen) == set(expected)
+    # Each chunk keeps the resume's word order
+    positions = {word: i for i, word in enumerate(expected)}
+    for chunk in chunks:
+        indices = [positions[word] for word in chunk.split()]
+        assert indices == sorted(indices)
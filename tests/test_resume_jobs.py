@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+
+import resume_jobs
+from resume_jobs import (
+    JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, LEASE_EXPIRED_ERROR, RedisJobStore, ResumeJobQueue,
+    SQLiteJobStore,
+)
+
+LEASE_SECONDS = 0.2
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), lease_seconds=LEASE_SECONDS)
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(resume_jobs, "redis", pytest.importorskip("redis"))
+    monkeypatch.setattr(resume_jobs.redis.Redis, "from_url", classmethod(lambda cls, url: fakeredis.FakeRedis()))
+    return RedisJobStore("redis://test", lease_seconds=LEASE_SECONDS)
+
+
+def crashed_claim(store, student_id: str = "student-1", payload: bytes = b"%PDF resume", max_attempts: int = 3) -> dict:
+    """
+    A job claimed by a worker whose process then died: never completed, never renewed.
+    """
+    store.enqueue(student_id, payload, max_attempts)
+    job = store.claim_next()
+    assert job["status"] == JOB_RUNNING
+    return job
+
+
+def test_running_job_blocks_resubmission_until_its_lease_expires(store):
+    job = crashed_claim(store)
+    resubmitted, created = store.enqueue("student-1", b"%PDF resume", 3)
+    assert (resubmitted["id"], created) == (job["id"], False)
+
+    time.sleep(LEASE_SECONDS * 1.5)
+    resubmitted, created = store.enqueue("student-1", b"%PDF resume", 3)
+    assert (resubmitted["id"], resubmitted["status"], created) == (job["id"], JOB_QUEUED, True)
+    assert store.claim_next()["id"] == job["id"]
+
+
+def test_expired_lease_is_requeued_and_heartbeat_keeps_it(store):
+    job = crashed_claim(store)
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        store.heartbeat(job["id"], job["claim_id"])
+        assert store.requeue_expired() == 0
+    assert store.get(job["id"])["status"] == JOB_RUNNING
+
+    time.sleep(LEASE_SECONDS * 1.5)
+    assert store.requeue_expired() == 1
+    requeued = store.get(job["id"])
+    assert (requeued["status"], requeued["error"]) == (JOB_QUEUED, LEASE_EXPIRED_ERROR)
+    reclaimed = store.claim_next()
+    assert (reclaimed["id"], reclaimed["attempts"], reclaimed["payload"]) == (job["id"], 2, b"%PDF resume")
+
+
+def test_expired_lease_out_of_attempts_fails(store):
+    job = crashed_claim(store, max_attempts=1)
+    time.sleep(LEASE_SECONDS * 1.5)
+    assert store.requeue_expired() == 0
+    failed = store.get(job["id"])
+    assert (failed["status"], failed["error"]) == (JOB_FAILED, LEASE_EXPIRED_ERROR)
+    assert store.claim_next() is None
+
+
+def test_completed_job_is_not_requeued(store):
+    job = crashed_claim(store)
+    assert store.complete(job["id"], job["claim_id"], {"status": "success"})
+    time.sleep(LEASE_SECONDS * 1.5)
+    assert store.requeue_expired() == 0
+    assert store.get(job["id"])["status"] == JOB_SUCCEEDED
+
+
+def test_requeue_interrupted_leaves_live_jobs_of_other_processes(store):
+    live = crashed_claim(store, "student-live")
+    store.heartbeat(live["id"], live["claim_id"])
+    exhausted = crashed_claim(store, "student-exhausted", payload=b"%PDF other", max_attempts=1)
+    time.sleep(LEASE_SECONDS * 0.6)
+    store.heartbeat(live["id"], live["claim_id"])
+    time.sleep(LEASE_SECONDS * 0.6)
+
+    # A second worker process starting up
+    assert store.requeue_interrupted() == 0
+    assert store.get(live["id"])["status"] == JOB_RUNNING
+    assert store.get(exhausted["id"])["status"] == JOB_FAILED
+
+
+def test_worker_that_lost_its_lease_cannot_overwrite_the_next_attempt(store):
+    stale = crashed_claim(store)
+    time.sleep(LEASE_SECONDS * 1.5)
+    assert store.requeue_expired() == 1
+    current = store.claim_next()
+    assert current["claim_id"] != stale["claim_id"]
+    assert store.update_progress(current["id"], current["claim_id"], "embedding", 60)
+
+    # The first worker wakes up and reports in after the job was re-claimed
+    assert not store.heartbeat(stale["id"], stale["claim_id"])
+    assert not store.update_progress(stale["id"], stale["claim_id"], "parsing", 10)
+    assert not store.complete(stale["id"], stale["claim_id"], {"status": "stale"})
+    assert not store.fail(stale["id"], stale["claim_id"], "stale error", None)
+    job = store.get(current["id"])
+    assert (job["status"], job["stage"], job["progress"], job["result"]) == (JOB_RUNNING, "embedding", 60, None)
+
+    assert store.complete(current["id"], current["claim_id"], {"status": "success"})
+    assert not store.fail(current["id"], current["claim_id"], "late error", None)
+    job = store.get(current["id"])
+    assert (job["status"], job["result"]) == (JOB_SUCCEEDED, {"status": "success"})
+
+
+def test_queue_recovers_a_job_abandoned_by_another_worker(store):
+    calls = []
+
+    async def handler(student_id, file_bytes, report_progress):
+        calls.append(student_id)
+        # Outlives several leases; the heartbeat keeps the job from being re-run meanwhile
+        await asyncio.sleep(LEASE_SECONDS * 3)
+        return {"student_id": student_id}
+
+    async def run():
+        queue = ResumeJobQueue(store, handler, concurrency=2, poll_interval=0.05)
+        await queue.start()
+        try:
+            abandoned = crashed_claim(store, "student-crashed")
+            live, _ = await queue.submit("student-live", b"%PDF other")
+            deadline = time.time() + 10
+            while time.time() < deadline:
+                jobs = [store.get(abandoned["id"]), store.get(live["id"])]
+                if all(job["status"] == JOB_SUCCEEDED for job in jobs):
+                    return
+                await asyncio.sleep(0.05)
+            pytest.fail(f"jobs did not finish: {jobs}")
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+    assert sorted(calls) == ["student-crashed", "student-live"]
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import embed_resume
+
+RESUME_TEXT = """John Doe
+Skills
+Python, Kafka, SQL
+Experience
+Data Engineer Intern at Acme (2023)
+"""
+
+
+def test_slow_parsing_does_not_block_the_event_loop(backend, monkeypatch):
+    backend.table("students").insert({"id": "student-1", "skills": []}).execute()
+
+    def slow_extract(file_bytes: bytes) -> str:
+        time.sleep(0.5)  # stands in for parsing a long PDF
+        return RESUME_TEXT
+
+    monkeypatch.setattr(embed_resume, "extract_text_from_pdf", slow_extract)
+
+    async def run():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            result = await embed_resume.process_resume_upload("student-1", b"%PDF resume")
+        finally:
+            ticking.cancel()
+        return result, gaps
+
+    result, gaps = asyncio.run(run())
+    assert result["status"] == "success"
+    assert "Python" in result["data_extracted"]["skills"]
+    assert max(gaps) < 0.25
@@ -0,0 +1,76 @@
+import random
+import re
+import time
+
+import pytest
+
+from embed_resume import _dated_role_matches, extract_experience_data, extract_projects_from_text, segment_resume_sections
+
+# Linear extraction takes at most a few seconds on these (6 MB for the
+# widest 100k-line input); catastrophic backtracking takes minutes
+TIME_LIMIT_SECONDS = 10.0
+
+SINGLE_LINE_TOKENS = ["word ", "intern at acme ", "engineer at acme (2020 ", "- developed a ", "Skills: ", "a (1999 "]
+LINES = [
+    "Skills:",
+    "- developed a platform for campus events",
+    " ".join(["a"] * 15) + " at " + " ".join(["b"] * 15) + " (",
+    " ".join(["a"] * 15) + " at " + " ".join(["b"] * 15) + " (2021",
+    "intern at " + " ".join(["acme"] * 15),
+    "Senior Engineer at Acme Corp (Jan 2020 - Dec 2021)",
+    "",
+]
+
+
+def run_extractors(text: str) -> float:
+    start = time.perf_counter()
+    sections = segment_resume_sections(text)
+    extract_projects_from_text(text, sections)
+    extract_experience_data(text, sections)
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("token", SINGLE_LINE_TOKENS)
+def test_single_line_of_100k_tokens_is_linear(token):
+    assert run_extractors(token * 100_000) < TIME_LIMIT_SECONDS
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_100k_lines_are_linear(line):
+    assert run_extractors((line + "\n") * 100_000) < TIME_LIMIT_SECONDS
+
+
+def test_sections_cover_the_text():
+    text = "Jane Doe\nEDUCATION\nB.Tech, 2025\nExperience:\nIntern at Acme (2024)\nProjects\n- Built a resume matcher in Python\n"
+    sections = segment_resume_sections(text)
+    assert [section["label"] for section in sections] == ["header", "education", "experience", "projects"]
+    assert "".join(section["heading"] + "\n" + section["content"] for section in sections[1:]) == text[len("Jane Doe\n"):]
+
+
+# The single regex _dated_role_matches replaces; fine on short lines, quadratic on long ones
+DATED_ROLE_RE = re.compile(
+    r'\b[A-Za-z]+(?: +[A-Za-z]+)* +at +[A-Za-z]+(?: +[A-Za-z]+)* *\([^)\n]*\d{4}[^)\n]*\)',
+    re.IGNORECASE,
+)
+
+
+@pytest.mark.parametrize("line", [
+    "Software Engineer at Acme Corp (Jan 2020 - Dec 2021)",
+    "Engineer at Acme (2020) and Intern at Initech (Summer 2019)",
+    "Lead at team at Google (2018)",
+    "x1abc at Acme (2020)",
+    "Engineer AT Acme  (no year) Analyst at Globex (2022)",
+    "Engineer at Acme (x at y (2020))",
+    "at Acme (2020)",
+    "Engineer at (2020)",
+])
+def test_dated_role_matches_equal_the_regex(line):
+    assert _dated_role_matches(line) == [match.group(0) for match in DATED_ROLE_RE.finditer(line)]
+
+
+def test_dated_role_matches_equal_the_regex_on_random_lines():
+    tokens = ["a ", "at ", "AT ", "Eng ", "Acme", "(", ")", "2020", "19", " ", " at ", "x1", "-", "_"]
+    rng = random.Random(0)
+    for _ in range(20_000):
+        line = "".join(rng.choice(tokens) for _ in range(rng.randint(1, 25)))
+        assert _dated_role_matches(line) == [match.group(0) for match in DATED_ROLE_RE.finditer(line)], line
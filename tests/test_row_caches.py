@@ -0,0 +1,94 @@
+"""
+hiring_sessions and session_candidates are also written by the frontend
+straight to Supabase; without the NOTIFY listener the API must not serve
+cached copies of them. The caches that stay on are invalidated by the
+notify_row_change payloads.
+"""
+import json
+import uuid
+
+import embed_resume
+
+
+def seed(backend) -> str:
+    for student_id, skills in (("student-python", ["Python"]), ("student-java", ["Java"])):
+        backend.table("profiles").insert({"id": student_id, "full_name": student_id, "email": f"{student_id}@example.com"}).execute()
+        backend.table("students").insert({"id": student_id, "skills": skills, "year": 4, "gpa": 8.0}).execute()
+    session_id = str(uuid.uuid4())
+    backend.table("hiring_sessions").insert({
+        "id": session_id, "title": "Backend", "status": "active",
+        "requirements": {"required_skills": ["Python"]}, "eligibility_criteria": {},
+    }).execute()
+    return session_id
+
+
+def scores(backend, session_id: str) -> dict:
+    rows = backend.table("session_candidates").select("*").eq("session_id", session_id).execute().data
+    return {row["student_id"]: row["match_score"] for row in rows}
+
+
+def test_session_caches_are_off_without_notify_listener():
+    assert not embed_resume.ROW_CACHE_NOTIFY_DSN
+    assert not embed_resume.session_row_cache.enabled
+    assert not embed_resume.session_candidates_cache.enabled
+    assert embed_resume.student_row_cache.enabled
+
+
+def test_find_matching_reads_requirements_edited_outside_the_api(backend, client):
+    session_id = seed(backend)
+    client.post(f"/find-matching-students/{session_id}?min_score=0")
+    before = scores(backend, session_id)
+    assert before["student-python"] > before["student-java"]
+
+    # What SessionDetail.tsx does when a recruiter saves new requirements
+    backend.table("hiring_sessions").update({"requirements": {"required_skills": ["Java"]}}).eq("id", session_id).execute()
+    client.post(f"/find-matching-students/{session_id}?min_score=0")
+    after = scores(backend, session_id)
+    assert after["student-java"] > after["student-python"]
+
+
+def test_analytics_reads_statuses_updated_outside_the_api(backend, client):
+    session_id = seed(backend)
+    client.post(f"/find-matching-students/{session_id}?min_score=0")
+    first = client.get(f"/session-analytics/{session_id}").json()
+    assert "hired" not in first["analytics"]["candidate_stats"]["status_distribution"]
+
+    # What useSessionCandidates.ts does when a recruiter hires a candidate
+    backend.table("session_candidates").update({"status": "hired"}).eq("session_id", session_id).eq(
+        "student_id", "student-python"
+    ).execute()
+    second = client.get(f"/session-analytics/{session_id}").json()
+    assert second["analytics"]["candidate_stats"]["status_distribution"]["hired"] == 1
+
+
+def notify(change: dict) -> None:
+    # What asyncpg calls for a notify_row_change notification
+    embed_resume.row_change_listener._on_notify(None, 0, embed_resume.ROW_CHANGE_CHANNEL, json.dumps(change))
+
+
+def test_notify_invalidates_cached_rows(backend):
+    backend.table("students").insert({"id": "student-1", "skills": ["Python"]}).execute()
+    backend.table("profiles").insert({"id": "student-1", "full_name": "Before"}).execute()
+    assert embed_resume.get_student_row("student-1")["skills"] == ["Python"]
+    assert embed_resume.get_profile_row("student-1")["full_name"] == "Before"
+
+    backend.table("students").update({"skills": ["Java"]}).eq("id", "student-1").execute()
+    backend.table("profiles").update({"full_name": "After"}).eq("id", "student-1").execute()
+    assert embed_resume.get_student_row("student-1")["skills"] == ["Python"]  # cached
+
+    notify({"table": "students", "id": "student-1", "op": "UPDATE"})
+    assert embed_resume.get_student_row("student-1")["skills"] == ["Java"]
+    assert embed_resume.get_profile_row("student-1")["full_name"] == "Before"
+
+    # Sent after a reconnect: anything may have changed
+    notify({"table": "*"})
+    assert embed_resume.get_profile_row("student-1")["full_name"] == "After"
+
+
+def test_notify_for_session_candidates_invalidates_that_session():
+    cache = embed_resume.session_candidates_cache
+    before = cache.invalidations
+    notify({"table": "session_candidates", "id": "candidate-1", "session_id": "session-1"})
+    notify({"table": "session_candidates", "id": "candidate-2", "session_id": None})
+    notify({"table": "unknown", "id": "x"})
+    assert cache.invalidations == before + 2
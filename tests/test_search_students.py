@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+import embed_resume
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """
+    Records the arguments each search runs with instead of searching.
+    """
+    calls = []
+
+    async def run_student_search(query, filter_skills, limit, resume_weight, summary_weight, keyword_query=""):
+        calls.append({"query": query, "limit": limit, "resume_weight": resume_weight, "summary_weight": summary_weight})
+        return [], "semantic"
+
+    monkeypatch.setattr(embed_resume, "run_student_search", run_student_search)
+    return calls
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"query": "python", "limit": "ten"}, "limit must be a number"),
+    ({"query": "python", "limit": [5]}, "limit must be a number"),
+    ({"query": "python", "limit": True}, "limit must be a number"),
+    ({"query": "python", "limit": -1}, "limit must be a non-negative number"),
+    ({"query": "python", "limit": 2.5}, "limit must be a whole number"),
+    ({"query": "python", "resume_weight": "heavy"}, "resume_weight must be a number"),
+    ({"query": "python", "summary_weight": "nan"}, "summary_weight must be a non-negative number"),
+    ({"query": "python", "summary_weight": {"w": 1}}, "summary_weight must be a number"),
+    ({"query": 42}, "query must be a string"),
+    ({"query": "python", "skills": "python"}, "skills must be a list"),
+    (["python"], "Request body must be a JSON object"),
+])
+def test_invalid_search_parameters_are_rejected(client, searches, body, message):
+    response = client.post("/search-students/", json=body)
+    assert response.status_code == 400
+    assert response.json() == {"error": message}
+    assert searches == []
+
+
+def test_malformed_json_is_rejected(client, searches):
+    response = client.post("/search-students/", content=b"{not json", headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert searches == []
+
+
+def test_limit_is_clamped_and_numeric_strings_accepted(client, searches):
+    responses = [
+        client.post("/search-students/", json={"query": "python", "limit": 10**9}),
+        client.post("/search-students/", json={"query": "java", "limit": "7", "resume_weight": "0.5"}),
+        client.post("/search-students/", json={"query": "go"}),
+    ]
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert [call["limit"] for call in searches] == [embed_resume.SEARCH_MAX_LIMIT, 7, 5]
+    assert searches[1]["resume_weight"] == 0.5
+
+
+class RecordingEmbedder:
+    def __init__(self, embedder):
+        self._embedder = embedder
+        self.texts = []
+
+    async def embed(self, text: str) -> list[float]:
+        self.texts.append(text)
+        return await self._embedder.embed(text)
+
+
+def test_query_is_embedded_and_cached_as_typed(client):
+    recorder = RecordingEmbedder(embed_resume.embedder)
+    embed_resume.configure_backends(text_embedder=recorder)
+
+    first = client.post("/search-students/", json={"query": "  Senior Java Developer\n"})
+    repeat = client.post("/search-students/", json={"query": "Senior Java Developer"})
+    assert first.status_code == repeat.status_code == 200
+    assert repeat.json()["cached"] is True
+    assert recorder.texts == ["Senior Java Developer"]
+
+    # Case changes the vector, so another casing is neither served from the
+    # result cache nor from the embedding cache
+    other = client.post("/search-students/", json={"query": "senior java developer"})
+    assert other.status_code == 200
+    assert "cached" not in other.json()
+    assert recorder.texts == ["Senior Java Developer", "senior java developer"]
+
+    # The same query under another limit reuses its vector
+    client.post("/search-students/", json={"query": "Senior Java Developer", "limit": 3})
+    assert recorder.texts == ["Senior Java Developer", "senior java developer"]
+
+
+class JsonRequest:
+    def __init__(self, body: dict):
+        self.body = body
+
+    async def json(self) -> dict:
+        return self.body
+
+
+def test_search_overlapping_an_invalidation_is_neither_cached_nor_joined(backend, monkeypatch):
+    versions = []
+    releases = []
+
+    async def run_student_search(query, filter_skills, limit, resume_weight, summary_weight, keyword_query=""):
+        versions.append(f"v{len(versions) + 1}")
+        version = versions[-1]
+        release = asyncio.Event()
+        releases.append(release)
+        await release.wait()
+        return [{"id": version}], "semantic"
+
+    monkeypatch.setattr(embed_resume, "run_student_search", run_student_search)
+    request = JsonRequest({"query": "python"})
+
+    async def main():
+        before = asyncio.create_task(embed_resume.search_students(request))
+        await asyncio.sleep(0.01)
+        embed_resume.invalidate_search_caches()  # a resume was re-embedded meanwhile
+        after = asyncio.create_task(embed_resume.search_students(request))
+        await asyncio.sleep(0.01)
+        assert versions == ["v1", "v2"]  # the new search did not wait for the stale one
+        for release in releases:
+            release.set()
+        stale, fresh = await before, await after
+        repeat = await embed_resume.search_students(request)
+        return [json.loads(response.body) for response in (stale, fresh, repeat)]
+
+    stale, fresh, repeat = asyncio.run(main())
+    assert stale["results"] == [{"id": "v1"}]
+    assert fresh["results"] == [{"id": "v2"}]
+    assert repeat == {"results": [{"id": "v2"}], "mode": "semantic", "cached": True}
@@ -0,0 +1,164 @@
+"""
+SummaryClient against the stub Groq/Ollama server (benchmarks/stub_llm.py),
+served on a free local port.
+"""
+import asyncio
+import time
+
+import pytest
+
+from stub_llm import create_app
+from summary_client import SummaryClient, TokenBucket
+
+
+@pytest.fixture
+def stub_llm(serve_app):
+    """
+    Starts a stub server with the given create_app() options; returns its base URL and request stats.
+    """
+    def start(**options):
+        app = create_app(**options)
+        return serve_app(app), app.state.stats
+
+    return start
+
+
+def summary_client(base_url: str, **options) -> SummaryClient:
+    options = {
+        "groq_api_key": "stub",
+        "groq_base_url": f"{base_url}/openai/v1",
+        "ollama_base_url": base_url,
+        "ollama_model": "llama3.2",
+        "requests_per_minute": 6000,
+        "tokens_per_minute": 1_000_000,
+        **options,
+    }
+    return SummaryClient(**options)
+
+
+async def summarize_all(client: SummaryClient, texts: list[str]) -> list[str]:
+    try:
+        return await asyncio.gather(*(client.summarize(text) for text in texts))
+    finally:
+        await client.aclose()
+
+
+def test_groq_summary_is_cached(stub_llm):
+    base_url, stats = stub_llm()
+    client = summary_client(base_url)
+
+    async def run():
+        try:
+            first = await client.summarize("Python developer, five years")
+            second = await client.summarize("  Python developer, five years\n")
+            return first, second
+        finally:
+            await client.aclose()
+
+    first, second = asyncio.run(run())
+    assert first == second == "Summary: Python developer, five years"
+    assert stats["groq"] == 1
+    assert stats["ollama"] == 0
+
+
+def test_falls_back_to_ollama_when_groq_fails(stub_llm):
+    base_url, stats = stub_llm(groq_fail_rate=1.0, groq_fail_status=429)
+    client = summary_client(base_url)
+
+    summaries = asyncio.run(summarize_all(client, ["resume one", "resume two"]))
+    assert summaries == ["Summary: resume one", "Summary: resume two"]
+    assert stats["groq"] == 2
+    assert stats["ollama"] == 2
+
+
+def test_returns_empty_and_does_not_cache_when_both_fail(stub_llm):
+    base_url, stats = stub_llm(groq_fail_rate=1.0, ollama_fail_rate=1.0)
+    client = summary_client(base_url)
+
+    assert asyncio.run(summarize_all(client, ["resume"])) == [""]
+    assert asyncio.run(summarize_all(client, ["resume"])) == [""]
+    assert stats["groq"] == 2
+    assert stats["ollama"] == 2
+
+
+def test_groq_timeout_falls_back_quickly(stub_llm):
+    base_url, stats = stub_llm(groq_latency_ms=1500)
+    client = summary_client(base_url, timeout_seconds=0.3)
+
+    started = time.perf_counter()
+    summaries = asyncio.run(summarize_all(client, ["slow resume"]))
+    elapsed = time.perf_counter() - started
+
+    assert summaries == ["Summary: slow resume"]
+    assert stats["ollama"] == 1
+    assert elapsed < 2.0
+
+
+def test_concurrency_is_limited(stub_llm):
+    base_url, stats = stub_llm(groq_latency_ms=100)
+    client = summary_client(base_url, max_concurrency=2)
+
+    summaries = asyncio.run(summarize_all(client, [f"resume {i}" for i in range(6)]))
+    assert all(summaries)
+    assert stats["groq"] == 6
+    assert stats["max_in_flight"] == 2
+
+
+def test_request_rate_is_limited(stub_llm):
+    base_url, stats = stub_llm()
+    client = summary_client(base_url, max_concurrency=8)
+    # Two requests up front, then ten per second
+    client._request_bucket = TokenBucket(2, 10)
+
+    started = time.perf_counter()
+    summaries = asyncio.run(summarize_all(client, [f"resume {i}" for i in range(6)]))
+    elapsed = time.perf_counter() - started
+
+    assert all(summaries)
+    assert stats["groq"] == 6
+    assert elapsed >= 0.35
+
+
+def test_rate_limit_wait_is_bounded_by_timeout(stub_llm):
+    base_url, stats = stub_llm()
+    client = summary_client(base_url, max_concurrency=1, timeout_seconds=0.3)
+    # One request up front, then one a minute
+    client._request_bucket = TokenBucket(1, 1 / 60)
+
+    started = time.perf_counter()
+    summaries = asyncio.run(summarize_all(client, [f"resume {i}" for i in range(3)]))
+    elapsed = time.perf_counter() - started
+
+    assert summaries == [f"Summary: resume {i}" for i in range(3)]
+    assert stats["groq"] == 1
+    assert stats["ollama"] == 2
+    assert elapsed < 1.5
+
+
+def test_identical_concurrent_requests_share_one_call(stub_llm):
+    base_url, stats = stub_llm(groq_latency_ms=100)
+    client = summary_client(base_url)
+
+    summaries = asyncio.run(summarize_all(client, ["same resume"] * 5))
+    assert summaries == ["Summary: same resume"] * 5
+    assert stats["groq"] == 1
+    assert client._in_flight.coalesced == 4
+
+
+def test_http_client_is_shared_and_closed(stub_llm):
+    base_url, _ = stub_llm()
+    client = summary_client(base_url)
+
+    async def run():
+        await client.summarize("resume one")
+        http = client._http
+        await client.summarize("resume two")
+        assert client._http is http
+        await client.aclose()
+        assert http.is_closed
+        assert client._http is None
+        # Usable again after close, with a new pool
+        assert await client.summarize("resume three") == "Summary: resume three"
+        await client.aclose()
+
+    asyncio.run(run())
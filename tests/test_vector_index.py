@@ -0,0 +1,124 @@
+import threading
+import time
+import warnings
+
+import numpy as np
+import pytest
+
+from vector_index import CompressedVectorIndex, MultiVectorIndex, MultiVectorIndexCache
+
+
+def rows(n: int, dim: int, seed: int = 0, resume: bool = True, summary: bool = True) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "id": f"student-{i}",
+            "resume_embeddings": rng.standard_normal(dim).tolist() if resume else None,
+            "summary_embedding": rng.standard_normal(dim).tolist() if summary else None,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("reduction", ["pca", "truncate"])
+@pytest.mark.parametrize("quantization", ["int8", "none"])
+@pytest.mark.parametrize("students", [0, 1, 100])
+def test_compressed_index_builds_below_n_components(reduction, quantization, students):
+    dim = 384
+    index = MultiVectorIndex.from_rows(rows(students, dim), dim=dim)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no NaN means from empty samples
+        compressed = CompressedVectorIndex(index, reduction=reduction, n_components=256, quantization=quantization)
+        query = np.random.default_rng(1).standard_normal(dim)
+        results = compressed.search(query, k=5)
+    assert len(compressed) == students
+    assert len(results) == min(5, students)
+    # Reranked scores are exact
+    exact = dict(index.search(query, k=5))
+    for student_id, score in results:
+        assert score == pytest.approx(exact[student_id], abs=1e-5)
+
+
+def test_pca_fits_summaries_when_no_resume_vectors():
+    dim = 64
+    index = MultiVectorIndex.from_rows(rows(50, dim, resume=False), dim=dim)
+    compressed = CompressedVectorIndex(index, reduction="pca", n_components=16, quantization="none")
+    assert compressed.projector.components.shape == (dim, 16)
+    query = index.summary_matrix[3]
+    assert compressed.search(query, k=1, resume_weight=0.0, summary_weight=1.0)[0][0] == "student-3"
+
+
+def test_empty_population_has_no_components():
+    compressed = CompressedVectorIndex(MultiVectorIndex.from_rows([], dim=32), reduction="pca", n_components=8)
+    assert compressed.projector.components.shape == (32, 0)
+    assert compressed.search(np.ones(32), k=3) == []
+
+
+class SlowLoader:
+    """
+    Builds tiny indexes; once `release` is cleared, builds wait until it is set again.
+    """
+
+    def __init__(self):
+        self.builds = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self) -> MultiVectorIndex:
+        self.release.wait(timeout=10)
+        self.builds += 1
+        return MultiVectorIndex.from_rows(rows(self.builds, 8), dim=8)
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_expired_index_is_served_while_rebuilt_in_background():
+    loader = SlowLoader()
+    cache = MultiVectorIndexCache(loader, ttl_seconds=0.05, refresh_in_background=True)
+    first = cache.get()
+    assert loader.builds == 1
+
+    time.sleep(0.1)
+    loader.release.clear()
+    started = time.perf_counter()
+    assert cache.get() is first
+    assert cache.get() is first  # one rebuild at a time
+    assert time.perf_counter() - started < 1.0
+
+    loader.release.set()
+    wait_for(lambda: cache.current() is not first)
+    assert loader.builds == 2
+    assert len(cache.get()) == 2
+
+
+def test_invalidated_index_is_rebuilt_before_returning():
+    loader = SlowLoader()
+    cache = MultiVectorIndexCache(loader, ttl_seconds=300, refresh_in_background=True)
+    first = cache.get()
+    cache.invalidate()
+    second = cache.get()
+    assert second is not first
+    assert loader.builds == 2
+
+
+def test_failed_background_rebuild_keeps_serving_previous_index():
+    calls = []
+
+    def loader():
+        calls.append(time.time())
+        if len(calls) > 1:
+            raise RuntimeError("database unavailable")
+        return MultiVectorIndex.from_rows(rows(1, 8), dim=8)
+
+    cache = MultiVectorIndexCache(loader, ttl_seconds=0.05, refresh_in_background=True)
+    first = cache.get()
+    time.sleep(0.1)
+    assert cache.get() is first
+    wait_for(lambda: len(calls) == 2 and not cache._refreshing)
+    assert cache.get() is first  # and retries the rebuild
+    wait_for(lambda: len(calls) == 3 and not cache._refreshing)
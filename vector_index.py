@@ -0,0 +1,556 @@
+"""
+In-process multi-vector retrieval over student embeddings.
+
+Each student has up to two vectors: the resume embedding and the summary
+embedding. Both are stored as unit-normalized float32 matrices, so a query is
+two matrix-vector products, a weighted combination and an argpartition top-k.
+Missing, placeholder (all-zero) and wrong-dimension vectors are masked out,
+and a student's score is renormalized over the vectors it actually has.
+Students whose resume was embedded in chunks can also carry their chunk
+vectors; their resume similarity is then the best chunk's (max-sim), so a
+short query matching one part of a long resume is not diluted by the rest.
+
+CompressedVectorIndex is an optional memory-lean mode: vectors are reduced
+(PCA or Matryoshka-style truncation) and int8-quantized for the scan, and the
+top candidates are reranked against the exact float32 vectors.
+"""
+import json
+import tempfile
+import threading
+import time
+import traceback
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+def parse_vector(value) -> Optional[np.ndarray]:
+    """
+    Converts a pgvector value (list, or "[0.1,0.2,...]" string from PostgREST) to float32.
+    Returns None for missing or empty values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        value = json.loads(value)
+    vector = np.asarray(value, dtype=np.float32)
+    if vector.ndim != 1 or vector.size == 0:
+        return None
+    return vector
+
+
+def normalize_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    L2-normalizes rows in place. Returns (matrix, valid) where valid marks non-zero rows.
+    """
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = norms > 1e-8
+    matrix[valid] /= norms[valid, None]
+    matrix[~valid] = 0.0
+    return matrix, valid
+
+
+def pool_vectors(vectors: list, weights: Optional[list] = None) -> list[float]:
+    """
+    Weighted mean of the unit-normalized vectors, re-normalized; the document
+    vector of a chunked text. Returns [] if no vector is usable.
+    """
+    matrix, valid = normalize_rows(np.array(vectors, dtype=np.float32))
+    weights = np.ones(matrix.shape[0], dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+    weights = weights * valid
+    if weights.sum() <= 0:
+        return []
+    pooled = weights @ matrix
+    norm = np.linalg.norm(pooled)
+    return (pooled / norm).tolist() if norm > 1e-8 else []
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores in descending order, in O(n + k log k).
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class MultiVectorIndex:
+    """
+    Immutable index of resume and summary vectors for a set of students.
+    """
+
+    def __init__(
+        self,
+        student_ids: list[str],
+        resume_matrix: np.ndarray,
+        summary_matrix: np.ndarray,
+        chunk_matrix: Optional[np.ndarray] = None,
+        chunk_owners: Optional[np.ndarray] = None,
+    ):
+        self.student_ids = student_ids
+        self.resume_matrix, self.has_resume = normalize_rows(resume_matrix)
+        self.summary_matrix, self.has_summary = normalize_rows(summary_matrix)
+        self.dim = resume_matrix.shape[1]
+        self.built_at = time.time()
+
+        # Chunks are kept grouped by owning student row, so the best chunk per
+        # student is one np.maximum.reduceat over the chunk similarities
+        self.chunk_matrix: Optional[np.ndarray] = None
+        self.chunk_owners = self.chunk_starts = np.empty(0, dtype=np.int64)
+        if chunk_matrix is not None and chunk_matrix.shape[0]:
+            order = np.argsort(chunk_owners, kind="stable")
+            matrix, valid = normalize_rows(chunk_matrix[order])
+            owners = np.asarray(chunk_owners)[order][valid]
+            if owners.size:
+                self.chunk_matrix = np.ascontiguousarray(matrix[valid])
+                self.chunk_owners, self.chunk_starts = np.unique(owners, return_index=True)
+                self.has_resume[self.chunk_owners] = True
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], dim: int = 1024, chunk_rows: Optional[Iterable[dict]] = None) -> "MultiVectorIndex":
+        """
+        Builds an index from student rows with id, resume_embeddings and summary_embedding,
+        and optionally resume chunk rows with student_id and embedding.
+        Vectors whose dimension is not `dim` are treated as missing.
+        """
+        student_ids = []
+        resume_vectors = []
+        summary_vectors = []
+        zeros = np.zeros(dim, dtype=np.float32)
+        for row in rows:
+            resume = parse_vector(row.get("resume_embeddings"))
+            summary = parse_vector(row.get("summary_embedding"))
+            resume = resume if resume is not None and resume.shape[0] == dim else zeros
+            summary = summary if summary is not None and summary.shape[0] == dim else zeros
+            student_ids.append(row["id"])
+            resume_vectors.append(resume)
+            summary_vectors.append(summary)
+
+        if not student_ids:
+            empty = np.zeros((0, dim), dtype=np.float32)
+            return cls([], empty, empty.copy())
+
+        chunk_vectors = []
+        chunk_owners = []
+        if chunk_rows is not None:
+            row_of = {student_id: i for i, student_id in enumerate(student_ids)}
+            for chunk in chunk_rows:
+                owner = row_of.get(chunk.get("student_id"))
+                vector = parse_vector(chunk.get("embedding"))
+                if owner is not None and vector is not None and vector.shape[0] == dim:
+                    chunk_owners.append(owner)
+                    chunk_vectors.append(vector)
+        return cls(
+            student_ids,
+            np.vstack(resume_vectors),
+            np.vstack(summary_vectors),
+            np.vstack(chunk_vectors) if chunk_vectors else None,
+            np.asarray(chunk_owners, dtype=np.int64) if chunk_owners else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def nbytes(self) -> int:
+        chunks = self.chunk_matrix.nbytes if self.chunk_matrix is not None else 0
+        return self.resume_matrix.nbytes + self.summary_matrix.nbytes + chunks
+
+    def resume_similarities(self, query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of a normalized query to each resume: the best chunk
+        for students with chunk vectors, the document vector otherwise.
+        """
+        sims = self.resume_matrix @ query
+        if self.chunk_matrix is not None:
+            sims[self.chunk_owners] = np.maximum.reduceat(self.chunk_matrix @ query, self.chunk_starts)
+        return sims
+
+    def scores(self, query: np.ndarray, resume_weight: float = 0.7, summary_weight: float = 0.3) -> np.ndarray:
+        """
+        Weighted cosine similarity per student; -inf for students without any usable vector.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm <= 1e-8 or query.shape[0] != self.dim:
+            return np.full(len(self), -np.inf, dtype=np.float32)
+        query = query / norm
+
+        resume_w = np.float32(resume_weight) * self.has_resume
+        summary_w = np.float32(summary_weight) * self.has_summary
+        total_w = resume_w + summary_w
+
+        combined = self.resume_similarities(query) * resume_w
+        if summary_weight:
+            combined += (self.summary_matrix @ query) * summary_w
+
+        scores = np.full(len(self), -np.inf, dtype=np.float32)
+        usable = total_w > 0
+        scores[usable] = combined[usable] / total_w[usable]
+        return scores
+
+    def scores_by_id(self, query: np.ndarray, resume_weight: float = 0.7, summary_weight: float = 0.3) -> dict[str, float]:
+        """
+        Weighted cosine similarity keyed by student id, omitting students without usable vectors.
+        """
+        scores = self.scores(query, resume_weight, summary_weight)
+        return {
+            student_id: score
+            for student_id, score in zip(self.student_ids, scores.tolist())
+            if score != float("-inf")
+        }
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        resume_weight: float = 0.7,
+        summary_weight: float = 0.3,
+    ) -> list[tuple[str, float]]:
+        """
+        Returns up to k (student_id, similarity) pairs, best first.
+        """
+        if not len(self):
+            return []
+        scores = self.scores(query, resume_weight, summary_weight)
+        results = []
+        for index in top_k_indices(scores, k):
+            if not np.isfinite(scores[index]):
+                break
+            results.append((self.student_ids[index], float(scores[index])))
+        return results
+
+
+class MultiVectorIndexCache:
+    """
+    Holds the current index and rebuilds it with `loader` when it is older than
+    `ttl_seconds` or has been invalidated. Concurrent callers share one rebuild.
+    With `refresh_in_background`, an index that has only outlived its TTL keeps
+    being served while a thread rebuilds it; invalidated indexes are still
+    rebuilt before returning, so callers see their own writes.
+    """
+
+    def __init__(self, loader, ttl_seconds: float = 300.0, refresh_in_background: bool = False):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.refresh_in_background = refresh_in_background
+        self._index: Optional[MultiVectorIndex] = None
+        self._lock = threading.Lock()
+        self._stale = True
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def current(self):
+        """
+        The index as last built, without triggering a build; None before the first.
+        """
+        return self._index
+
+    def _expired(self, index) -> bool:
+        return index is None or self._stale or time.time() - index.built_at >= self.ttl_seconds
+
+    def _rebuild_if_expired(self):
+        with self._lock:
+            index = self._index
+            if self._expired(index):
+                self._stale = False
+                index = self._loader()
+                self._index = index
+        return index
+
+    def _refresh(self) -> None:
+        try:
+            self._rebuild_if_expired()
+        except Exception as e:
+            print("Background index rebuild failed, serving the previous index:", e)
+            traceback.print_exc()
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def get(self) -> MultiVectorIndex:
+        index = self._index
+        if not self._expired(index):
+            return index
+        if self.refresh_in_background and index is not None and not self._stale:
+            with self._refresh_lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name="index-refresh", daemon=True).start()
+            return index
+        return self._rebuild_if_expired()
+
+
+def _combine_scores(
+    resume_sims: np.ndarray,
+    summary_sims: Optional[np.ndarray],
+    has_resume: np.ndarray,
+    has_summary: np.ndarray,
+    resume_weight: float,
+    summary_weight: float,
+) -> np.ndarray:
+    """
+    Same weighting and masking as MultiVectorIndex.scores, for precomputed similarities.
+    """
+    resume_w = np.float32(resume_weight) * has_resume
+    summary_w = np.float32(summary_weight) * has_summary
+    total_w = resume_w + summary_w
+    combined = resume_sims * resume_w
+    if summary_sims is not None:
+        combined += summary_sims * summary_w
+    scores = np.full(resume_sims.shape[0], -np.inf, dtype=np.float32)
+    usable = total_w > 0
+    scores[usable] = combined[usable] / total_w[usable]
+    return scores
+
+
+class TruncationProjector:
+    """
+    Matryoshka-style reduction: keep the leading dimensions and renormalize.
+    """
+
+    def __init__(self, n_components: int):
+        self.n_components = n_components
+
+    def fit(self, matrix: np.ndarray) -> "TruncationProjector":
+        return self
+
+    def output_dim(self, dim: int) -> int:
+        return min(self.n_components, dim)
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        reduced = np.ascontiguousarray(matrix[..., :self.n_components], dtype=np.float32)
+        if reduced.ndim == 1:
+            norm = np.linalg.norm(reduced)
+            return reduced / norm if norm > 1e-8 else reduced
+        return normalize_rows(reduced)[0]
+
+
+class PCAProjector:
+    """
+    PCA fitted on a sample of unit-normalized vectors, projecting onto the top
+    components. A sample smaller than n_components yields at most one
+    component per sample; an empty one yields none.
+    """
+
+    def __init__(self, n_components: int, max_fit_rows: int = 20000, seed: int = 0):
+        self.n_components = n_components
+        self.max_fit_rows = max_fit_rows
+        self.seed = seed
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    def fit(self, matrix: np.ndarray) -> "PCAProjector":
+        if matrix.shape[0] > self.max_fit_rows:
+            rng = np.random.default_rng(self.seed)
+            matrix = matrix[rng.choice(matrix.shape[0], self.max_fit_rows, replace=False)]
+        n_samples, dim = matrix.shape
+        if not n_samples:
+            self.mean = np.zeros(dim, dtype=np.float32)
+            self.components = np.zeros((dim, 0), dtype=np.float32)
+            return self
+        self.mean = matrix.mean(axis=0).astype(np.float32)
+        # Right singular vectors of the centered sample are the principal axes
+        _, _, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+        n_components = min(self.n_components, n_samples, dim)
+        self.components = np.ascontiguousarray(vt[:n_components].T, dtype=np.float32)
+        return self
+
+    def output_dim(self, dim: int) -> int:
+        return self.components.shape[1]
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        # Cosine in the reduced space is used as the approximate score, so re-normalize
+        reduced = (np.asarray(matrix, dtype=np.float32) - self.mean) @ self.components
+        if reduced.ndim == 1:
+            norm = np.linalg.norm(reduced)
+            return reduced / norm if norm > 1e-8 else reduced
+        return normalize_rows(reduced)[0]
+
+
+class Int8Quantizer:
+    """
+    Symmetric per-dimension int8 quantization; 4x smaller than float32.
+    """
+
+    def __init__(self, chunk_rows: int = 16384):
+        self.scale: Optional[np.ndarray] = None
+        self.chunk_rows = chunk_rows
+
+    def fit(self, matrix: np.ndarray) -> "Int8Quantizer":
+        max_abs = np.abs(matrix).max(axis=0) if matrix.shape[0] else np.ones(matrix.shape[1], dtype=np.float32)
+        self.scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        return self
+
+    def encode(self, matrix: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(matrix / self.scale), -127, 127).astype(np.int8)
+
+    def dot(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # Fold the scales into the query, and upcast codes a chunk at a time to bound temporaries
+        scaled_query = (query * self.scale).astype(np.float32)
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], self.chunk_rows):
+            chunk = codes[start:start + self.chunk_rows]
+            out[start:start + chunk.shape[0]] = chunk.astype(np.float32) @ scaled_query
+        return out
+
+
+class CompressedVectorIndex:
+    """
+    Memory-lean variant of MultiVectorIndex: vectors are optionally reduced
+    (PCA or truncation) and int8-quantized in RAM for the candidate scan,
+    while the exact float32 vectors live in a memory-mapped file and are only
+    read to rerank the top `k * rerank_factor` candidates. Resume chunk
+    vectors are not carried over; the pooled document vectors are used.
+    """
+
+    def __init__(
+        self,
+        index: MultiVectorIndex,
+        reduction: str = "none",
+        n_components: int = 256,
+        quantization: str = "int8",
+        rerank_factor: int = 10,
+        mmap_dir: Optional[str] = None,
+    ):
+        self.student_ids = index.student_ids
+        self.dim = index.dim
+        self.has_resume = index.has_resume
+        self.has_summary = index.has_summary
+        self.rerank_factor = max(1, rerank_factor)
+        self.built_at = index.built_at
+
+        if reduction == "pca":
+            # Fitted on resume vectors, or on summaries while no student has a resume vector
+            sample = index.resume_matrix[index.has_resume]
+            if not sample.shape[0]:
+                sample = index.summary_matrix[index.has_summary]
+            self.projector = PCAProjector(n_components).fit(sample)
+        elif reduction == "truncate":
+            self.projector = TruncationProjector(n_components)
+        else:
+            self.projector = None
+
+        resume = self._project(index.resume_matrix, index.has_resume)
+        summary = self._project(index.summary_matrix, index.has_summary)
+
+        if quantization == "int8":
+            self.quantizer = Int8Quantizer().fit(np.vstack([resume[index.has_resume], summary[index.has_summary]]))
+            self.resume_codes = self.quantizer.encode(resume)
+            self.summary_codes = self.quantizer.encode(summary)
+        else:
+            self.quantizer = None
+            self.resume_codes = resume
+            self.summary_codes = summary
+
+        # Exact vectors for reranking go to disk; the page cache keeps the hot rows
+        self._mmap_file = tempfile.NamedTemporaryFile(prefix="student_vectors_", suffix=".f32", dir=mmap_dir)
+        shape = (2, len(self.student_ids), self.dim)
+        self.exact = np.memmap(self._mmap_file.name, dtype=np.float32, mode="w+", shape=shape)
+        if len(self.student_ids):
+            self.exact[0] = index.resume_matrix
+            self.exact[1] = index.summary_matrix
+            self.exact.flush()
+
+    def _project(self, matrix: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        if self.projector is None:
+            return matrix
+        projected = np.zeros((matrix.shape[0], self.projector.output_dim(matrix.shape[1])), dtype=np.float32)
+        if valid.any():
+            projected[valid] = self.projector.transform(matrix[valid])
+        return projected
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Resident size of the candidate-scan structures (the exact vectors are on disk).
+        """
+        return self.resume_codes.nbytes + self.summary_codes.nbytes
+
+    def _normalized_query(self, query: np.ndarray) -> Optional[np.ndarray]:
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm <= 1e-8 or query.shape[0] != self.dim:
+            return None
+        return query / norm
+
+    def _dot(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if self.quantizer is not None:
+            return self.quantizer.dot(codes, query)
+        return codes @ query
+
+    def scores(self, query: np.ndarray, resume_weight: float = 0.7, summary_weight: float = 0.3) -> np.ndarray:
+        """
+        Approximate weighted similarity per student from the compressed vectors.
+        """
+        query = self._normalized_query(query)
+        if query is None:
+            return np.full(len(self), -np.inf, dtype=np.float32)
+        reduced_query = self.projector.transform(query) if self.projector is not None else query
+        resume_sims = self._dot(self.resume_codes, reduced_query)
+        summary_sims = self._dot(self.summary_codes, reduced_query) if summary_weight else None
+        return _combine_scores(resume_sims, summary_sims, self.has_resume, self.has_summary, resume_weight, summary_weight)
+
+    def exact_scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None, resume_weight: float = 0.7, summary_weight: float = 0.3) -> np.ndarray:
+        """
+        Exact float32 weighted similarity for `rows` (all students if None).
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        query = self._normalized_query(query)
+        if query is None:
+            return np.full(rows.shape[0], -np.inf, dtype=np.float32)
+        resume_sims = self.exact[0][rows] @ query
+        summary_sims = self.exact[1][rows] @ query if summary_weight else None
+        return _combine_scores(
+            resume_sims, summary_sims, self.has_resume[rows], self.has_summary[rows], resume_weight, summary_weight
+        )
+
+    def scores_by_id(self, query: np.ndarray, resume_weight: float = 0.7, summary_weight: float = 0.3) -> dict[str, float]:
+        """
+        Exact similarity keyed by student id; match scoring must not depend on compression.
+        """
+        scores = self.exact_scores(query, None, resume_weight, summary_weight)
+        return {
+            student_id: score
+            for student_id, score in zip(self.student_ids, scores.tolist())
+            if score != float("-inf")
+        }
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        resume_weight: float = 0.7,
+        summary_weight: float = 0.3,
+    ) -> list[tuple[str, float]]:
+        """
+        Scans the compressed vectors for k * rerank_factor candidates, then
+        reranks them with the exact vectors. Returned scores are exact.
+        """
+        if not len(self):
+            return []
+        approximate = self.scores(query, resume_weight, summary_weight)
+        candidates = top_k_indices(approximate, k * self.rerank_factor)
+        candidates = candidates[np.isfinite(approximate[candidates])]
+        if not candidates.size:
+            return []
+        candidates = np.sort(candidates)  # sequential reads from the memory map
+        exact = self.exact_scores(query, candidates, resume_weight, summary_weight)
+        order = top_k_indices(exact, k)
+        return [(self.student_ids[candidates[i]], float(exact[i])) for i in order if np.isfinite(exact[i])]